@@ -1,2 +1,210 @@
 DEFAULT_MODEL = "granite4:3b"
-CONTEXT_LIMIT = 4096
\ No newline at end of file
+CONTEXT_LIMIT = 4096
+
+# --- LLM Response Cache ---
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = "./llm_cache.sqlite3"
+LLM_CACHE_MAX_ENTRIES = 20000
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+# --- Semantic Cache ---
+# Near-duplicate tier behind the exact response cache, for the call categories listed below only.
+# Prompts are embedded with a hashing vectorizer (word unigrams and bigrams). "shadow" only logs the
+# closest earlier prompt's similarity and whether its verdict matches the fresh answer; "on" reuses the
+# closest earlier response at or above the threshold; "off" disables the tier.
+LLM_SEMANTIC_CACHE_MODE = "off"
+LLM_SEMANTIC_CACHE_THRESHOLD = 0.97
+LLM_SEMANTIC_CACHE_MAX_ENTRIES = 2000
+LLM_SEMANTIC_CACHE_CATEGORIES = ["relevance_audit", "accuracy_audit", "joint_audit", "grounding"]
+
+# --- LLM Concurrency ---
+# Maximum number of in-flight backend requests (chat_llm and achat_llm). With adaptive
+# concurrency this is the starting point and the limit moves between MIN and MAX (AIMD).
+LLM_MAX_CONCURRENCY = 4
+LLM_ADAPTIVE_CONCURRENCY = True
+LLM_CONCURRENCY_MIN = 1
+LLM_CONCURRENCY_MAX = 16
+# A call slower than FACTOR x its category's baseline latency, or a failed call, multiplies the limit by BACKOFF.
+LLM_CONCURRENCY_LATENCY_FACTOR = 2.0
+LLM_CONCURRENCY_BACKOFF = 0.7
+
+# --- Schema-Constrained JSON ---
+# Pass a JSON schema derived from the requested key to Ollama's `format` parameter.
+LLM_JSON_SCHEMA_ENABLED = True
+# Fraction of JSON calls sent WITHOUT a schema as a control group, to measure retries saved in the same run.
+LLM_JSON_SCHEMA_CONTROL_RATE = 0.0
+
+# --- Streaming ---
+# Stream JSON responses and stop generation once the requested object is complete.
+LLM_STREAMING_ENABLED = True
+# Hard cap on streamed response length (characters); longer outputs are cut off.
+LLM_STREAM_MAX_CHARS = 6000
+
+# --- Feedback History ---
+# Collapse earlier rejected attempts in execute_with_feedback into a one-line-each summary,
+# keeping only the latest rejected response (cut to ATTEMPT_MAX_CHARS) and its critique.
+LLM_HISTORY_COMPACTION = True
+LLM_HISTORY_ATTEMPT_MAX_CHARS = 1200
+
+# --- LLM Budgets ---
+# Caps on backend calls and tokens (prompt + generated) per entity (one TaskExecutor goal loop or
+# gatekeeper call site), per module and per run. 0 disables a cap. Once a cap is reached, retries
+# and audits stop and the best answer so far is kept, marked "(⚠️ Unverified: ...)".
+LLM_BUDGET_ENABLED = True
+LLM_BUDGET_ENTITY_CALLS = 40
+LLM_BUDGET_ENTITY_TOKENS = 0
+LLM_BUDGET_MODULE_CALLS = 600
+LLM_BUDGET_MODULE_TOKENS = 0
+LLM_BUDGET_RUN_CALLS = 0
+LLM_BUDGET_RUN_TOKENS = 0
+
+# --- Goal Loop Validators ---
+# TaskExecutor runs its checks cheapest first and stops at the first rejection. Defaults: heuristics
+# and grounding_hard cost 0 (local), relevance and accuracy cost 1 (LLM audits). Override costs by
+# name to reorder, guided by the per-validator rejection rates in the telemetry.
+GOAL_LOOP_VALIDATOR_COSTS = {}
+# "separate" audits relevance and accuracy in two LLM calls; "joint" asks for both verdicts in one
+# call (validator "joint_audit"). Compare the modes through the validator rejection rates and the
+# per-phase call counts in the telemetry.
+GOAL_LOOP_AUDIT_MODE = "separate"
+
+# --- Speculative Drafting ---
+# With K = SPECULATIVE_DRAFTS above 1, each iteration of the goal loop drafts K answers at once
+# and validates them concurrently; the first to pass the validator chain is kept and the others are
+# cancelled. Draft k uses SPECULATIVE_VARIANTS[k] (cycled) over the drafter profile; the first variant
+# is empty so draft 0 matches a K = 1 run and keeps hitting the response cache. Speculation trades
+# extra calls for fewer sequential retries: compare `speculation` in the telemetry (alternate wins,
+# extra calls and tokens, round time) with K = 1 runs.
+GOAL_LOOP_SPECULATIVE_DRAFTS = 1
+GOAL_LOOP_SPECULATIVE_VARIANTS = [
+    {},
+    {"seed": 7, "temperature": 0.5},
+    {"seed": 1234, "temperature": 0.7},
+    {"seed": 99, "temperature": 0.9},
+]
+
+# --- Batched Claim Verification ---
+# When at least MIN_CLAIMS entities of a module finish together (its functions, or one class's
+# methods), ComponentAnalyst skips their per-entity accuracy audits and scores all summaries against
+# their source in a few SemanticGatekeeper.averify_claims calls. Each call carries at most
+# TOKEN_BUDGET (estimated) prompt tokens and MAX_CLAIMS claims. Summaries scoring below 3 are
+# analyzed again with the full audit chain.
+LLM_BATCH_VERIFY_ENABLED = False
+LLM_BATCH_VERIFY_MIN_CLAIMS = 3
+LLM_BATCH_VERIFY_TOKEN_BUDGET = 2500
+LLM_BATCH_VERIFY_MAX_CLAIMS = 12
+
+# --- Evidence Windows ---
+# Accuracy audits and grounding checks of texts longer than MIN_CHARS send only the lines around the
+# definitions and uses of the identifiers the claim cites in backticks (CONTEXT_LINES either side).
+# The full text is used when a cited identifier is not found (confidence below MIN_CONFIDENCE), when
+# the window would exceed MAX_RATIO of the text, and to re-check any claim rejected on its window.
+LLM_EVIDENCE_WINDOW_ENABLED = True
+LLM_EVIDENCE_WINDOW_MIN_CHARS = 2000
+LLM_EVIDENCE_WINDOW_CONTEXT_LINES = 2
+LLM_EVIDENCE_WINDOW_MIN_CONFIDENCE = 1.0
+LLM_EVIDENCE_WINDOW_MAX_RATIO = 0.6
+
+# --- LLM Endpoints ---
+# Ollama hosts to balance across (least outstanding requests). An empty list uses the
+# ollama client default (OLLAMA_HOST or localhost), i.e. a single endpoint.
+LLM_ENDPOINTS = []
+# A failed endpoint is ejected for this long, then health-checked before it gets traffic again.
+LLM_ENDPOINT_COOLDOWN_SECONDS = 30
+LLM_ENDPOINT_HEALTH_TIMEOUT = 2.0
+
+# --- LLM Hedging ---
+# When a call runs longer than this percentile of recent latencies for its category
+# (drafter, relevance_audit, ...), a duplicate is sent to another endpoint; the first answer wins.
+# Needs at least two LLM_ENDPOINTS.
+LLM_HEDGE_ENABLED = False
+LLM_HEDGE_PERCENTILE = 95
+# Latencies observed per category before hedging starts, and the sliding window size.
+LLM_HEDGE_MIN_SAMPLES = 20
+LLM_HEDGE_WINDOW = 200
+
+# --- LLM Circuit Breaker ---
+# After this many consecutive connection failures, LLM calls raise LLMBackendUnavailable instead
+# of returning "Error: ..." strings. ProjectSummarizer then pauses, probing the backend every
+# LLM_BREAKER_PROBE_SECONDS, and gives up (keeping completed modules) after LLM_BREAKER_MAX_WAIT_SECONDS.
+LLM_BREAKER_THRESHOLD = 5
+LLM_BREAKER_PROBE_SECONDS = 15
+LLM_BREAKER_MAX_WAIT_SECONDS = 600
+
+# --- Generation Profiles ---
+# Ollama options per call category (llm_labels.call_category), merged over the defaults.
+# num_ctx stays in the defaults: changing it between requests makes Ollama reload the model.
+# Fixed seeds and low temperatures make reruns reproducible, so the response cache keeps hitting.
+LLM_GENERATION_DEFAULTS = {"num_ctx": CONTEXT_LIMIT, "seed": 42, "temperature": 0.0}
+LLM_GENERATION_PROFILES = {
+    "drafter": {"num_predict": 384, "temperature": 0.2},
+    "relevance_audit": {"num_predict": 192},
+    "accuracy_audit": {"num_predict": 192},
+    "joint_audit": {"num_predict": 256},
+    "grounding": {"num_predict": 192},
+    # averify_claims sizes num_predict to the number of claims in each batch.
+    "batch_grounding": {},
+    "refinement": {"num_predict": 384},
+    "critic": {"num_predict": 1024},
+    "synthesis": {"num_predict": 1024, "temperature": 0.3},
+}
+
+# --- Model Tiering ---
+# Model per call category; unlisted categories use DEFAULT_MODEL. The audits and grounding checks
+# are PASS/FAIL classifications, so they can run on a smaller model (e.g. "granite4:1b").
+LLM_ROLE_MODELS = {
+    "relevance_audit": DEFAULT_MODEL,
+    "accuracy_audit": DEFAULT_MODEL,
+    "joint_audit": DEFAULT_MODEL,
+    "grounding": DEFAULT_MODEL,
+    "batch_grounding": DEFAULT_MODEL,
+}
+
+# --- LLM Sessions ---
+# Goal-loop prompts start with the code context, so the drafter and audits of one entity share a
+# prompt prefix. In session mode those calls stick to one endpoint and keep the model loaded
+# (Ollama keep_alive), so the cached prefix is reused instead of re-evaluated.
+LLM_SESSION_MODE = True
+LLM_SESSION_KEEP_ALIVE = "30m"
+
+# --- LLM Session Manager ---
+# CrawlerAgent preloads DEFAULT_MODEL and the LLM_ROLE_MODELS on every endpoint while static
+# analysis runs, pinned with LLM_SESSION_KEEP_ALIVE. The first analysis call waits up to
+# LLM_PRELOAD_WAIT_SECONDS for the preload to finish.
+LLM_PRELOAD_MODELS = True
+LLM_PRELOAD_WAIT_SECONDS = 120
+# Per-endpoint HTTP connection pool (kept alive between calls).
+LLM_HTTP_MAX_CONNECTIONS = 32
+LLM_HTTP_KEEPALIVE_EXPIRY = 120
+
+# --- LLM Backend Mode ---
+# "live" talks to Ollama. "record" also appends every response (keyed by request hash) to
+# LLM_RECORDING_PATH. "replay" serves responses from that file without contacting Ollama and
+# bypasses the response cache; requests missing from the recording fail like backend errors
+# and are listed in LLM_REPLAY_MISS_REPORT_PATH.
+LLM_BACKEND_MODE = "live"
+LLM_RECORDING_PATH = "./llm_recording.jsonl.gz"
+LLM_REPLAY_MISS_REPORT_PATH = "./llm_replay_misses.json"
+# Simulated latency of a replayed call: SCALE x the recorded backend latency + SECONDS.
+LLM_REPLAY_LATENCY_SCALE = 0.0
+LLM_REPLAY_LATENCY_SECONDS = 0.0
+
+# --- Fake Ollama Server (testing) ---
+# Number of in-process fake Ollama HTTP servers (llm_fake_server.py) to start on free ports.
+# When > 0, all LLM calls go to them instead of LLM_ENDPOINTS, over the real HTTP client path.
+LLM_FAKE_SERVERS = 0
+# Parallel generation slots per fake server; further requests queue.
+LLM_FAKE_SERVER_SLOTS = 4
+# Prefill latency distribution ("fixed" / "uniform" / "lognormal") plus optional "per_token_s".
+LLM_FAKE_SERVER_LATENCY = {"distribution": "lognormal", "median_s": 0.2, "sigma": 0.5, "per_token_s": 0.002}
+# Share of requests answered with malformed JSON / HTTP 500 / a dropped connection.
+LLM_FAKE_SERVER_MALFORMED_RATE = 0.0
+LLM_FAKE_SERVER_ERROR_RATE = 0.0
+LLM_FAKE_SERVER_DISCONNECT_RATE = 0.0
+# Fixed answers per JSON key; a list is served round-robin (e.g. {"status": ["FAIL", "PASS"]}).
+LLM_FAKE_SERVER_SCRIPT = {}
+
+# --- LLM Telemetry ---
+# Written at the end of CrawlerAgent.run, next to PROJECT_MAP.md.
+LLM_TELEMETRY_JSON_PATH = "LLM_TELEMETRY.json"
+LLM_TELEMETRY_PROM_PATH = "LLM_TELEMETRY.prom"
@@ -1,18 +1,27 @@
+import logging
+
 from .memory_core import ChromaMemory
 from .llm_util import chat_llm
-from .agent_config import DEFAULT_MODEL, CONTEXT_LIMIT
+from .llm_response_store import write_replay_report
+from .agent_config import DEFAULT_MODEL, CONTEXT_LIMIT, LLM_TELEMETRY_JSON_PATH, LLM_TELEMETRY_PROM_PATH
 from .agent_util import project_pulse
+from .llm_breaker import LLMBackendUnavailable
+from .llm_recovery import when_backend_available
 from .summary_models import ModuleContext
 # ADDED: Import the renderer
 from .report_renderer import ReportRenderer
 from .map_synthesizer import MapSynthesizer
-from .semantic_gatekeeper import SemanticGatekeeper
 from .task_executor import TaskExecutor
+from .llm_telemetry_report import write_reports
+from .llm_session import LLMSession
 
 class CrawlerAgent:
     def __init__(self, goal: str, target_root: str):
         self.goal = goal
         self.target_root = target_root
+        # Start loading the models now so the load overlaps with memory setup and static analysis.
+        self.llm_session = LLMSession()
+        self.llm_session.warm_up()
         self.memory = ChromaMemory()
         print(f"Initializing CrawlerAgent with goal: {self.goal} and target root: {self.target_root}")
 
@@ -21,13 +30,18 @@ class CrawlerAgent:
         print(f"Running CrawlerAgent for goal: {self.goal} and target root: {self.target_root}")
         
         # 1. Analyze the target graph
-        project_map, processing_order = project_pulse(self.target_root)
+        project_map, processing_order = project_pulse(self.target_root, session=self.llm_session)
         
         # 2. Synthesize System Architecture
-        gatekeeper = SemanticGatekeeper()
-        executor = TaskExecutor(gatekeeper)
+        executor = TaskExecutor(self.llm_session.gatekeeper)
         synthesizer = MapSynthesizer(executor)
-        system_summary = synthesizer.synthesize(project_map, processing_order, goal=self.goal)
+        try:
+            system_summary = when_backend_available(
+                lambda: synthesizer.synthesize(project_map, processing_order, goal=self.goal), "MapSynthesis"
+            )
+        except LLMBackendUnavailable:
+            logging.error("LLM backend did not come back. Rendering the report without a system summary.")
+            system_summary = ""
         
         # 3. Render the report into two files: Map and Verification Evidence
         renderer = ReportRenderer(
@@ -37,6 +51,11 @@ class CrawlerAgent:
             system_summary=system_summary
         )
         renderer.render()
+
+        # 4. Per-call LLM telemetry (JSON for humans, Prometheus text format for scraping)
+        write_reports(LLM_TELEMETRY_JSON_PATH, LLM_TELEMETRY_PROM_PATH)
+        # Replay mode: requests that missed the recording (now including the synthesis calls)
+        write_replay_report()
         
         current_turn = 0
         response = "Analysis Complete. Check PROJECT_MAP.md."
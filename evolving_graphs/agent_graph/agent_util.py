@@ -9,7 +9,7 @@ generating a detailed "Module Context Map" for an AI agent.
 import logging
 import os
 from collections import deque
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 
 # --- Local Project Imports ---
 
@@ -22,6 +22,11 @@ from .module_contextualizer import ModuleContextualizer
 from .map_critic import MapCritic
 from .report_renderer import ReportRenderer
 from .semantic_gatekeeper import SemanticGatekeeper
+from .llm_session import LLMSession
+from .agent_config import LLM_PRELOAD_WAIT_SECONDS
+from .llm_response_store import write_replay_report
+from .llm_breaker import LLMBackendUnavailable
+from .llm_recovery import when_backend_available, log_llm_stats
 
 # --- Type Aliases for Readability ---
 
@@ -36,16 +41,18 @@ class ProjectSummarizer:
     This class encapsulates the project's dependency graph and the state of
     the module contexts, managing the entire workflow from start to finish.
     """
-    def __init__(self, graph: ProjectGraph, max_cycles: int = 3):
+    def __init__(self, graph: ProjectGraph, max_cycles: int = 3, gatekeeper: Optional[SemanticGatekeeper] = None):
         """
         Initializes the ProjectSummarizer.
 
         Args:
             graph: The dependency graph of the project from the GraphAnalyzer.
             max_cycles: The maximum number of refinement passes to perform.
+            gatekeeper: Shared gatekeeper for every module and the critic (a new one if omitted).
         """
         self.graph = graph
         self.max_cycles = max_cycles
+        self.gatekeeper = gatekeeper or SemanticGatekeeper()
         # This dictionary stores the evolving ModuleContext for each module path.
         self.contexts: Dict[str, ModuleContext] = {}
         # The processing order is computed once during initialization for efficiency.
@@ -88,8 +95,7 @@ class ProjectSummarizer:
         self.context_hashes: Dict[str, str] = {}
         
         # Initialize Critic components
-        gatekeeper = SemanticGatekeeper()
-        critic = MapCritic(gatekeeper)
+        critic = MapCritic(self.gatekeeper)
 
         for cycle in range(1, self.max_cycles + 1):
             logging.info(f"--- Starting Refinement Cycle {cycle}/{self.max_cycles} ---")
@@ -115,7 +121,11 @@ class ProjectSummarizer:
                     current_map_content = f.read()
                 
                 # 2. Get Critiques
-                critiques = critic.critique(current_map_content)
+                try:
+                    critiques = when_backend_available(lambda: critic.critique(current_map_content), "MapCritic")
+                except LLMBackendUnavailable:
+                    logging.error("LLM backend did not come back. Returning the contexts completed so far.")
+                    break
                 
                 if not critiques:
                     logging.info("Critic found no issues. Stopping early.")
@@ -175,9 +185,16 @@ class ProjectSummarizer:
                 try:
                     # Delegate the actual context generation to the placeholder function.
                     # Pass the critique instruction if it exists
-                    new_context = _create_module_context(path, self.graph, dep_contexts, critique_instruction)
+                    new_context = when_backend_available(
+                        lambda: _create_module_context(path, self.graph, dep_contexts, critique_instruction, self.gatekeeper),
+                        os.path.basename(path)
+                    )
                 except NotImplementedError:
                     new_context = ModuleContext(file_path=path)
+                except LLMBackendUnavailable:
+                    # Completed modules stay in self.contexts; this one keeps no hash, so a rerun redoes it.
+                    logging.error(f"LLM backend did not come back. Returning the {len(self.contexts)} contexts completed so far.")
+                    return self.contexts, self._processing_order
 
                 # 4. Update Cache & State
                 self.context_hashes[path] = current_input_hash
@@ -188,6 +205,7 @@ class ProjectSummarizer:
                     self.contexts[path] = new_context
             
             logging.info(f"Cycle {cycle} Stats: Processed {processed_count}, Skipped {skipped_count} (Cached)")
+            log_llm_stats()
 
             if not has_changed_in_cycle and not critique_map:
                 logging.info(f"Module contexts converged after cycle {cycle}. Stopping early.")
@@ -195,12 +213,12 @@ class ProjectSummarizer:
         
         return self.contexts, self._processing_order
 
-def _create_module_context(path: str, graph: ProjectGraph, dep_contexts: Dict[str, ModuleContext], critique_instruction: str = None) -> ModuleContext:
+def _create_module_context(path: str, graph: ProjectGraph, dep_contexts: Dict[str, ModuleContext], critique_instruction: str = None, gatekeeper: Optional[SemanticGatekeeper] = None) -> ModuleContext:
     """
     Generates a ModuleContext for a given module path using the provided graph and dependency contexts.
     """
     logging.info(f"Generating context for module: {os.path.basename(path)}")
-    mc = ModuleContextualizer(path, graph, dep_contexts)
+    mc = ModuleContextualizer(path, graph, dep_contexts, gatekeeper)
     context = mc.contextualize_module(critique_instruction)
     # Ensure the ModuleContext has the file path for proper representation
     if hasattr(context, 'file_path') and context.file_path is None:
@@ -214,11 +232,12 @@ def _create_module_context(path: str, graph: ProjectGraph, dep_contexts: Dict[st
 
 
 
-def project_pulse(target_file_path: str) -> Tuple[Dict[str, ModuleContext], List[str]]:
+def project_pulse(target_file_path: str, gatekeeper: Optional[SemanticGatekeeper] = None, session: Optional[LLMSession] = None) -> Tuple[Dict[str, ModuleContext], List[str]]:
     """
     Analyzes a Python project and generates a detailed context map for each module.
 
     This function serves as the main public entry point for the process.
+    With a `session`, the LLM analysis uses its gatekeeper and starts once its model preload has finished.
     """
     if not os.path.isfile(target_file_path):
         logging.error(f"Error: Target path '{target_file_path}' is not a valid file.")
@@ -227,9 +246,15 @@ def project_pulse(target_file_path: str) -> Tuple[Dict[str, ModuleContext], List
     logging.info(f"Starting project analysis from root: {target_file_path}")
     analyzer = GraphAnalyzer(target_file_path)
     project_graph = analyzer.analyze()
+
+    if session is not None:
+        gatekeeper = gatekeeper or session.gatekeeper
+        if not session.wait_until_warm(LLM_PRELOAD_WAIT_SECONDS):
+            logging.warning(f"Model preload still running after {LLM_PRELOAD_WAIT_SECONDS}s. Starting the analysis anyway.")
     
     # Instantiate and run the summarizer to orchestrate the main logic.
-    summarizer = ProjectSummarizer(project_graph)
+    summarizer = ProjectSummarizer(project_graph, gatekeeper=gatekeeper)
     final_contexts, processing_order = summarizer.generate_contexts()
+    write_replay_report()
     
     return final_contexts, processing_order
\ No newline at end of file
@@ -0,0 +1,39 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List
+
+from .llm_limiter import get_limiter
+from .semantic_gatekeeper import SemanticGatekeeper
+
+# One analysis job: the keyword arguments of the `analyze` coroutine function (including `source` and `log_label`).
+Job = Dict[str, Any]
+Analyze = Callable[..., Awaitable[str]]
+
+
+async def adispatch_jobs(analyze: Analyze, jobs: List[Job]) -> List[str]:
+    """
+    Runs independent `analyze(**job)` jobs, preserving their order.
+    When the LLM limiter allows more than one in-flight request, the jobs run concurrently.
+    """
+    if get_limiter().max_limit > 1 and len(jobs) > 1:
+        return list(await asyncio.gather(*[analyze(**job) for job in jobs]))
+    return [await analyze(**job) for job in jobs]
+
+async def averify_batch(gatekeeper: SemanticGatekeeper, analyze: Analyze, jobs: List[Job], summaries: List[str],
+                        evidence: List[str], batch_label: str) -> List[str]:
+    """
+    Scores the group's summaries against their `evidence` in one `averify_claims` batch.
+    Low scorers are analyzed again with `defer_accuracy=False`, i.e. with the full audit chain.
+    """
+    scores = await gatekeeper.averify_claims(list(zip(summaries, evidence)), log_context=batch_label)
+    rejected = [i for i, (score, _) in enumerate(scores) if score < 3]
+    for i in rejected:
+        logging.warning(f"[{jobs[i]['log_label']}] Batch verification rejected the summary ({scores[i][0]}/5): {scores[i][1]}")
+    logging.info(f"[{batch_label}] Batch verification: {len(summaries) - len(rejected)}/{len(summaries)} summaries accepted.")
+    if not rejected:
+        return summaries
+    redone = await adispatch_jobs(analyze, [dict(jobs[i], defer_accuracy=False) for i in rejected])
+    summaries = list(summaries)
+    for i, summary in zip(rejected, redone):
+        summaries[i] = summary
+    return summaries
@@ -1,10 +1,14 @@
 import os
 import ast
 import re
-from typing import List, Dict, Any
+import logging
+from typing import List, Dict, Any, Optional, Tuple
 from .semantic_gatekeeper import SemanticGatekeeper
 from .task_executor import TaskExecutor
 from .summary_models import ModuleContext, Claim
+from .batch_verification import adispatch_jobs, averify_batch
+from .llm_loop import run_sync
+from .agent_config import LLM_BATCH_VERIFY_MIN_CLAIMS
 
 class SkeletonTransformer(ast.NodeTransformer):
     """
@@ -43,9 +47,12 @@ class SkeletonTransformer(ast.NodeTransformer):
         return self.generic_visit(node)
 
 class ComponentAnalyst:
-    def __init__(self, gatekeeper: SemanticGatekeeper, task_executor: TaskExecutor):
+    def __init__(self, gatekeeper: SemanticGatekeeper, task_executor: TaskExecutor, batch_verify: bool = False):
         self.gatekeeper = gatekeeper
         self.task_executor = task_executor
+        # With batch_verify, entities analyzed together skip their accuracy audits and are scored in one averify_claims batch.
+        self.batch_verify = batch_verify and "accuracy" in task_executor.validators.names
+        self.deferred_executor = task_executor.without("accuracy") if self.batch_verify else None
 
     def generate_module_skeleton(self, source_code: str, strip_bodies: bool = False) -> str:
         try:
@@ -113,6 +120,9 @@ class ComponentAnalyst:
             working_memory.append(f"Global `{name}`: {summary}")
 
         # --- Step 3: Analyze Functions ---
+        # Functions are independent of each other, so their analyses are dispatched together.
+        function_jobs = []
+        function_entries = []
         for func in entities.get('functions', []):
             name = func['signature'].split('(')[0].replace('def ', '')
             is_internal = name.startswith('_')
@@ -138,12 +148,15 @@ class ComponentAnalyst:
 
             lineno = func.get('lineno', 0)
             end_lineno = func.get('end_lineno', 0)
-            summary = self._analyze_mechanism(
-                "Function", name, source, 
+            function_jobs.append(dict(
+                type_label="Function", name=name, source=source,
                 prompt_override=prompt,
                 scope_context="\n".join(relevant_context),
                 log_label=log_label
-            )
+            ))
+            function_entries.append((name, is_internal, lineno, end_lineno, source))
+
+        for (name, is_internal, lineno, end_lineno, source), summary in zip(function_entries, self._analyze_mechanisms(function_jobs, f"{module_name}:Functions")):
             self._add_entry(context, name, summary, is_internal, file_path, lineno, end_lineno, source)
             working_memory.append(f"Function `{name}`: {summary}")
 
@@ -169,7 +182,8 @@ class ComponentAnalyst:
                 clean_init = self._get_logic_only_source(init_method.get('source_code', ''))
                 class_state_context = f"Class `{class_name}` State Definition (from __init__):\n```python\n{clean_init}\n```"
             
-            for method in methods:
+            method_jobs = {}
+            for index, method in enumerate(methods):
                 m_name = method['signature'].split('(')[0].replace('def ', '')
                 source = method.get('source_code', '')
                 clean_method_source = self._get_logic_only_source(source)
@@ -181,22 +195,27 @@ class ComponentAnalyst:
                 elif "NotImplementedError" in clean_method_source and len(clean_method_source.split()) < 15:
                     is_abstract = True
 
-                if is_abstract:
-                    action = "Defines interface signature (Abstract)."
-                else:
-                    log_label = f"{module_name}:{class_name}.{m_name}"
+                if not is_abstract:
                     log_label = f"{module_name}:{class_name}.{m_name}"
                     m_prompt = "Describe this method."
                     
                     # --- INJECT STATE CONTEXT ---
                     combined_context = f"{base_scope_context}\n\n{class_state_context}"
                     
-                    action = self._analyze_mechanism(
-                        "Method", f"{class_name}.{m_name}", source,
+                    method_jobs[index] = dict(
+                        type_label="Method", name=f"{class_name}.{m_name}", source=source,
                         prompt_override=m_prompt,
                         scope_context=combined_context, 
                         log_label=log_label
                     )
+
+            # Methods of one class are analyzed together; abstract ones need no LLM call.
+            method_actions = dict(zip(method_jobs.keys(), self._analyze_mechanisms(list(method_jobs.values()), f"{module_name}:{class_name}")))
+
+            for index, method in enumerate(methods):
+                m_name = method['signature'].split('(')[0].replace('def ', '')
+                source = method.get('source_code', '')
+                action = method_actions.get(index, "Defines interface signature (Abstract).")
                 
                 method_summaries.append(f"- {m_name}: {action}")
                 
@@ -246,8 +265,40 @@ class ComponentAnalyst:
         except:
             return source_code
 
-    def _analyze_mechanism(self, type_label: str, name: str, source: str, prompt_override: str = None, scope_context: str = "", log_label: str = "General") -> str:
+    def _analyze_mechanism(self, type_label: str, name: str, source: str, prompt_override: str = None, scope_context: str = "", log_label: str = "General", defer_accuracy: bool = False) -> str:
+        return run_sync(self._aanalyze_mechanism(type_label, name, source, prompt_override, scope_context, log_label, defer_accuracy))
+
+    async def _aanalyze_mechanism(self, type_label: str, name: str, source: str, prompt_override: str = None, scope_context: str = "", log_label: str = "General", defer_accuracy: bool = False) -> str:
+        main_goal, context_data = self._build_mechanism_task(type_label, source, prompt_override, scope_context)
+        executor = self.deferred_executor if defer_accuracy else self.task_executor
+        # Use TaskExecutor to Plan-Solve-Refine
+        summary = await executor.asolve_complex_task(
+            main_goal=main_goal,
+            context_data=context_data,
+            log_label=log_label
+        )
         
+        return summary if summary else f"{type_label} analysis failed."
+
+    def _analyze_mechanisms(self, jobs: List[Dict[str, Any]], batch_label: Optional[str] = None) -> List[str]:
+        return run_sync(self._aanalyze_mechanisms(jobs, batch_label))
+
+    async def _aanalyze_mechanisms(self, jobs: List[Dict[str, Any]], batch_label: Optional[str] = None) -> List[str]:
+        """
+        Runs independent `_aanalyze_mechanism` jobs, preserving their order.
+        When the LLM limiter allows more than one in-flight request, the jobs run concurrently.
+        With batch verification, the accuracy audits of a large enough group are replaced by one `averify_claims` batch.
+        """
+        batched = self.batch_verify and batch_label is not None and len(jobs) >= LLM_BATCH_VERIFY_MIN_CLAIMS
+        if batched:
+            jobs = [dict(job, defer_accuracy=True) for job in jobs]
+        summaries = await adispatch_jobs(self._aanalyze_mechanism, jobs)
+        if batched:
+            evidence = [self._get_logic_only_source(job["source"]) for job in jobs]
+            summaries = await averify_batch(self.gatekeeper, self._aanalyze_mechanism, jobs, summaries, evidence, batch_label)
+        return summaries
+
+    def _build_mechanism_task(self, type_label: str, source: str, prompt_override: str, scope_context: str) -> Tuple[str, str]:
         clean_source = self._get_logic_only_source(source)
 
         main_goal = prompt_override if prompt_override else f"Analyze the PURPOSE and MECHANISM of this {type_label}."
@@ -261,14 +312,7 @@ class ComponentAnalyst:
             f"### TARGET CODE (Analyze this strictly)\n"
             f"{clean_source}"
         )
-        # Use TaskExecutor to Plan-Solve-Refine
-        summary = self.task_executor.solve_complex_task(
-            main_goal=main_goal,
-            context_data=context_data,
-            log_label=log_label
-        )
-        
-        return summary if summary else f"{type_label} analysis failed."
+        return main_goal, context_data
 
     def _synthesize_class_role(self, class_name: str, method_summaries: List[str], clean_source: str = "", log_label: str = "General") -> str:
         methods_block = chr(10).join(method_summaries)
@@ -0,0 +1,144 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .agent_config import LLM_EVIDENCE_WINDOW_ENABLED, LLM_EVIDENCE_WINDOW_MIN_CHARS, LLM_EVIDENCE_WINDOW_CONTEXT_LINES
+from .agent_config import LLM_EVIDENCE_WINDOW_MIN_CONFIDENCE, LLM_EVIDENCE_WINDOW_MAX_RATIO
+from . import llm_stats
+
+_DEFINITION = re.compile(r"^(\s*)(?:async\s+def|def|class)\s+(\w+)")
+_ASSIGNMENT = re.compile(r"^(\w+)\s*(?::[^=]*)?=(?!=)")
+_BACKTICKED = re.compile(r"`([^`]+)`")
+_SPECIAL = re.compile(r"[\\#\*\?\[\]\(\)\{\}]")
+
+
+def cited_identifiers(claim: str) -> List[str]:
+    """Identifiers cited in backticks, read the way `goal_loop_checks.verify_grounding_hard` reads them (`a.b` cites `a` and `b`)."""
+    names: List[str] = []
+    for entity in _BACKTICKED.findall(claim):
+        clean = entity.replace("()", "").strip()
+        if not clean or _SPECIAL.search(clean):
+            continue
+        for part in clean.split("."):
+            if re.match(r"^\w+$", part) and part not in names:
+                names.append(part)
+    return names
+
+def spans_from_entities(entities: Dict[str, Any]) -> Dict[str, List[Tuple[int, int]]]:
+    """Definition line ranges (1-based, inclusive) by name, from CodeEntityVisitor's `entities`."""
+    spans: Dict[str, List[Tuple[int, int]]] = {}
+
+    def _add(name: str, item: Dict[str, Any]):
+        if item.get("lineno"):
+            spans.setdefault(name, []).append((item["lineno"], item.get("end_lineno") or item["lineno"]))
+
+    for glob in entities.get("globals", []):
+        _add(glob["name"], glob)
+    for func in entities.get("functions", []):
+        _add(func["signature"].split("(")[0].replace("def ", "").strip(), func)
+    for class_name, class_data in entities.get("classes", {}).items():
+        _add(class_name, class_data)
+        for method in class_data.get("methods", []):
+            _add(method["signature"].split("(")[0].replace("def ", "").strip(), method)
+    return spans
+
+def spans_from_text(lines: List[str]) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Definition line ranges found by indentation, for texts without CodeEntityVisitor data (e.g. a goal
+    loop's context, which mixes headers and code). A def/class block ends before the next non-blank
+    line indented at or left of its header; module-level assignments cover their own line.
+    """
+    spans: Dict[str, List[Tuple[int, int]]] = {}
+    for index, line in enumerate(lines):
+        match = _DEFINITION.match(line)
+        if match:
+            indent = len(match.group(1))
+            end = index
+            for follow in range(index + 1, len(lines)):
+                text = lines[follow]
+                if text.strip() and len(text) - len(text.lstrip()) <= indent:
+                    break
+                end = follow
+            spans.setdefault(match.group(2), []).append((index + 1, end + 1))
+            continue
+        match = _ASSIGNMENT.match(line)
+        if match:
+            spans.setdefault(match.group(1), []).append((index + 1, index + 1))
+    return spans
+
+
+class EvidenceExtractor:
+    """
+    Builds the smallest part of a source (or goal-loop context) that can confirm or refute a claim:
+    the definitions of the identifiers the claim cites in backticks, the lines that use them, and
+    `context_lines` around each. Definition ranges come from CodeEntityVisitor's `entities` when the
+    text is the module source, otherwise from indentation.
+    """
+    def __init__(self, text: str, entities: Optional[Dict[str, Any]] = None, context_lines: int = 2):
+        self.text = text
+        self.lines = text.splitlines()
+        self.context_lines = context_lines
+        self.spans = spans_from_entities(entities) if entities else spans_from_text(self.lines)
+
+    def window(self, claim: str) -> Tuple[Optional[str], float]:
+        """
+        Returns (window, confidence). Confidence is the share of cited identifiers found in the text;
+        the window is None when nothing is cited or found.
+        """
+        names = cited_identifiers(claim)
+        if not names:
+            return None, 0.0
+        ranges: List[Tuple[int, int]] = []
+        found = 0
+        for name in names:
+            pattern = re.compile(r"\b" + re.escape(name) + r"\b")
+            hits = list(self.spans.get(name, []))
+            hits += [(i + 1, i + 1) for i, line in enumerate(self.lines) if pattern.search(line)]
+            if hits:
+                found += 1
+            ranges += [(max(1, start - self.context_lines), min(len(self.lines), end + self.context_lines)) for start, end in hits]
+        if not ranges:
+            return None, 0.0
+        return self._render(self._merge(ranges)), found / len(names)
+
+    def _merge(self, ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        merged: List[Tuple[int, int]] = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def _render(self, ranges: List[Tuple[int, int]]) -> str:
+        blocks = [f"# [lines {start}-{end}]\n" + "\n".join(self.lines[start - 1:end]) for start, end in ranges]
+        return "\n# ...\n".join(blocks)
+
+
+def evidence_window(claim: str, text: str, entities: Optional[Dict[str, Any]] = None, context_lines: int = 2,
+                    min_confidence: float = 1.0, max_ratio: float = 0.6) -> Optional[str]:
+    """
+    The claim's evidence window, or None when the full text should be used instead: nothing cited,
+    some cited identifier not found (confidence below `min_confidence`), or a window that would not
+    be meaningfully smaller than the text (over `max_ratio` of its length).
+    """
+    window, confidence = EvidenceExtractor(text, entities, context_lines).window(claim)
+    if window is None or confidence < min_confidence or len(window) > max_ratio * len(text):
+        return None
+    return window
+
+def audit_evidence(claim: str, text: str, entities: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Evidence window for an audit prompt under the LLM_EVIDENCE_WINDOW_* settings; None means audit against the full text."""
+    if not LLM_EVIDENCE_WINDOW_ENABLED or len(text) < LLM_EVIDENCE_WINDOW_MIN_CHARS:
+        return None
+    window = evidence_window(claim, text, entities, LLM_EVIDENCE_WINDOW_CONTEXT_LINES,
+                             LLM_EVIDENCE_WINDOW_MIN_CONFIDENCE, LLM_EVIDENCE_WINDOW_MAX_RATIO)
+    if window is None:
+        llm_stats.increment("evidence_window_skipped")
+        return None
+    llm_stats.increment("evidence_windows")
+    llm_stats.increment("evidence_window_chars_saved", len(text) - len(window))
+    return window
+
+def note_window_fallback():
+    """Counts an audit that rejected a claim on its window and was repeated on the full text."""
+    llm_stats.increment("evidence_window_fallbacks")
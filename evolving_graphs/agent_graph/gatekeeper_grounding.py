@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from .llm_profiles import generation_options, model_for
+from .llm_util import truncate_context
+from .llm_async import achat_llm
+from .llm_schemas import select_json_format
+from .llm_telemetry import get_telemetry
+from .evidence_extractor import audit_evidence, note_window_fallback
+from .gatekeeper_json import parse_whole_json
+from .agent_config import LLM_BATCH_VERIFY_TOKEN_BUDGET, LLM_BATCH_VERIFY_MAX_CLAIMS
+
+
+async def averify_grounding(claim: str, source_code: str, log_context: str = "General", entities: Optional[Dict[str, Any]] = None) -> Tuple[int, str]:
+    """
+    Scores the claim against its evidence window (see evidence_extractor) when one can be built,
+    and against the full source when there is none or the window does not support the claim.
+    `entities` are CodeEntityVisitor's entities of `source_code`, for exact definition ranges.
+    """
+    window = audit_evidence(claim, source_code, entities)
+    if window:
+        confidence, reason = await _agrounding_call(claim, window, f"{log_context}:Grounding:Window", excerpt=True)
+        if confidence >= 3:
+            return confidence, reason
+        note_window_fallback()
+        logging.info(f"[{log_context}] Evidence window did not support the claim ({confidence}/5). Re-checking against the full source.")
+    return await _agrounding_call(claim, source_code, f"{log_context}:Grounding")
+
+async def _agrounding_call(claim: str, source_code: str, label: str, excerpt: bool = False) -> Tuple[int, str]:
+    verify_prompt = build_verify_prompt(claim, source_code, excerpt)
+    response = await achat_llm(model_for(label), verify_prompt, format=select_json_format("score", verify_prompt), options=generation_options(label), stream_until_key="score", log_context=label)
+    return parse_verification(response)
+
+def build_verify_prompt(claim: str, source_code: str, excerpt: bool = False) -> str:
+    scope = "Reference Code (excerpt: the definitions and uses of the identifiers the claim cites):" if excerpt else "Reference Code:"
+    return f"""
+        Act as a Code Auditor.
+        {scope}
+        \"\"\"
+        {source_code}
+        \"\"\"
+        Claim to Verify: "{claim}"
+        Task: Rate confidence (0-5) that the CLAIM is ACCURATE given the CODE.
+        
+        CRITICAL: 
+        - Reject "Marketing Fluff": Claims about "business value", "insights", "efficiency", "real-time", or "user experience" are FALSE unless the code explicitly calculates them.
+        - Reject "Implied Intent": Do not credit the module with the *intent* of its consumers. Only what it *actually does*.
+        
+        Scoring Rubric:
+        5 (Accurate): Claim describes the Code perfectly (including accurately identifying passivity/abstractions).
+        3 (Plausible): Claim is technically true but uses slightly flowery language.
+        1 (False): Claim contradicts the Code OR contains unverifiable marketing fluff (e.g. "actionable insights").
+        
+        Return JSON: {{ "score": <int>, "reason": "<concise explanation>" }}
+        """
+
+def parse_verification(response: str) -> Tuple[int, str]:
+    try:
+        val = parse_whole_json(response)
+        return int(val.get("score", 3)), val.get("reason", "No reason provided")
+    except:
+        return 3, "Verification Error"
+
+async def averify_claims(pairs: List[Tuple[str, str]], log_context: str = "General") -> List[Tuple[int, str]]:
+    """
+    Scores many (claim, evidence) pairs with the `averify_grounding` rubric in as few calls as possible.
+    Pairs are packed into chunks of at most LLM_BATCH_VERIFY_TOKEN_BUDGET (estimated) tokens and
+    LLM_BATCH_VERIFY_MAX_CLAIMS claims; each chunk is one call, and the chunks run concurrently.
+    Claims missing from a chunk's answer are then verified one by one, also concurrently.
+    Returns (score 0-5, reason) per pair, in order.
+    """
+    results: Dict[int, Tuple[int, str]] = {}
+    for chunk_results in await asyncio.gather(*[_averify_chunk(pairs, chunk, f"{log_context}:Chunk{n + 1}:Grounding:Batch")
+                                                for n, chunk in enumerate(chunk_claims(pairs))]):
+        results.update(chunk_results)
+    missing = [i for i in range(len(pairs)) if i not in results]
+    scores = await asyncio.gather(*[averify_grounding(*pairs[i], f"{log_context}:Claim{i + 1}") for i in missing])
+    results.update(zip(missing, scores))
+    return [results[i] for i in range(len(pairs))]
+
+async def _averify_chunk(pairs: List[Tuple[str, str]], chunk: List[int], label: str) -> Dict[int, Tuple[int, str]]:
+    prompt = build_batch_verify_prompt([pairs[i] for i in chunk])
+    response = await achat_llm(model_for(label), prompt, format=select_json_format("results", prompt), options=_batch_options(label, len(chunk)), stream_until_key="results", log_context=label)
+    return parse_batch_verification(response, chunk, label)
+
+def chunk_claims(pairs: List[Tuple[str, str]]) -> List[List[int]]:
+    """Greedy packing of pair indices into chunks within the token budget (chars / 4 estimate)."""
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for i, (claim, evidence) in enumerate(pairs):
+        cost = (len(claim) + len(evidence)) // 4 + 20
+        if current and (used + cost > LLM_BATCH_VERIFY_TOKEN_BUDGET or len(current) >= LLM_BATCH_VERIFY_MAX_CLAIMS):
+            chunks.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _batch_options(label: str, claims: int) -> dict:
+    # Room for one {"id", "score", "reason"} entry per claim.
+    return dict(generation_options(label), num_predict=64 + 64 * claims)
+
+def build_batch_verify_prompt(pairs: List[Tuple[str, str]]) -> str:
+    # A single pair larger than the whole budget is cut down, keeping its start and end.
+    max_chars = LLM_BATCH_VERIFY_TOKEN_BUDGET * 4
+    blocks = "\n".join(
+        f"""
+        ### CLAIM {i + 1}
+        Reference Code:
+        \"\"\"
+        {truncate_context(evidence, max_chars)}
+        \"\"\"
+        Claim to Verify: "{claim}"
+        """
+        for i, (claim, evidence) in enumerate(pairs)
+    )
+    return f"""
+        Act as a Code Auditor. Each numbered CLAIM below comes with the Reference Code it describes.
+        {blocks}
+        Task: For EACH claim, rate confidence (0-5) that the CLAIM is ACCURATE given ITS OWN Reference Code.
+        
+        CRITICAL: 
+        - Reject "Marketing Fluff": Claims about "business value", "insights", "efficiency", "real-time", or "user experience" are FALSE unless the code explicitly calculates them.
+        - Reject "Implied Intent": Do not credit the code with the *intent* of its consumers. Only what it *actually does*.
+        
+        Scoring Rubric:
+        5 (Accurate): Claim describes the Code perfectly (including accurately identifying passivity/abstractions).
+        3 (Plausible): Claim is technically true but uses slightly flowery language.
+        1 (False): Claim contradicts the Code OR contains unverifiable marketing fluff (e.g. "actionable insights").
+        
+        Return JSON: {{ "results": [ {{ "id": 1, "score": <int>, "reason": "<concise explanation>" }}, ... ] }} with one entry per claim.
+        """
+
+def parse_batch_verification(response: str, chunk: List[int], label: str) -> Dict[int, Tuple[int, str]]:
+    """Maps the chunk's 1-based claim ids back to pair indices; malformed or missing entries are left out."""
+    val = parse_whole_json(response)
+    entries = val.get("results") if isinstance(val, dict) else None
+    scored: Dict[int, Tuple[int, str]] = {}
+    for entry in entries if isinstance(entries, list) else []:
+        try:
+            position = int(entry.get("id")) - 1
+            score = int(entry.get("score"))
+        except (AttributeError, TypeError, ValueError):
+            continue
+        if 0 <= position < len(chunk):
+            scored[chunk[position]] = (score, entry.get("reason", "No reason provided"))
+            get_telemetry().record_verdict(label, model_for(label), score >= 3)
+    if len(scored) < len(chunk):
+        logging.warning(f"[{label}] Batch verification scored {len(scored)}/{len(chunk)} claims; verifying the rest one by one.")
+    return scored
@@ -0,0 +1,62 @@
+from typing import Dict, List, Optional, Tuple
+
+_REASON_CHARS = 160
+_VALUE_CHARS = 80
+
+
+class FeedbackHistory:
+    """
+    Message history of one `execute_with_feedback` loop.
+
+    Without compaction every rejection appends the full response and its critique, so the prompt grows
+    with each attempt. With `compact`, the history keeps the system prompt and the original task, the
+    latest rejected response (cut to `max_attempt_chars`) and its critique. Earlier rejections are
+    collapsed into one line each, naming what was rejected and why.
+    """
+    def __init__(self, base_messages: List[Dict[str, str]], compact: bool = True, max_attempt_chars: int = 1200):
+        self.base = list(base_messages)
+        self.compact = compact
+        self.max_attempt_chars = max_attempt_chars
+        self._full: List[Dict[str, str]] = []
+        # (kind, rejected value or excerpt, reason) per earlier rejection, oldest first.
+        self._earlier: List[Tuple[str, str, str]] = []
+        self._latest: Optional[Tuple[str, str, str, str]] = None
+        self._latest_value = ""
+
+    def reject(self, kind: str, response: str, feedback: str, reason: Optional[str] = None, value: Optional[str] = None):
+        """
+        Adds a rejected attempt. `kind` is FORMAT, STYLE or LOGIC. `reason` defaults to the feedback's
+        first line; `value` (the parsed answer, if any) is what the summary quotes instead of the raw response.
+        """
+        self._full += [{"role": "assistant", "content": response}, {"role": "user", "content": feedback}]
+        if self._latest is not None:
+            latest_kind, _, _, latest_reason = self._latest
+            self._earlier.append((latest_kind, self._latest_value, latest_reason))
+        first_line = next((line.strip() for line in feedback.splitlines() if line.strip()), "")
+        self._latest = (kind, response, feedback, reason or first_line)
+        self._latest_value = value if value is not None else response
+
+    @property
+    def messages(self) -> List[Dict[str, str]]:
+        if not self.compact:
+            return self.base + self._full
+        if self._latest is None:
+            return list(self.base)
+        _, response, feedback, _ = self._latest
+        if len(response) > self.max_attempt_chars:
+            response = response[:self.max_attempt_chars] + " ...[cut]"
+        if self._earlier:
+            summary = "\n".join(
+                f"- Attempt {i + 1} ({kind}): rejected \"{_clip(value, _VALUE_CHARS)}\" because {_clip(reason, _REASON_CHARS)}"
+                for i, (kind, value, reason) in enumerate(self._earlier)
+            )
+            feedback = f"Earlier attempts were also rejected:\n{summary}\nDo not repeat those mistakes.\n\n{feedback}"
+        return self.base + [{"role": "assistant", "content": response}, {"role": "user", "content": feedback}]
+
+    def prompt_chars(self) -> int:
+        return sum(len(m.get("content", "")) for m in self.messages)
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
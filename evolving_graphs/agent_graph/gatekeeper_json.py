@@ -0,0 +1,222 @@
+import ast
+import json
+import re
+from typing import Optional, Tuple
+
+from .json_stream_scanner import BalancedJsonScanner
+
+
+def extract_balanced_json(text: str) -> Optional[str]:
+    # Robust string-aware bracket balancing (shared with the streaming path)
+    return BalancedJsonScanner().feed(text)
+
+def parse_json_safe(raw: str, key: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Robust JSON extraction that handles Markdown blocks, Python literals, Regex rescue,
+    and specifically targets 3B model hallucinations (like trailing quotes).
+    """
+    try:
+        if not raw: return None, "Empty response"
+        clean = raw.strip()
+
+        # --- AGGRESSIVE NORMALIZATION ---
+        # Fix Smart Quotes
+        clean = clean.replace("“", '"').replace("”", '"').replace("‘", "'").replace("’", "'")
+        # Fix Triple Quotes (common in 3B models)
+        if '"""' in clean:
+            clean = clean.replace('"""', '"')
+
+        # 1. Attempt Clean Extraction via Bracket Balancing
+        balanced_json = extract_balanced_json(clean)
+        if balanced_json: clean = balanced_json
+        else:
+            if "```" in clean:
+                match = re.search(r"```(?:json)?(.*?)```", clean, re.DOTALL)
+                if match: clean = match.group(1).strip()
+            if not clean.startswith("{"):
+                start = clean.find("{")
+                end = clean.rfind("}") + 1
+                if start != -1 and end != 0: clean = clean[start:end]
+
+        # FIX: Pre-emptive cleanup for common 3B hallucinations
+        # Case: Trailing quote -> "value""}
+        if clean.endswith('""}'):
+            clean = clean[:-3] + '"}'
+        # Case: Trailing quote with spaces -> "value" "}
+        if re.search(r'"\s*"}$', clean):
+            clean = re.sub(r'"\s*"}$', '"}', clean)
+
+        # Case: Missing closing quote before closing brace (Common 3B error)
+        # Pattern: "key": "value  }  (End of string)
+        # We look for: <quote><text><newline/space><brace> at end
+        # but NOT <quote><text><quote><brace>
+        if re.search(r':\s*"[^"]+\s*}$', clean):
+             # Insert the missing quote before the closing brace
+             clean = re.sub(r'(\s*)}$', r'"\1}', clean)
+
+        # REMOVED: Dangerous heuristics that look for punctuation followed by brace.
+        # They caused corruption of valid JSON containing code snippets (e.g. "funcless)")
+        # We now rely on 'strict=False' in json.loads and the 'Deep Rescue' below.
+
+        # Case: General Unclosed Quote before brace/comma
+        # Pattern: "key": "value... <newline> }  (Missing quote)
+        # We look for a line that started with quote, has content, but ends without quote before the structural char.
+        # This is hard to regex perfectly. 
+        # Let's try to find: `  "answer": "..... \n  }` 
+        # We can try to repair specific known keys if we knew them, but here we don't.
+        # Generic approach: Look for `\s*"[^"]+\s*\n\s*[},]`
+
+        # Fix: "answer": "text... \n } -> "answer": "text..." \n }
+        # Match: " (anything except quote) \n (whitespace) }
+        # This handles the nested case: ... \n } \n }
+        clean = re.sub(r':\s*"([^"]+?)\s*\n\s*([},])', r': "\1"\n\2', clean, flags=re.DOTALL)
+
+        # Also handle the case where it just ends at the very end of string with multiple braces
+        # e.g. ... text \n } \n }
+        clean = re.sub(r':\s*"([^"]+?)\s*(\}+)$', r': "\1"\2', clean, flags=re.DOTALL)
+
+        # 2. Primary Parse: Strict JSON
+        try:
+            # strict=False allows control characters like newlines in strings
+            data = json.loads(clean, strict=False)
+        except json.JSONDecodeError:
+            # 3. Secondary Parse: Flatten Newlines and Tabs (Fix for 3B model)
+            try:
+                # Tabs are forbidden in JSON strings but common in 3B output
+                flat_text = clean.replace('\n', ' ').replace('\r', '').replace('\t', ' ')
+                data = json.loads(flat_text, strict=False)
+            except:
+                # 4. Python Literal (with JSON compat)
+                data = None
+                try:
+                    # Fix JSON constants for Python eval
+                    literal_text = clean.replace("null", "None").replace("true", "True").replace("false", "False")
+                    data = ast.literal_eval(literal_text)
+                    if not isinstance(data, dict): data = None
+                except:
+                    pass
+
+            # 5. Regex Rescue (Robust)
+            if data is None:
+                try:
+                    # Fallback: Extract the key's value directly.
+                    # Matches: "key" : "value" OR "key": { ... }
+
+                    # Check for Object start first
+                    object_start_pattern = fr'"{key}"\s*:\s*{{'
+                    obj_match = re.search(object_start_pattern, clean, re.DOTALL)
+
+                    if obj_match:
+                        # We found "key": { ...
+                        # Use bracket balancing starting from the open brace
+                        start_idx = obj_match.end() - 1 # Position of '{'
+                        # We can reuse extract_balanced_json logic but starting from specific index? 
+                        # extract_balanced_json searches from text.find('{').
+                        # Let's just slice and call it.
+                        substring = clean[start_idx:]
+                        balanced_obj = extract_balanced_json(substring)
+                        if balanced_obj:
+                            try:
+                                # recursive parse of the inner object
+                                inner_data = json.loads(balanced_obj)
+                                data = {key: inner_data}
+                            except:
+                                # Try evaluating as python dict
+                                try:
+                                    inner_data = ast.literal_eval(balanced_obj)
+                                    data = {key: inner_data}
+                                except:
+                                    pass
+
+                    # Check for String match if no object found or object parse failed
+                    if data is None:
+                        string_content_pattern = r'(?:\\.|[^"\\])*'
+                        capture_pattern = fr'"{key}"\s*:\s*("(?P<val>{string_content_pattern})")'
+                        match = re.search(capture_pattern, clean, re.DOTALL)
+                        if match:
+                             raw_val = match.group('val')
+                             if raw_val.startswith('\\"') and raw_val.endswith('\\"'):
+                                 raw_val = raw_val[2:-2]
+
+                             # Unescape standard json escapes
+                             try:
+                                 wrapped = f'"{raw_val}"'
+                                 safe_val = json.loads(wrapped)
+                             except:
+                                 # Manual fallback
+                                 safe_val = raw_val.replace('\\"', '"').replace('\\n', '\n')
+
+                             data = {key: safe_val} 
+
+                    # Deep Rescue for "answer" specifically (common failure point)
+                    if data is None and key == "result":
+                         # New heuristic: "answer": " <capture> " \s* }
+                         # We assume the model outputs at least correct ending structure.
+                         deep_match = re.search(r'"answer"\s*:\s*"(.*)"\s*}\s*}', clean, re.DOTALL)
+                         if deep_match:
+                             raw_ans = deep_match.group(1)
+                             # Sanitize quotes: If we captured greedy, we might have captured "internal" quotes.
+                             # We just escape ALL quotes, then unescape the edges? No.
+                             # We assume standard text doesn't have \" unless escaping.
+                             # We simply replace " with ' blindly to make it valid JSON?
+                             safe_ans = raw_ans.replace('"', "'")
+                             data = {"result": {"status": "ACTIVE", "answer": safe_ans}}
+                except:
+                     pass
+
+            # 6. Last Resort: Permissive Match (Assuming simple { "key": "..." } structure)
+            if data is None:
+                try:
+                    # Capture everything from the first quote after key to the last quote before closing brace
+                    # This ignores internal escaping rules entirely.
+                    permissive_pattern = fr'"{key}"\s*:\s*"(.*)"\s*}}\s*$'
+                    match = re.search(permissive_pattern, clean, re.DOTALL)
+                    if match:
+                         raw_val = match.group(1)
+                         # Sanitize quotes blindly
+                         safe_val = raw_val.replace('\\"', '"').replace('"', "'") 
+                         data = {key: safe_val}
+                except:
+                    pass
+
+                if data is None: 
+                     return None, "JSON Decode Error"
+
+        # Check for error object
+        if isinstance(data, dict) and "error" in data and len(data.keys()) == 1:
+            return None, f"Model returned error object: {data['error']}"
+
+        # FIX: Crash Prevention
+        if data is None:
+            return None, "JSON parsing failed (all methods exhausted)"
+
+        # Validate Key Presence
+        if key and key not in data:
+             if isinstance(data, dict) and "answer_text" in data and key == "result":
+                 data = {"result": data["answer_text"]}
+             else:
+                return None, f"Missing key '{key}'."
+
+        val = data[key]
+
+        if isinstance(val, (dict, list, bool, int, float)):
+            return json.dumps(val), None
+        return str(val).strip(), None
+
+    except Exception as e:
+        return None, str(e)
+
+def parse_whole_json(raw: str) -> dict:
+    try:
+        balanced = extract_balanced_json(raw)
+        if balanced: return json.loads(balanced)
+        clean = raw.strip()
+        if "```" in clean:
+            match = re.search(r"```(?:json)?(.*?)```", clean, re.DOTALL)
+            if match: clean = match.group(1).strip()
+        start = clean.find("{")
+        end = clean.rfind("}") + 1
+        if start == -1: return {}
+        return json.loads(clean[start:end])
+    except:
+        return {}
\ No newline at end of file
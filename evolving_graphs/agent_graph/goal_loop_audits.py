@@ -0,0 +1,193 @@
+import logging
+from typing import Optional, Tuple
+from .semantic_gatekeeper import SemanticGatekeeper
+from .llm_profiles import model_for
+from .llm_telemetry import get_telemetry
+from .llm_budget import budget_exhausted
+from .validator_chain import Verdict
+from .evidence_extractor import audit_evidence, note_window_fallback
+from .goal_loop_parsing import clean_and_parse, unwrap_text
+from .goal_loop_checks import heuristic_audit
+from .goal_loop_prompts import build_relevance_prompt, build_accuracy_prompt, build_joint_prompt, build_evidence_prompt, build_rewrite_prompt
+
+class GoalLoopAuditor:
+    """The goal loop's LLM audits (relevance, accuracy, or both jointly) and the VAGUE-answer refinement."""
+
+    def __init__(self, gatekeeper: SemanticGatekeeper):
+        self.gatekeeper = gatekeeper
+
+    async def acheck_relevance(self, answer: str, goal: str, context_data: str, log_label: str) -> Verdict:
+        return await self._arefined_verdict(self._aaudit_relevance, answer, goal, context_data, log_label)
+
+    async def acheck_joint(self, answer: str, goal: str, context_data: str, log_label: str) -> Verdict:
+        return await self._arefined_verdict(self._aaudit_joint, answer, goal, context_data, log_label)
+
+    async def acheck_accuracy(self, answer: str, goal: str, context_data: str, log_label: str) -> Verdict:
+        return self._audit_verdict(*await self._aaudit_accuracy(answer, context_data, log_label))
+
+    def _audit_verdict(self, status: str, reason: str, answer: Optional[str] = None) -> Verdict:
+        # Only an explicit FAIL rejects; a VAGUE that survived its refinement is let through.
+        return Verdict("FAIL" if status == "FAIL" else "PASS", reason, answer)
+
+    async def _arefined_verdict(self, audit, answer: str, goal: str, context_data: str, log_label: str) -> Verdict:
+        """Runs a relevance-type audit; a VAGUE answer is refined once and audited again."""
+        status, reason = await audit(goal, answer, context_data, log_label)
+        # Special Handling for VAGUE (Marketing Fluff)
+        if status != "VAGUE":
+            return self._audit_verdict(status, reason)
+        if budget_exhausted(log_label):
+            return Verdict("FAIL", reason)
+        refined = await self._arefine_vague_answer(answer, context_data, log_label)
+        status, reason = await audit(goal, refined, context_data, f"{log_label}:ReAudit")
+        return self._audit_verdict(status, reason, refined)
+
+    async def _aaudit_relevance(self, goal: str, answer: str, context_data: str, log_label: str) -> Tuple[str, str]:
+        # --- 0. HEURISTIC CHECK (Fast & Strict) ---
+        heuristic_error = heuristic_audit(answer)
+        if heuristic_error:
+            return "FAIL", heuristic_error
+
+        # --- 1. LLM CHECK (Nuance) ---
+        raw = await self.gatekeeper.aexecute_with_feedback(
+            build_relevance_prompt(goal, answer, context_data), "status", verification_source=None, log_context=f"{log_label}:Audit:Relevance", expect_json=True
+        )
+        return self._interpret_relevance(raw, log_label)
+
+    def _interpret_relevance(self, raw: str, log_label: str) -> Tuple[str, str]:
+        data = clean_and_parse(raw, log_context=f"{log_label}:Audit:Relevance")
+
+        status = "FAIL"
+        reason = "Unknown error"
+
+        if isinstance(data, dict):
+            status = str(data.get("status", "FAIL")).upper()
+            reason = data.get("reason", "Relevance check failed.")
+        elif isinstance(data, str):
+            clean_str = data.strip().upper()
+            if "PASS" in clean_str:
+                status = "PASS"
+                reason = "Verified (String fallback)"
+            elif "VAGUE" in clean_str:
+                status = "VAGUE"
+                reason = "Vague (String fallback)"
+            else:
+                status = "FAIL"
+                reason = f"Invalid output format. Received: {clean_str}"
+        elif data is None:
+            status = "FAIL"
+            reason = "Empty response from model."
+
+        label = f"{log_label}:Audit:Relevance"
+        get_telemetry().record_verdict(label, model_for(label), status == "PASS")
+        return status, reason
+
+    async def _aaudit_accuracy(self, answer: str, context_data: str, log_label: str) -> Tuple[str, str]:
+        """
+        Audits the claim against its evidence window when one can be built (see evidence_extractor).
+        A window that does not support the claim is not trusted to reject it: the audit is repeated
+        on the full context.
+        """
+        window = audit_evidence(answer, context_data)
+        if window:
+            # A label of its own, so window verdicts are counted apart from full-context audits.
+            window_label = f"{log_label}:Audit:AccuracyWindow"
+            status, reason = self._interpret_accuracy(await self.gatekeeper.aexecute_with_feedback(
+                build_accuracy_prompt(answer, window, excerpt=True), "status", verification_source=None, log_context=window_label, expect_json=True
+            ), window_label)
+            if status == "PASS":
+                return status, reason
+            note_window_fallback()
+            logging.info(f"[{log_label}] Evidence window did not support the claim ({reason}). Re-auditing against the full context.")
+        label = f"{log_label}:Audit:Accuracy"
+        raw = await self.gatekeeper.aexecute_with_feedback(
+            build_accuracy_prompt(answer, context_data), "status", verification_source=None, log_context=label, expect_json=True
+        )
+        return self._interpret_accuracy(raw, label)
+
+    def _interpret_accuracy(self, raw: str, label: str) -> Tuple[str, str]:
+        data = clean_and_parse(raw, log_context=label)
+
+        status = "FAIL"
+        reason = "Fact verification failed."
+
+        if isinstance(data, dict):
+            status = str(data.get("status", "FAIL")).upper()
+            reason = data.get("reason", "Fact verification failed.")
+        elif isinstance(data, str):
+            clean_str = data.strip().upper()
+            if "PASS" in clean_str:
+                status = "PASS"
+                reason = "Verified (String fallback)"
+            else:
+                status = "FAIL"
+                reason = f"Invalid output format. Received: {clean_str}"
+        elif data is None:
+            status = "FAIL"
+            reason = "Empty response from model."
+
+        get_telemetry().record_verdict(label, model_for(label), "FAIL" not in status)
+        if "FAIL" in status:
+            return "FAIL", reason
+
+        return "PASS", "Verified"
+
+    async def _aaudit_joint(self, goal: str, answer: str, context_data: str, log_label: str) -> Tuple[str, str]:
+        """Relevance and accuracy in one LLM call, with the same (status, reason) contract as `_aaudit_relevance`."""
+        heuristic_error = heuristic_audit(answer)
+        if heuristic_error:
+            return "FAIL", heuristic_error
+
+        raw = await self.gatekeeper.aexecute_with_feedback(
+            build_joint_prompt(goal, answer, context_data), "audit", verification_source=None, log_context=f"{log_label}:Audit:Joint", expect_json=True
+        )
+        return self._interpret_joint(raw, log_label)
+
+    def _interpret_joint(self, raw: str, log_label: str) -> Tuple[str, str]:
+        """Folds both verdicts into one: relevance FAIL, then accuracy FAIL, then VAGUE, else PASS."""
+        label = f"{log_label}:Audit:Joint"
+        data = clean_and_parse(raw, log_context=label)
+        if isinstance(data, dict) and isinstance(data.get("audit"), dict):
+            data = data["audit"]
+
+        if isinstance(data, dict):
+            relevance = str(data.get("relevance", "FAIL")).upper()
+            accuracy = str(data.get("accuracy", "FAIL")).upper()
+            if "FAIL" in relevance:
+                status, reason = "FAIL", data.get("relevance_reason") or "Relevance check failed."
+            elif "FAIL" in accuracy:
+                status, reason = "FAIL", data.get("accuracy_reason") or "Fact verification failed."
+            elif "VAGUE" in relevance:
+                status, reason = "VAGUE", data.get("relevance_reason") or "Answer is too generic."
+            else:
+                status, reason = "PASS", "Verified"
+        elif data is None:
+            status, reason = "FAIL", "Empty response from model."
+        else:
+            status, reason = "FAIL", f"Invalid output format. Received: {str(data).strip().upper()}"
+
+        get_telemetry().record_verdict(label, model_for(label), status == "PASS")
+        return status, reason
+
+    async def _arefine_vague_answer(self, current_answer: str, context_data: str, log_label: str) -> str:
+        logging.info(f"[{log_label}] Triggering VAGUE refinement.")
+
+        ev_raw = await self.gatekeeper.aexecute_with_feedback(
+            build_evidence_prompt(current_answer, context_data), "evidence", verification_source=None, log_context=f"{log_label}:Refine:Evidence", expect_json=True
+        )
+        evidence = self._extract_evidence(ev_raw)
+        if not evidence: return current_answer
+
+        rew_raw = await self.gatekeeper.aexecute_with_feedback(
+            build_rewrite_prompt(current_answer, evidence), "answer", verification_source=None, log_context=f"{log_label}:Refine:Rewrite", expect_json=True
+        )
+        parsed = clean_and_parse(rew_raw)
+        return unwrap_text(parsed)
+
+    def _extract_evidence(self, ev_raw: str) -> str:
+        ev_data = clean_and_parse(ev_raw)
+        evidence = ""
+        if isinstance(ev_data, dict):
+            evidence = ev_data.get("evidence", "")
+        elif isinstance(ev_data, str):
+            evidence = ev_data
+        return evidence
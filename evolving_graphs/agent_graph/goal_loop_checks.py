@@ -0,0 +1,95 @@
+import re
+from typing import Optional
+
+from .validator_chain import Verdict
+
+
+def heuristic_audit(answer: str) -> Optional[str]:
+    """
+    DETERMINISTIC FILTER:
+    Catches known prompt leaks and meta-commentary that LLMs often miss.
+    """
+    lower_ans = answer.lower()
+    
+    # 1. Prompt Leakage (The "Without Repeating" bug)
+    # These are phrases common in system prompts but rare in actual documentation
+    leaks = [
+        "without repeating",
+        "repeating the instruction",
+        "ignoring guard clauses",
+        "return valid json",
+        "concise and factual",
+        "as an ai language model",
+        "do not mention",
+        "following the instructions"
+    ]
+    for leak in leaks:
+        if leak in lower_ans:
+            return f"FAIL: Instruction Leak detected. You included the prompt phrase '{leak}' in the output."
+
+    # 2. Meta-Description (The "Describes this class" bug)
+    # We want functional descriptions, not structural ones.
+    if "describes this class" in lower_ans or "describes the method" in lower_ans:
+        return "FAIL: Meta-commentary detected. Do not say what the code *describes*; say what the code *does* (e.g., 'Calculates...', 'Initializes...')."
+
+    return None
+
+def verify_grounding_hard(answer: str, source_code: str) -> Optional[str]:
+    # 1. Smart Grounding for Backticked Entities
+    claimed_entities = re.findall(r'`([^`]+)`', answer)
+    missing_entities = []
+    
+    for entity in claimed_entities:
+        clean_entity = entity.replace("()", "").strip()
+        if not clean_entity: continue
+        
+        # Skip special chars
+        if re.search(r'[\\#\*\?\[\]\(\)\{\}]', clean_entity):
+            continue
+
+        # Support Dot-Notation (e.g. `agent.run` passes if `agent` OR `run` exists)
+        parts = clean_entity.split('.')
+        found_any = False
+        for part in parts:
+            if not part: continue
+            if re.search(r'\b' + re.escape(part) + r'\b', source_code):
+                found_any = True
+                break
+        
+        if not found_any:
+            # Fallback: Check exact substring if it's not just word chars
+            if not re.match(r'^\w+$', clean_entity) and clean_entity in source_code:
+                 found_any = True
+        
+        if not found_any:
+            missing_entities.append(entity)
+
+    if missing_entities:
+        return f"GUARDRAIL FAILURE: You cited {missing_entities}, but these identifiers do not exist in the source code."
+
+    # 2. Heuristic: Catch Un-backticked Proper Nouns (Potential Classes)
+    # Only flag if the word matches a Class definition or Function definition in the source.
+    # This prevents flagging concepts like "LLM" or "Chroma" unless they are actual classes.
+    unbackticked = re.findall(r'(?<!^)(?<!\. )\b[A-Z][a-zA-Z0-9_]+\b', answer)
+    safe_words = {"The", "A", "An", "If", "When", "For", "In", "Return", "True", "False", "None", "Uses", "Imports"}
+    
+    suspicious = []
+    for w in unbackticked:
+        if w in safe_words: continue
+        # Check if it's actually a code entity definition
+        if re.search(r'class\s+' + re.escape(w) + r'\b', source_code) or \
+           re.search(r'def\s+' + re.escape(w) + r'\b', source_code):
+            suspicious.append(w)
+    
+    if suspicious:
+         return f"STYLE FAILURE: You mentioned {suspicious[:3]} without backticks. These match code definitions (Classes/Functions). Wrap them in backticks."
+
+    return None
+
+def check_heuristics(answer: str, goal: str, context_data: str, log_label: str) -> Verdict:
+    error = heuristic_audit(answer)
+    return Verdict("FAIL", error) if error else Verdict("PASS")
+
+def check_grounding_hard(answer: str, goal: str, context_data: str, log_label: str) -> Verdict:
+    error = verify_grounding_hard(answer, context_data)
+    return Verdict("FAIL", error) if error else Verdict("PASS")
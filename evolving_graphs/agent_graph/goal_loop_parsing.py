@@ -0,0 +1,40 @@
+import ast
+import json
+import logging
+import re
+from typing import Any
+
+
+def clean_and_parse(response: str, log_context: str = "Parse") -> Any:
+    if not response: return None
+    logging.info(f"[{log_context}] [RAW_RESPONSE]:\n{response}")
+    
+    clean = re.sub(r'\s*\(⚠️.*?\)$', '', response, flags=re.DOTALL)
+    clean = clean.replace("(Unverified) ", "").strip()
+    clean = clean.strip("`'\"")
+    
+    if clean.startswith("```"):
+        clean = clean.split("\n", 1)[1] if "\n" in clean else clean
+        if clean.endswith("```"): clean = clean[:-3]
+    
+    if clean.startswith("json"): clean = clean[4:].strip()
+
+    try: return json.loads(clean, strict=False)
+    except: pass
+    try: return ast.literal_eval(clean)
+    except: pass
+    try: return json.loads(clean.replace('\n', ' '))
+    except: return clean
+
+def unwrap_text(data: Any) -> str:
+    if isinstance(data, str): return data.strip()
+    if isinstance(data, dict):
+        for k in ["answer", "result", "summary", "description", "text"]:
+            if k in data and isinstance(data[k], str):
+                return data[k].strip()
+        string_values = [str(v).strip() for v in data.values() if isinstance(v, str)]
+        if string_values: return " ".join(string_values)
+        return "\n".join([unwrap_text(v) for v in data.values()])
+    if isinstance(data, list):
+        return "\n".join([f"- {unwrap_text(x)}" for x in data])
+    return str(data)
@@ -0,0 +1,126 @@
+def context_prefix(context_data: str) -> str:
+    """
+    Opening block shared verbatim by the drafter, audit and refinement prompts of a goal loop.
+    Keeping the large code context first and identical lets Ollama reuse its evaluated prefix;
+    role-specific instructions always come after it.
+    """
+    return f"### CODE CONTEXT\n{context_data}\n### END CODE CONTEXT\n"
+
+def build_drafter_prompt(goal: str, context_data: str, feedback: str) -> str:
+    if feedback:
+        instruction_block = f"""
+                <critical_instruction>
+                PREVIOUS ATTEMPT REJECTED: {feedback}
+                You MUST fix this specific error.
+                </critical_instruction>
+                """
+    else:
+        instruction_block = "Analyze the code above."
+
+    return context_prefix(context_data) + f"""
+            You are a Technical Documentation Expert, documenting the CODE CONTEXT above.
+            
+            ### TASK
+            Goal: {goal}
+            
+            {instruction_block}
+            
+            ### REQUIREMENTS
+            1. Be concise and factual.
+            2. Ignore guard clauses.
+            3. Use backticks for code elements (e.g., `process()`).
+            4. Do NOT mention instructions in the output (e.g. "without repeating").
+            5. Do NOT start with "The function" or "The module". Start with a VERB.
+            6. Return VALID JSON.
+            
+            ### EXAMPLE OUTPUT
+            {{ "answer": "Filters input using `process_data`." }}
+            
+            ### YOUR RESPONSE
+            """
+
+def build_relevance_prompt(goal: str, answer: str, context_data: str) -> str:
+    return context_prefix(context_data) + f"""
+        You are a Quality Control Supervisor, reviewing an answer about the CODE CONTEXT above.
+        
+        GOAL: "{goal}"
+        PROPOSED ANSWER: "{answer}"
+        
+        TASK: Determine if the PROPOSED ANSWER is acceptable.
+        
+        FAIL CONDITIONS:
+        1. **Irrelevant:** Does not answer the GOAL based on the CONTEXT.
+        2. **Meta-Commentary:** Says "The method describes..." or "is responsible for" instead of direct action (e.g. "Calculates...").
+        3. **Vague:** Uses generic words ("manages", "handles", "processes") without naming specific code elements.
+        4. **Un-Backticked Code:** Mentions function or class names without backticks.
+        
+        OUTPUT FORMAT:
+        Return JSON.
+        {{ "status": "PASS" }}
+        OR
+        {{ "status": "VAGUE", "reason": "Answer is too generic." }}
+        OR
+        {{ "status": "FAIL", "reason": "Explanation." }}
+        """
+
+def build_accuracy_prompt(answer: str, context_data: str, excerpt: bool = False) -> str:
+    """`excerpt` marks `context_data` as an evidence window rather than the whole context."""
+    source = "an EXCERPT of the SOURCE CODE: the definitions and uses of the identifiers the claim cites" if excerpt else "the SOURCE CODE"
+    return context_prefix(context_data) + f"""
+        You are a Code Auditor. The CODE CONTEXT above is {source}.
+        
+        CLAIM: "{answer}"
+        
+        TASK: Verify strictly against the SOURCE CODE.
+        1. Are the described logic/variables actually present and performing the stated action?
+        2. Did it hallucinate functionality or side effects not in the code?
+        3. Is the description technologically precise (e.g. "Initializes a dictionary" vs "Sets up data")?
+        
+        Return JSON: {{ "status": "PASS" }} or {{ "status": "FAIL", "reason": "Correction needed." }}
+        """
+
+def build_joint_prompt(goal: str, answer: str, context_data: str) -> str:
+    return context_prefix(context_data) + f"""
+        You are a Quality Control Supervisor and Code Auditor, reviewing an answer about the CODE CONTEXT above.
+        
+        GOAL: "{goal}"
+        PROPOSED ANSWER: "{answer}"
+        
+        TASK 1 - RELEVANCE: Is the PROPOSED ANSWER acceptable for the GOAL?
+        FAIL if it is irrelevant to the GOAL, uses meta-commentary ("The method describes...", "is responsible for")
+        instead of direct action, or mentions function or class names without backticks.
+        VAGUE if it uses generic words ("manages", "handles", "processes") without naming specific code elements.
+        
+        TASK 2 - ACCURACY: Verify the PROPOSED ANSWER strictly against the CODE CONTEXT.
+        FAIL if the described logic/variables are not present or do not perform the stated action, if it
+        hallucinates functionality or side effects, or if it is technologically imprecise ("Sets up data").
+        
+        OUTPUT FORMAT:
+        Return JSON.
+        {{ "audit": {{ "relevance": "PASS", "relevance_reason": "", "accuracy": "PASS", "accuracy_reason": "" }} }}
+        OR
+        {{ "audit": {{ "relevance": "VAGUE", "relevance_reason": "Answer is too generic.", "accuracy": "PASS", "accuracy_reason": "" }} }}
+        OR
+        {{ "audit": {{ "relevance": "PASS", "relevance_reason": "", "accuracy": "FAIL", "accuracy_reason": "Correction needed." }} }}
+        """
+
+def build_evidence_prompt(current_answer: str, context_data: str) -> str:
+    return context_prefix(context_data) + f"""
+        You wrote: "{current_answer}"
+        
+        This is too vague. Look at the CODE CONTEXT above.
+        Identify the SPECIFIC function name, class, or variable that performs this action.
+        
+        Return JSON: {{ "evidence": "name_of_function_or_variable" }}
+        """
+
+def build_rewrite_prompt(current_answer: str, evidence: str) -> str:
+    return f"""
+        ORIGINAL: "{current_answer}"
+        EVIDENCE: `{evidence}`
+        
+        Rewrite the ORIGINAL sentence to be concrete.
+        You MUST explicitly mention the EVIDENCE (using backticks).
+        
+        Return JSON: {{ "answer": "Use exact evidence to describe the action." }}
+        """
@@ -0,0 +1,68 @@
+from typing import Optional
+
+
+class BalancedJsonScanner:
+    """
+    Incremental, string-aware bracket balancer.
+    Text can be fed in arbitrary chunks; the scanner reports the first balanced
+    `{...}` object as soon as its closing brace arrives. When `required_key` is
+    set, balanced objects that do not mention that key are skipped.
+    """
+    def __init__(self, required_key: Optional[str] = None):
+        self.required_key = required_key
+        self._text = ""
+        self._pos = 0
+        self._start = -1
+        self._balance = 0
+        self._in_quote = False
+        self._escape_next = False
+        self.result: Optional[str] = None
+
+    @property
+    def length(self) -> int:
+        return len(self._text)
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Consumes a chunk. Returns the first matching object once complete, otherwise None."""
+        if self.result is not None:
+            return self.result
+        self._text += chunk
+        text = self._text
+
+        while self._pos < len(text):
+            if self._start == -1:
+                brace = text.find("{", self._pos)
+                if brace == -1:
+                    self._pos = len(text)
+                    return None
+                self._start = brace
+                self._pos = brace
+                self._balance = 0
+
+            char = text[self._pos]
+            self._pos += 1
+
+            if self._escape_next:
+                self._escape_next = False
+                continue
+
+            if self._in_quote:
+                if char == '\\':
+                    self._escape_next = True
+                elif char == '"':
+                    self._in_quote = False
+                continue
+
+            if char == '"':
+                self._in_quote = True
+            elif char == "{":
+                self._balance += 1
+            elif char == "}":
+                self._balance -= 1
+                if self._balance == 0:
+                    candidate = text[self._start:self._pos]
+                    self._start = -1
+                    if self.required_key is None or f'"{self.required_key}"' in candidate:
+                        self.result = candidate
+                        return candidate
+        return None
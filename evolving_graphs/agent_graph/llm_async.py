@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple, Union
+
+import ollama
+
+from .agent_config import LLM_STREAMING_ENABLED, LLM_STREAM_MAX_CHARS
+from .llm_backend import llm_router, llm_breaker, note_backend_failure, session_settings
+from .llm_response_store import lookup_cached_response, store_cached_response, lookup_semantic_response, store_semantic_response
+from .llm_response_store import replaying, replayed_response, record_response
+from .llm_breaker import LLMBackendUnavailable
+from .llm_limiter import limiter_slot
+from .llm_hedging import ahedged_call, hedge_delay, observe_latency
+from .llm_coalescer import AsyncSingleFlight
+from .llm_telemetry import get_telemetry, usage_from_response, estimate_usage
+from .llm_budget import get_governor
+from .json_stream_scanner import BalancedJsonScanner
+from . import llm_stats
+
+# Identical requests in flight on the same loop share one backend call.
+_single_flight = AsyncSingleFlight()
+
+def normalize_messages(prompt_or_messages: Union[str, List[Dict]]) -> List[Dict]:
+    if isinstance(prompt_or_messages, str):
+        return [{'role': 'user', 'content': prompt_or_messages}]
+    return prompt_or_messages
+
+def record_flight(shared: bool):
+    """Counts one resolved request as either a backend call or a coalesced follower."""
+    llm_stats.increment("coalesced_calls" if shared else "backend_calls")
+
+def record_call(log_context: str, model: str, attempt: int, started: float, messages: List[Dict], usage: Optional[Dict[str, Any]] = None, **flags):
+    """
+    Adds one per-call telemetry record; latency is measured from `started` (time.perf_counter).
+    Calls that reached the backend (not cached or coalesced) are charged to the budget governor.
+    """
+    prompt_chars = sum(len(m.get('content', '')) for m in messages)
+    get_telemetry().record(log_context, model, attempt, time.perf_counter() - started, prompt_chars, usage, **flags)
+    if not (flags.get("cached") or flags.get("shared")):
+        get_governor().charge(log_context, usage)
+
+def stream_usage(messages: List[Dict], content: str, final_chunk: Any, chunk_count: int, ttfc_s: Optional[float], stream_s: float) -> Dict[str, Any]:
+    """
+    Usage for a streamed call. A stream that reached `done` carries Ollama's own counts and durations.
+    One stopped early never gets them, so they are measured client-side: time to first chunk stands in
+    for load + prompt eval, and each chunk is one generated token. Only the prompt token count is estimated.
+    """
+    if final_chunk is not None and final_chunk.get('done'):
+        return dict(usage_from_response(final_chunk), ttfc_s=ttfc_s)
+    usage = estimate_usage(messages, content)
+    usage.update(eval_count=chunk_count, prompt_eval_duration_s=ttfc_s, ttfc_s=ttfc_s,
+                 eval_duration_s=stream_s - ttfc_s if ttfc_s is not None else None)
+    return usage
+
+def feed_stream_chunk(scanner: BalancedJsonScanner, piece: str) -> bool:
+    """Feeds one streamed chunk into the scanner. Returns True when generation should stop."""
+    if scanner.feed(piece) is not None:
+        llm_stats.increment("stream_early_stops")
+        return True
+    if scanner.length > LLM_STREAM_MAX_CHARS:
+        llm_stats.increment("stream_length_caps")
+        logging.warning(f"LLM stream exceeded {LLM_STREAM_MAX_CHARS} chars without a complete object. Cutting off.")
+        return True
+    return False
+
+async def _acollect_stream(chunks: AsyncIterator, stop_key: str, messages: List[Dict], started: float) -> Tuple[str, Dict[str, Any], bool]:
+    """
+    Returns (text, usage, complete); `started` is when the request was sent (time.perf_counter).
+    `complete` is False when LLM_STREAM_MAX_CHARS cut the stream before a balanced object arrived.
+    """
+    scanner = BalancedJsonScanner(stop_key)
+    parts = []
+    chunk = None
+    complete = True
+    ttfc_s = None
+    try:
+        async for chunk in chunks:
+            if ttfc_s is None:
+                ttfc_s = time.perf_counter() - started
+            piece = chunk['message']['content']
+            parts.append(piece)
+            if feed_stream_chunk(scanner, piece):
+                complete = scanner.result is not None or chunk.get('done', False)
+                break
+    finally:
+        # Closing the generator closes the HTTP response, which makes Ollama stop generating.
+        aclose = getattr(chunks, "aclose", None)
+        if aclose:
+            await aclose()
+    text = "".join(parts)
+    return text, stream_usage(messages, text, chunk, len(parts), ttfc_s, time.perf_counter() - started), complete
+
+async def achat_llm(model: str, prompt_or_messages: Union[str, List[Dict]], use_cache: bool = True, format: Optional[Dict] = None, options: Optional[Dict] = None, stream_until_key: Optional[str] = None, log_context: str = "General", attempt: int = 0) -> str:
+    """
+    Chat call on `ollama.AsyncClient`; the one implementation behind `chat_llm` as well.
+    Responses are served from the persistent response cache (or, for audits, the semantic cache) when
+    a matching request was seen before, and concurrent identical requests share one backend call.
+    Backend requests wait for a slot from the shared adaptive limiter (see `LLM_MAX_CONCURRENCY`),
+    go through the endpoint router, hedging and circuit breaker, and can be recorded or replayed
+    (LLM_BACKEND_MODE).
+
+    Args:
+        model (str): The model to use.
+        prompt_or_messages (Union[str, List[Dict]]): A single user prompt or a list of message dicts.
+        use_cache (bool): Set to False to bypass the response cache for this call.
+        format (Optional[Dict]): JSON schema passed to Ollama's `format` parameter to constrain the output.
+        options (Optional[Dict]): Ollama generation options (see llm_profiles.generation_options). Part of the cache key.
+        stream_until_key (Optional[str]): Stream and stop at the first complete JSON object containing this key.
+        log_context (str): Caller label used to attribute telemetry.
+        attempt (int): Retry index of the caller's feedback loop.
+
+    Returns:
+        str: The response content, or an "Error: ..." string on failure (same contract as `chat_llm`).
+
+    Raises:
+        LLMBackendUnavailable: The circuit breaker is open.
+    """
+    started = time.perf_counter()
+    messages = normalize_messages(prompt_or_messages)
+    reached_backend = False
+    try:
+        llm_stats.increment("requests")
+
+        key, cached = lookup_cached_response(model, messages, use_cache, format, options)
+        if cached is not None:
+            record_response(key, log_context, model, cached)
+            record_call(log_context, model, attempt, started, messages, cached=True)
+            return cached
+        near, probe = lookup_semantic_response(model, messages, log_context, use_cache, format, options)
+        if near is not None:
+            record_response(key, log_context, model, near)
+            record_call(log_context, model, attempt, started, messages, cached=True)
+            return near
+
+        session, keep_alive = session_settings(log_context)
+
+        async def _on_endpoint(client: ollama.AsyncClient) -> Tuple[str, Dict[str, Any], bool]:
+            nonlocal reached_backend
+            reached_backend = True
+            if stream_until_key and LLM_STREAMING_ENABLED:
+                sent = time.perf_counter()
+                chunks = await client.chat(model=model, messages=messages, format=format, options=options, keep_alive=keep_alive, stream=True)
+                return await _acollect_stream(chunks, stream_until_key, messages, sent)
+            response = await client.chat(model=model, messages=messages, format=format, options=options, keep_alive=keep_alive)
+            return response['message']['content'], usage_from_response(response), True
+
+        async def _call_backend() -> Tuple[str, Dict[str, Any]]:
+            if replaying():
+                content, usage, delay = replayed_response(key, log_context, model, messages)
+                async with limiter_slot(log_context):
+                    await asyncio.sleep(delay)
+                return content, usage
+            llm_breaker().check()
+            try:
+                async with limiter_slot(log_context) as slot:
+                    backend_started = time.perf_counter()
+                    (text, usage, complete), hedged = await ahedged_call(llm_router(), _on_endpoint, hedge_delay(log_context), session, log_context)
+                    if not complete:
+                        slot.fail()
+            except Exception as e:
+                note_backend_failure(e)
+                raise
+            latency = time.perf_counter() - backend_started
+            content = text.strip()
+            usage = dict(usage, hedged=hedged, truncated=not complete)
+            record_response(key, log_context, model, content, usage, latency)
+            if not complete:
+                # A cut-off answer is returned for the caller's repair/retry but never cached: with fixed
+                # seeds, every rerun would replay the same broken JSON.
+                note_backend_failure(RuntimeError(f"Stream cut at {LLM_STREAM_MAX_CHARS} chars without a complete object."))
+                return content, usage
+            llm_breaker().record_success()
+            observe_latency(log_context, latency)
+            store_cached_response(key, model, content, use_cache)
+            return content, usage
+
+        (content, usage), shared = await _single_flight.do(key, _call_backend)
+        record_flight(shared)
+        if not (shared or usage.get("truncated")):
+            store_semantic_response(probe, key, content, log_context)
+        record_call(log_context, model, attempt, started, messages, None if shared else usage, shared=shared)
+        return content
+    except asyncio.CancelledError:
+        # E.g. a losing speculative draft. Its request was still evaluated (at least in part), so it is
+        # recorded and charged with the estimated prompt tokens; the partial output is lost with the task.
+        if reached_backend:
+            record_call(log_context, model, attempt, started, messages, estimate_usage(messages, ""), cancelled=True)
+        raise
+    except LLMBackendUnavailable:
+        record_call(log_context, model, attempt, started, messages, error=True)
+        raise
+    except Exception as e:
+        logging.error(f"LLM Error: {e}")
+        record_call(log_context, model, attempt, started, messages, error=True)
+        return f"Error: LLM chat failed: {e}"
@@ -0,0 +1,51 @@
+from typing import Optional, Tuple
+
+import httpx
+
+from .agent_config import LLM_ENDPOINTS, LLM_ENDPOINT_COOLDOWN_SECONDS, LLM_ENDPOINT_HEALTH_TIMEOUT, LLM_FAKE_SERVERS
+from .agent_config import LLM_BREAKER_THRESHOLD, LLM_SESSION_MODE, LLM_SESSION_KEEP_ALIVE, LLM_PRELOAD_MODELS
+from .agent_config import LLM_HTTP_MAX_CONNECTIONS, LLM_HTTP_KEEPALIVE_EXPIRY
+from .llm_router import EndpointRouter, get_router, is_endpoint_fault
+from .llm_breaker import CircuitBreaker, LLMBackendUnavailable
+from .llm_labels import session_of
+
+# Trips after consecutive connection failures so a dead backend fails fast instead of burning retries.
+_breaker = CircuitBreaker(LLM_BREAKER_THRESHOLD)
+
+def llm_router() -> EndpointRouter:
+    """
+    The endpoint router configured by LLM_ENDPOINTS (or the fake servers when LLM_FAKE_SERVERS > 0),
+    with pooled keep-alive HTTP clients.
+    """
+    if LLM_FAKE_SERVERS > 0:
+        # Test fixture: imported only when configured, so live runs never load the HTTP server code.
+        from .llm_fake_server import fake_server_hosts
+        hosts = fake_server_hosts()
+    else:
+        hosts = LLM_ENDPOINTS
+    limits = httpx.Limits(max_connections=LLM_HTTP_MAX_CONNECTIONS, max_keepalive_connections=LLM_HTTP_MAX_CONNECTIONS,
+                          keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY)
+    return get_router(hosts, LLM_ENDPOINT_COOLDOWN_SECONDS, LLM_ENDPOINT_HEALTH_TIMEOUT, {"limits": limits})
+
+def llm_breaker() -> CircuitBreaker:
+    return _breaker
+
+def backend_available() -> bool:
+    """Health-checks every endpoint; True if at least one answers."""
+    return any(llm_router().health_check().values())
+
+def note_backend_failure(error: Exception):
+    """Feeds a failed backend call to the circuit breaker, which raises LLMBackendUnavailable when it trips."""
+    if isinstance(error, LLMBackendUnavailable):
+        return
+    if is_endpoint_fault(error):
+        _breaker.record_failure(error)
+
+def session_settings(log_context: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Returns (session key, keep_alive) for a call. The session key is None unless LLM_SESSION_MODE is on and
+    the call belongs to a goal loop. Session calls, and every call once LLM_PRELOAD_MODELS has pinned the
+    models, send LLM_SESSION_KEEP_ALIVE; otherwise a call would reset Ollama's unload timer to its default.
+    """
+    session = session_of(log_context) if LLM_SESSION_MODE else None
+    return session, (LLM_SESSION_KEEP_ALIVE if session or LLM_PRELOAD_MODELS else None)
@@ -0,0 +1,66 @@
+import logging
+import threading
+import time
+from typing import Callable
+
+from . import llm_stats
+
+
+class LLMBackendUnavailable(Exception):
+    """Raised instead of an "Error: ..." string once the LLM backend is considered down."""
+
+
+class CircuitBreaker:
+    """
+    Counts consecutive backend connection failures. After `threshold` of them the circuit opens:
+    every backend call fails fast with `LLMBackendUnavailable` until a probe succeeds.
+    Cached responses are unaffected because they never reach the breaker.
+    """
+    def __init__(self, threshold: int):
+        self._lock = threading.Lock()
+        self.threshold = max(1, threshold)
+        self.consecutive_failures = 0
+        self.is_open = False
+
+    def check(self):
+        """Call before a backend request. Raises while the circuit is open."""
+        if self.is_open:
+            llm_stats.increment("breaker_fast_fails")
+            raise LLMBackendUnavailable("LLM backend unavailable (circuit open).")
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+
+    def record_failure(self, error: Exception):
+        """Counts a connection-level failure. Raises `LLMBackendUnavailable` when this failure opens the circuit."""
+        with self._lock:
+            self.consecutive_failures += 1
+            tripped = not self.is_open and self.consecutive_failures >= self.threshold
+            if tripped:
+                self.is_open = True
+        if tripped:
+            llm_stats.increment("breaker_opened")
+            logging.error(f"[Breaker] {self.consecutive_failures} consecutive LLM failures. Circuit opened. Last error: {error}")
+            raise LLMBackendUnavailable(f"LLM backend unavailable: {error}") from error
+
+    def close(self):
+        with self._lock:
+            self.is_open = False
+            self.consecutive_failures = 0
+        logging.info("[Breaker] Backend reachable again. Circuit closed.")
+
+    def wait_until_available(self, probe: Callable[[], bool], interval_s: float, max_wait_s: float) -> bool:
+        """
+        Probes the backend every `interval_s` seconds until `probe()` succeeds (closing the circuit)
+        or `max_wait_s` has passed. Returns True if the backend came back.
+        """
+        deadline = time.monotonic() + max_wait_s
+        while True:
+            if probe():
+                self.close()
+                return True
+            if time.monotonic() + interval_s > deadline:
+                return False
+            logging.warning(f"[Breaker] Backend still unavailable. Next probe in {interval_s}s.")
+            time.sleep(interval_s)
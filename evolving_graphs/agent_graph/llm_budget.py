@@ -0,0 +1,106 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .agent_config import LLM_BUDGET_ENABLED, LLM_BUDGET_ENTITY_CALLS, LLM_BUDGET_ENTITY_TOKENS
+from .agent_config import LLM_BUDGET_MODULE_CALLS, LLM_BUDGET_MODULE_TOKENS, LLM_BUDGET_RUN_CALLS, LLM_BUDGET_RUN_TOKENS
+from .llm_labels import module_of, session_of
+
+_SCOPES = ("entity", "module", "run")
+
+
+def entity_of(log_context: str) -> str:
+    """The entity a call is charged to: its goal loop (the label before `:IterN`), or the call site label."""
+    label = log_context or ""
+    return session_of(label) or label.replace(":Grounding", "")
+
+
+class BudgetGovernor:
+    """
+    Counts backend calls and tokens (prompt + generated) per entity, per module and per run, and
+    reports which scope has run out. Callers stop retrying once `exhausted` returns a reason.
+    `limits` maps a scope to (max calls, max tokens); 0 means unlimited.
+    """
+    def __init__(self, limits: Dict[str, Tuple[int, int]], enabled: bool = True):
+        self._lock = threading.Lock()
+        self.enabled = enabled
+        self.limits = limits
+        self.usage: Dict[str, Dict[str, Dict[str, int]]] = {scope: {} for scope in _SCOPES}
+        # Entities that stopped early, with the reason they were given.
+        self.degraded: Dict[str, str] = {}
+
+    def _keys(self, log_context: str) -> Dict[str, str]:
+        return {"entity": entity_of(log_context), "module": module_of(log_context), "run": "run"}
+
+    def charge(self, log_context: str, usage: Optional[Dict[str, Any]] = None):
+        """Adds one backend call and its token counts to every scope of the label."""
+        tokens = 0
+        if usage:
+            tokens = (usage.get("prompt_eval_count") or 0) + (usage.get("eval_count") or 0)
+        with self._lock:
+            for scope, key in self._keys(log_context).items():
+                bucket = self.usage[scope].setdefault(key, {"calls": 0, "tokens": 0})
+                bucket["calls"] += 1
+                bucket["tokens"] += tokens
+
+    def exhausted(self, log_context: str) -> Optional[str]:
+        """Returns a reason such as "module calc_util.py call budget (400) exhausted", or None while within budget."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            for scope, key in self._keys(log_context).items():
+                max_calls, max_tokens = self.limits.get(scope, (0, 0))
+                bucket = self.usage[scope].get(key, {"calls": 0, "tokens": 0})
+                name = scope if scope == "run" else f"{scope} {key}"
+                if max_calls and bucket["calls"] >= max_calls:
+                    return f"{name} call budget ({max_calls}) exhausted"
+                if max_tokens and bucket["tokens"] >= max_tokens:
+                    return f"{name} token budget ({max_tokens}) exhausted"
+        return None
+
+    def mark_degraded(self, log_context: str, reason: str):
+        with self._lock:
+            self.degraded.setdefault(entity_of(log_context), reason)
+
+    def top_consumers(self, scope: str, n: int = 5) -> List[Tuple[str, Dict[str, int]]]:
+        with self._lock:
+            ranked = sorted(self.usage[scope].items(), key=lambda kv: (kv[1]["calls"], kv[1]["tokens"]), reverse=True)
+        return [(key, dict(bucket)) for key, bucket in ranked[:n]]
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            degraded = dict(self.degraded)
+        return {
+            "limits": {scope: {"calls": calls, "tokens": tokens} for scope, (calls, tokens) in self.limits.items()},
+            "run": self.usage["run"].get("run", {"calls": 0, "tokens": 0}),
+            "top_entities": self.top_consumers("entity"),
+            "top_modules": self.top_consumers("module"),
+            "degraded": degraded,
+        }
+
+    def reset(self):
+        with self._lock:
+            self.usage = {scope: {} for scope in _SCOPES}
+            self.degraded = {}
+
+
+_governor = BudgetGovernor({
+    "entity": (LLM_BUDGET_ENTITY_CALLS, LLM_BUDGET_ENTITY_TOKENS),
+    "module": (LLM_BUDGET_MODULE_CALLS, LLM_BUDGET_MODULE_TOKENS),
+    "run": (LLM_BUDGET_RUN_CALLS, LLM_BUDGET_RUN_TOKENS),
+}, enabled=LLM_BUDGET_ENABLED)
+
+def get_governor() -> BudgetGovernor:
+    return _governor
+
+def budget_exhausted(log_context: str) -> Optional[str]:
+    """Reason the label's entity, module or run is out of budget; None if the call may go ahead."""
+    reason = _governor.exhausted(log_context)
+    if reason:
+        _governor.mark_degraded(log_context, reason)
+        logging.warning(f"[Budget] {log_context}: {reason}. Keeping the best answer so far.")
+    return reason
+
+def unverified(answer: str, reason: str) -> str:
+    """Marks an answer accepted without passing its checks, in the gatekeeper's "(⚠️ ...)" suffix style."""
+    return f"{answer} (⚠️ Unverified: {reason})"
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+def request_key(model: str, messages: List[Dict], options: Optional[Dict[str, Any]] = None, **extra: Any) -> str:
+    """
+    Computes a stable content hash for an LLM request.
+    Identical model, options and message history always map to the same key.
+    """
+    payload = {
+        "model": model,
+        "messages": [{"role": m.get("role", ""), "content": m.get("content", "")} for m in messages],
+        "options": options or {},
+    }
+    # Extra request fields (e.g. format) only enter the hash when set, so older keys stay valid.
+    for name, value in extra.items():
+        if value is not None:
+            payload[name] = value
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent content-addressed store for LLM responses.
+    Entries expire after `ttl_seconds`; once `max_entries` is exceeded the
+    least recently used entries are evicted. The row count is tracked in memory
+    so that writes do not have to count the table.
+    """
+    def __init__(self, path: str, max_entries: int = 20000, ttl_seconds: int = 7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, content TEXT, "
+            "created_at REAL, last_access REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_created_at ON responses(created_at)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT content, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            content, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._size -= 1
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return content
+
+    def put(self, key: str, model: str, content: str):
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, content, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model, content, now, now)
+            )
+            if exists is None:
+                self._size += 1
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        if self.ttl_seconds:
+            cur = self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._size -= max(cur.rowcount, 0)
+            self.evictions += max(cur.rowcount, 0)
+        overflow = self._size - self.max_entries
+        if overflow > 0:
+            cur = self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            self._size -= max(cur.rowcount, 0)
+            self.evictions += max(cur.rowcount, 0)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": self._size}
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache(path: str, max_entries: int, ttl_seconds: int) -> Optional[ResponseCache]:
+    """Returns the process-wide cache, opening it on first use. Returns None if the store cannot be opened."""
+    global _cache
+    with _cache_lock:
+        if _cache is None or _cache.path != path:
+            try:
+                _cache = ResponseCache(path, max_entries=max_entries, ttl_seconds=ttl_seconds)
+            except sqlite3.Error as e:
+                logging.error(f"LLM cache unavailable at {path}: {e}")
+                return None
+        return _cache
@@ -0,0 +1,35 @@
+import asyncio
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+
+class AsyncSingleFlight:
+    """
+    Coalesces concurrent identical coroutines on one event loop.
+    The shared call runs as its own task, so cancelling one waiter does not
+    cancel the others; the task is cancelled only when every waiter has gone.
+    """
+    def __init__(self):
+        self._calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, List]]" = weakref.WeakKeyDictionary()
+
+    async def do(self, key: str, coro_fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Returns (result, shared). `shared` is True when the result came from another caller's call."""
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        entry = calls.get(key)
+        if entry is None:
+            task = loop.create_task(coro_fn())
+            entry = [task, 0]
+            calls[key] = entry
+            task.add_done_callback(lambda _t, k=key, e=entry: calls.pop(k, None) if calls.get(k) is e else None)
+
+        task = entry[0]
+        shared = entry[1] > 0
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            entry[1] -= 1
+            if entry[1] == 0 and not task.done():
+                task.cancel()
+            raise
@@ -0,0 +1,261 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from .agent_config import LLM_FAKE_SERVERS, LLM_FAKE_SERVER_SLOTS, LLM_FAKE_SERVER_LATENCY
+from .agent_config import LLM_FAKE_SERVER_MALFORMED_RATE, LLM_FAKE_SERVER_ERROR_RATE, LLM_FAKE_SERVER_DISCONNECT_RATE
+from .agent_config import LLM_FAKE_SERVER_SCRIPT
+
+# Values for keys the gatekeeper asks for when neither the script nor the schema decides.
+DEFAULT_SCRIPT: Dict[str, Any] = {
+    "audit_result": "PASS",
+    "reason": "Consistent with the provided code.",
+}
+_TEMPLATE_ANSWER = "Returns the value computed from its inputs."
+_CHUNK_CHARS = 8
+
+
+class FakeOllamaServer:
+    """
+    Local stand-in for the Ollama HTTP API (`/api/chat`, `/api/tags`, `/api/version`) for tests and load runs.
+
+    Answers are JSON objects built from the request's `format` schema, or from the "key '...'" instruction
+    of unconstrained prompts. `script` overrides values per key (a list is served round-robin).
+    At most `slots` requests generate at once; the others queue, like OLLAMA_NUM_PARALLEL.
+    Each request sleeps for a sampled prefill latency plus `per_token_s` per generated token, and can be
+    answered with malformed JSON (`malformed_rate`), an HTTP 500 (`error_rate`) or a dropped connection
+    (`disconnect_rate`).
+
+    `latency` is one of
+        {"distribution": "fixed", "seconds": s}
+        {"distribution": "uniform", "min_s": a, "max_s": b}
+        {"distribution": "lognormal", "median_s": m, "sigma": s}
+    plus an optional "per_token_s".
+    """
+    def __init__(self, port: int = 0, slots: int = 4, latency: Optional[Dict[str, Any]] = None,
+                 malformed_rate: float = 0.0, error_rate: float = 0.0, disconnect_rate: float = 0.0,
+                 script: Optional[Dict[str, Any]] = None, seed: int = 0, host: str = "127.0.0.1"):
+        self.latency = latency or {"distribution": "fixed", "seconds": 0.0}
+        self.malformed_rate = malformed_rate
+        self.error_rate = error_rate
+        self.disconnect_rate = disconnect_rate
+        self.script = dict(DEFAULT_SCRIPT, **(script or {}))
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, slots))
+        self._script_turns: Dict[str, int] = {}
+        self.counters = {"requests": 0, "errors": 0, "malformed": 0, "disconnects": 0, "cancelled_streams": 0,
+                         "queued": 0, "active": 0, "peak_queued": 0, "peak_active": 0}
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serves in a daemon thread. Returns the base URL to put in LLM_ENDPOINTS."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-ollama", daemon=True)
+            self._thread.start()
+            logging.info(f"[FakeOllama] Serving on {self.url}")
+        return self.url
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
+            if name in ("queued", "active"):
+                peak = f"peak_{name}"
+                self.counters[peak] = max(self.counters[peak], self.counters[name])
+
+    def _roll(self, rate: float) -> bool:
+        with self._lock:
+            return rate > 0 and self._rng.random() < rate
+
+    def prefill_seconds(self) -> float:
+        spec = self.latency
+        with self._lock:
+            kind = spec.get("distribution", "fixed")
+            if kind == "uniform":
+                return self._rng.uniform(spec.get("min_s", 0.0), spec.get("max_s", 0.0))
+            if kind == "lognormal":
+                return spec.get("median_s", 0.0) * self._rng.lognormvariate(0.0, spec.get("sigma", 0.5))
+            return spec.get("seconds", 0.0)
+
+    def _scripted(self, name: str) -> Any:
+        value = self.script[name]
+        if not isinstance(value, list):
+            return value
+        with self._lock:
+            turn = self._script_turns.get(name, 0)
+            self._script_turns[name] = turn + 1
+        return value[turn % len(value)]
+
+    def _value(self, name: str, spec: Dict[str, Any]) -> Any:
+        if name in self.script:
+            return self._scripted(name)
+        if spec.get("enum"):
+            return spec["enum"][0]
+        if spec.get("type") == "integer":
+            return spec.get("maximum", 1)
+        if spec.get("type") == "object" and spec.get("properties"):
+            return {field: self._value(field, sub) for field, sub in spec["properties"].items()}
+        return _TEMPLATE_ANSWER
+
+    def answer(self, body: Dict[str, Any]) -> str:
+        """Response text for a chat request: a JSON object with the requested key(s), possibly malformed."""
+        messages: List[Dict[str, Any]] = body.get("messages") or []
+        if not messages:
+            # Ollama answers an empty chat (a model preload) with an empty message.
+            return ""
+        schema = body.get("format")
+        if isinstance(schema, dict) and schema.get("properties"):
+            fields = {name: spec for name, spec in schema["properties"].items() if name in schema.get("required", [name])}
+        else:
+            prompt = "\n".join(m.get("content", "") for m in messages)
+            keys = re.findall(r"key '(\w+)'", prompt)
+            if keys:
+                fields = {keys[-1]: {}}
+            elif '"score"' in prompt:
+                fields = {"score": {"type": "integer", "maximum": 5}, "reason": {}}
+            else:
+                return _TEMPLATE_ANSWER
+        text = json.dumps({name: self._value(name, spec) for name, spec in fields.items()})
+        if self._roll(self.malformed_rate):
+            self._count("malformed")
+            # Unterminated object with a stray quote: fails json.loads and brace balancing alike.
+            return text[:-2] + '"'
+        return text
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def _make_handler(server: FakeOllamaServer):
+    class _Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 so pooled clients keep their connections alive.
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: Dict[str, Any]):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _write_chunk(self, payload: Dict[str, Any]):
+            data = (json.dumps(payload) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_GET(self):
+            if self.path.startswith("/api/tags"):
+                self._send_json(200, {"models": []})
+            elif self.path.startswith("/api/version"):
+                self._send_json(200, {"version": "0.0.0-fake"})
+            else:
+                self._send_json(200, {"status": "Ollama is running"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.startswith("/api/chat"):
+                self._send_json(404, {"error": f"{self.path} is not served by the fake server"})
+                return
+            server._count("requests")
+            server._count("queued")
+            with server._slots:
+                server._count("queued", -1)
+                server._count("active")
+                try:
+                    self._chat(body)
+                finally:
+                    server._count("active", -1)
+
+        def _chat(self, body: Dict[str, Any]):
+            started = time.perf_counter()
+            if server._roll(server.disconnect_rate):
+                server._count("disconnects")
+                self.close_connection = True
+                return
+            prefill = server.prefill_seconds()
+            time.sleep(prefill)
+            if server._roll(server.error_rate):
+                server._count("errors")
+                self._send_json(500, {"error": "injected failure"})
+                return
+            text = server.answer(body)
+            per_token_s = server.latency.get("per_token_s", 0.0)
+            base = {"model": body.get("model", ""), "created_at": _now()}
+            prompt_chars = sum(len(m.get("content", "")) for m in body.get("messages") or [])
+            final = dict(base, done=True, done_reason="stop", load_duration=0,
+                         prompt_eval_count=prompt_chars // 4, prompt_eval_duration=int(prefill * 1e9),
+                         eval_count=len(text) // 4)
+            if body.get("stream", True) is False:
+                time.sleep(per_token_s * len(text) / 4)
+                final.update(message={"role": "assistant", "content": text},
+                             eval_duration=int(per_token_s * len(text) / 4 * 1e9),
+                             total_duration=int((time.perf_counter() - started) * 1e9))
+                self._send_json(200, final)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for i in range(0, len(text), _CHUNK_CHARS):
+                    time.sleep(per_token_s * _CHUNK_CHARS / 4)
+                    self._write_chunk(dict(base, message={"role": "assistant", "content": text[i:i + _CHUNK_CHARS]}, done=False))
+                final.update(message={"role": "assistant", "content": ""},
+                             eval_duration=int(per_token_s * len(text) / 4 * 1e9),
+                             total_duration=int((time.perf_counter() - started) * 1e9))
+                self._write_chunk(final)
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # The client closed the stream (early stop or a lost hedge); stop generating like Ollama does.
+                server._count("cancelled_streams")
+                self.close_connection = True
+
+    return _Handler
+
+
+_servers: List[FakeOllamaServer] = []
+_servers_lock = threading.Lock()
+
+def fake_server_hosts() -> List[str]:
+    """
+    Starts LLM_FAKE_SERVERS in-process fake servers on free ports (once per process) and returns their URLs.
+    llm_util routes to these instead of LLM_ENDPOINTS when LLM_FAKE_SERVERS > 0.
+    """
+    with _servers_lock:
+        while len(_servers) < LLM_FAKE_SERVERS:
+            server = FakeOllamaServer(slots=LLM_FAKE_SERVER_SLOTS, latency=LLM_FAKE_SERVER_LATENCY,
+                                      malformed_rate=LLM_FAKE_SERVER_MALFORMED_RATE, error_rate=LLM_FAKE_SERVER_ERROR_RATE,
+                                      disconnect_rate=LLM_FAKE_SERVER_DISCONNECT_RATE, script=LLM_FAKE_SERVER_SCRIPT, seed=len(_servers))
+            server.start()
+            _servers.append(server)
+        return [server.url for server in _servers]
+
+def fake_servers() -> List[FakeOllamaServer]:
+    with _servers_lock:
+        return list(_servers)
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+import ollama
+
+from .agent_config import LLM_HEDGE_ENABLED, LLM_HEDGE_PERCENTILE, LLM_HEDGE_MIN_SAMPLES, LLM_HEDGE_WINDOW
+from .llm_labels import call_category
+from .llm_router import EndpointRouter
+from .llm_limiter import get_limiter, limiter_slot
+from . import llm_stats
+
+
+class LatencyTracker:
+    """Sliding window of recent backend latencies per call category."""
+    def __init__(self, window: int):
+        self._lock = threading.Lock()
+        self._window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def observe(self, category: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(category, deque(maxlen=self._window)).append(seconds)
+
+    def percentile(self, category: str, pct: float, min_samples: int) -> Optional[float]:
+        """Returns the pct-th percentile (nearest rank), or None until `min_samples` latencies were seen."""
+        with self._lock:
+            samples = sorted(self._samples.get(category, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        rank = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[rank]
+
+
+_latencies = LatencyTracker(LLM_HEDGE_WINDOW)
+
+def observe_latency(log_context: str, seconds: float):
+    _latencies.observe(call_category(log_context), seconds)
+
+def hedge_delay(log_context: str) -> Optional[float]:
+    """Seconds after which a call with this label gets a duplicate, or None when it should not be hedged."""
+    if not LLM_HEDGE_ENABLED:
+        return None
+    return _latencies.percentile(call_category(log_context), LLM_HEDGE_PERCENTILE, LLM_HEDGE_MIN_SAMPLES)
+
+async def _in_own_slot(coro: Awaitable[Any], log_context: str) -> Any:
+    """Runs a hedge under its own limiter slot, so duplicates count against the concurrency cap."""
+    async with limiter_slot(log_context):
+        return await coro
+
+async def ahedged_call(router: EndpointRouter, coro_fn: Callable[[ollama.AsyncClient], Awaitable[Any]], delay: Optional[float],
+                       session: Optional[str] = None, log_context: str = "General") -> Tuple[Any, bool]:
+    """
+    Runs `coro_fn(client)` through the router. If it has not finished after `delay` seconds and another
+    endpoint is available, a duplicate is sent there and the first successful result wins. The duplicate
+    takes its own limiter slot and is only sent if one is free right away. The losing request is
+    cancelled, which closes its HTTP connection or stream. `session` gives the primary request endpoint
+    affinity; the duplicate deliberately goes elsewhere.
+
+    Returns:
+        Tuple[Any, bool]: (result, whether a duplicate was sent).
+    """
+    if delay is None:
+        return await router.acall(coro_fn, session=session), False
+
+    primary_tried = []
+    primary = asyncio.ensure_future(router.acall(coro_fn, primary_tried, session))
+    tasks = [primary]
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not router.has_spare(primary_tried):
+            return await primary, False
+        if not get_limiter().has_free_slot():
+            llm_stats.increment("hedges_skipped_busy")
+            return await primary, False
+
+        llm_stats.increment("hedges_sent")
+        hedge = asyncio.ensure_future(_in_own_slot(router.acall(coro_fn, list(primary_tried)), log_context))
+        tasks.append(hedge)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        llm_stats.increment("hedge_wins")
+                    return task.result(), True
+        logging.warning("[Hedge] Primary and duplicate both failed.")
+        return primary.result(), True
+    finally:
+        # Also reached when the caller is cancelled: no request may outlive the call.
+        losers = [task for task in tasks if not task.done()]
+        for task in losers:
+            task.cancel()
+        if losers:
+            await asyncio.gather(*losers, return_exceptions=True)
@@ -0,0 +1,45 @@
+import re
+from typing import Optional
+
+# Ordered: the first matching marker decides the category of a log_context label.
+_CATEGORY_MARKERS = [
+    (":Audit:Relevance", "relevance_audit"),
+    (":Audit:Accuracy", "accuracy_audit"),
+    (":Audit:Joint", "joint_audit"),
+    (":Grounding:Batch", "batch_grounding"),
+    (":Grounding", "grounding"),
+    (":Refine:", "refinement"),
+    ("MapCritic", "critic"),
+    # Synthesis drafts are paragraphs, not one-liners; they outrank the generic drafter marker.
+    ("FastPath", "synthesis"),
+    ("SystemicSynthesis", "synthesis"),
+    ("GroundedSynthesis", "synthesis"),
+    (":Drafter", "drafter"),
+]
+
+_MODULE_PATTERN = re.compile(r"[\w\-]+\.py")
+
+def call_category(log_context: str) -> str:
+    """
+    Maps a log_context label (e.g. `Dep:x.py->y.py:Usage:Iter2:Audit:Accuracy`) to its call category.
+    Returns "general" for labels that carry no known marker.
+    """
+    label = log_context or ""
+    for marker, category in _CATEGORY_MARKERS:
+        if marker in label:
+            return category
+    return "general"
+
+def module_of(log_context: str) -> str:
+    """Returns the first module file name cited in a label, or "(project)" for project-level calls."""
+    match = _MODULE_PATTERN.search(log_context or "")
+    return match.group(0) if match else "(project)"
+
+def session_of(log_context: str) -> Optional[str]:
+    """
+    Returns the goal-loop part of a label (everything before `:IterN`), shared by the drafter,
+    audits and grounding checks of one TaskExecutor loop. None for labels outside a loop.
+    """
+    label = log_context or ""
+    index = label.find(":Iter")
+    return label[:index] if index != -1 else None
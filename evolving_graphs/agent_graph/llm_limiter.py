@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+from .agent_config import LLM_MAX_CONCURRENCY, LLM_ADAPTIVE_CONCURRENCY, LLM_CONCURRENCY_MIN, LLM_CONCURRENCY_MAX
+from .agent_config import LLM_CONCURRENCY_LATENCY_FACTOR, LLM_CONCURRENCY_BACKOFF
+from .llm_labels import call_category
+
+
+class AdaptiveLimiter:
+    """
+    Process-wide cap on in-flight backend requests, shared by sync threads and event loops.
+
+    With `adaptive`, the cap follows AIMD: every on-time completion while the cap is in use adds
+    1/limit (about +1 per round of requests); a completion slower than `latency_factor` times its
+    category's baseline, or a failure, multiplies the cap by `backoff`. The baseline is the lower
+    quartile of recent latencies for the call category, since drafts and audits differ a lot.
+    At most one decrease happens per round of in-flight requests.
+    """
+    def __init__(self, initial: int, min_limit: int, max_limit: int, adaptive: bool = True,
+                 latency_factor: float = 2.0, backoff: float = 0.7, window: int = 100):
+        self._cond = threading.Condition()
+        self.adaptive = adaptive
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        if not adaptive:
+            self.max_limit = int(self.limit)
+        self.latency_factor = latency_factor
+        self.backoff = backoff
+        self.in_flight = 0
+        # Callers blocked on a slot: the client-side LLM queue depth.
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.increases = 0
+        self.decreases = 0
+        self.peak_limit = self.limit
+        self.low_limit = self.limit
+        self._window = window
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._started = 0
+        self._decrease_fence = 0
+
+    def _try_acquire(self) -> bool:
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
+            self._started += 1
+            return True
+        return False
+
+    def acquire(self) -> int:
+        """Blocks until a slot is free. Returns a ticket to pass to `release`."""
+        with self._cond:
+            if self._try_acquire():
+                return self._started
+            self._wait_begins()
+            try:
+                while not self._try_acquire():
+                    self._cond.wait()
+                return self._started
+            finally:
+                self.waiting -= 1
+
+    async def aacquire(self) -> int:
+        """Async `acquire`. Polls so that no thread is parked per waiting coroutine."""
+        with self._cond:
+            if self._try_acquire():
+                return self._started
+            self._wait_begins()
+        delay = 0.005
+        try:
+            while True:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.1)
+                with self._cond:
+                    if self._try_acquire():
+                        return self._started
+        finally:
+            with self._cond:
+                self.waiting -= 1
+
+    def has_free_slot(self) -> bool:
+        """True if a request could start right now without waiting."""
+        with self._cond:
+            return self.in_flight < int(self.limit)
+
+    def _wait_begins(self):
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+
+    def _baseline(self, category: str):
+        samples = sorted(self._latencies.get(category, ()))
+        if len(samples) < 5:
+            return None
+        return samples[len(samples) // 4]
+
+    def release(self, ticket: int, category: str, latency_s: float, ok: bool, adjust: bool = True):
+        """Frees the slot and, with `adjust`, adapts the limit to the request's outcome."""
+        with self._cond:
+            limit_in_use = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            self._cond.notify_all()
+            if not adjust:
+                return
+            if self.adaptive:
+                baseline = self._baseline(category)
+                slow = baseline is not None and latency_s > self.latency_factor * baseline
+                if (slow or not ok) and ticket > self._decrease_fence:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self.decreases += 1
+                    # Requests already in flight saw the old load; ignore their outcomes.
+                    self._decrease_fence = self._started
+                    cause = "Failed call" if not ok else f"Slow {category} call ({latency_s:.1f}s vs {baseline:.1f}s baseline)"
+                    logging.info(f"[Limiter] {cause}. Limit -> {self.limit:.1f}")
+                elif ok and not slow and limit_in_use:
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                    self.increases += 1
+                self.peak_limit = max(self.peak_limit, self.limit)
+                self.low_limit = min(self.low_limit, self.limit)
+            if ok:
+                self._latencies.setdefault(category, deque(maxlen=self._window)).append(latency_s)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {"limit": round(self.limit, 2), "in_flight": self.in_flight, "waiting": self.waiting,
+                    "peak_waiting": self.peak_waiting, "adaptive": self.adaptive,
+                    "increases": self.increases, "decreases": self.decreases,
+                    "peak_limit": round(self.peak_limit, 2), "low_limit": round(self.low_limit, 2)}
+
+
+class LimiterSlot:
+    """Holds one limiter slot for the duration of a backend call; use `with` or `async with`."""
+    def __init__(self, limiter: AdaptiveLimiter, log_context: str):
+        self.limiter = limiter
+        self.category = call_category(log_context)
+        self.failed = False
+
+    def fail(self):
+        """Marks a call that returned but did not succeed (e.g. a stream cut at its length cap) as a failure."""
+        self.failed = True
+
+    def __enter__(self):
+        self.ticket = self.limiter.acquire()
+        self.started = time.perf_counter()
+        return self
+
+    async def __aenter__(self):
+        self.ticket = await self.limiter.aacquire()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Cancellation (an aborted gather) says nothing about backend health.
+        cancelled = exc_type is not None and issubclass(exc_type, asyncio.CancelledError)
+        ok = exc_type is None and not self.failed
+        self.limiter.release(self.ticket, self.category, time.perf_counter() - self.started, ok, adjust=not cancelled)
+        return False
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+_limiter = AdaptiveLimiter(LLM_MAX_CONCURRENCY, LLM_CONCURRENCY_MIN, LLM_CONCURRENCY_MAX,
+                           adaptive=LLM_ADAPTIVE_CONCURRENCY,
+                           latency_factor=LLM_CONCURRENCY_LATENCY_FACTOR, backoff=LLM_CONCURRENCY_BACKOFF)
+
+def get_limiter() -> AdaptiveLimiter:
+    return _limiter
+
+def limiter_slot(log_context: str) -> LimiterSlot:
+    return LimiterSlot(_limiter, log_context)
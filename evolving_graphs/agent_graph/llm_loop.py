@@ -0,0 +1,40 @@
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def llm_loop() -> asyncio.AbstractEventLoop:
+    """
+    The process-wide event loop that runs every LLM call, started on a daemon thread on first use.
+    Sync callers block on it through `run_sync`, so they share the async clients, coalescing and
+    hedging with the async pipeline instead of running a second, thread-based implementation.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-loop", daemon=True).start()
+        return _loop
+
+def run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Runs a coroutine on the LLM loop and blocks until it finishes, returning its result or raising its error.
+    Must not be called from a running event loop (await the coroutine there instead).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        coro.close()
+        raise RuntimeError("run_sync() called from a running event loop; await the async API instead.")
+    future = asyncio.run_coroutine_threadsafe(coro, llm_loop())
+    try:
+        return future.result()
+    except BaseException:
+        # E.g. KeyboardInterrupt while waiting: stop the coroutine instead of leaving it running.
+        future.cancel()
+        raise
@@ -0,0 +1,14 @@
+from typing import Any, Dict
+
+from .agent_config import DEFAULT_MODEL, LLM_GENERATION_DEFAULTS, LLM_GENERATION_PROFILES, LLM_ROLE_MODELS
+from .llm_labels import call_category
+
+def generation_options(log_context: str) -> Dict[str, Any]:
+    """Returns the Ollama `options` for a call, chosen by the call category of its log_context label."""
+    options = dict(LLM_GENERATION_DEFAULTS)
+    options.update(LLM_GENERATION_PROFILES.get(call_category(log_context), {}))
+    return options
+
+def model_for(log_context: str) -> str:
+    """Returns the model tier for a call, from LLM_ROLE_MODELS by call category."""
+    return LLM_ROLE_MODELS.get(call_category(log_context), DEFAULT_MODEL)
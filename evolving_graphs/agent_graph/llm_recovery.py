@@ -0,0 +1,38 @@
+import logging
+from typing import Any, Callable
+
+from .agent_config import LLM_BREAKER_PROBE_SECONDS, LLM_BREAKER_MAX_WAIT_SECONDS
+from .llm_backend import llm_router, llm_breaker, backend_available
+from .llm_breaker import LLMBackendUnavailable
+from .llm_response_store import get_cache_stats, llm_recording
+from .llm_limiter import get_limiter
+from .llm_schemas import format_retry_summary
+from . import llm_stats
+
+
+def when_backend_available(step: Callable[[], Any], label: str) -> Any:
+    """
+    Runs `step`, pausing and probing while the LLM backend is down, then re-running it.
+    Raises LLMBackendUnavailable if the backend does not come back within LLM_BREAKER_MAX_WAIT_SECONDS.
+    """
+    while True:
+        try:
+            return step()
+        except LLMBackendUnavailable as e:
+            logging.warning(f"LLM backend unavailable during {label}: {e}. Pausing.")
+            if not llm_breaker().wait_until_available(backend_available, LLM_BREAKER_PROBE_SECONDS, LLM_BREAKER_MAX_WAIT_SECONDS):
+                raise
+            logging.info(f"Resuming {label}.")
+
+
+def log_llm_stats():
+    """Logs the LLM layer's running totals: cache, calls, JSON retries, endpoints, concurrency and recording."""
+    cache_stats = get_cache_stats()
+    logging.info(f"LLM Cache Stats: {cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['evictions']} evictions, {cache_stats['entries']} entries")
+    call_stats = llm_stats.snapshot()
+    logging.info(f"LLM Call Stats: {call_stats.get('requests', 0)} requests, {call_stats.get('backend_calls', 0)} backend calls, {call_stats.get('coalesced_calls', 0)} coalesced")
+    logging.info(f"JSON Format Stats: {format_retry_summary()}")
+    logging.info(f"LLM Endpoint Stats: {llm_router().stats()}")
+    logging.info(f"LLM Concurrency: {get_limiter().stats()}")
+    if llm_recording() is not None:
+        logging.info(f"LLM Recording: {llm_recording().stats()}")
@@ -0,0 +1,122 @@
+import atexit
+import gzip
+import json
+import logging
+import os
+import threading
+import zlib
+from typing import Any, Dict, List, Optional
+
+
+class ReplayMiss(Exception):
+    """A replayed run sent a request that is not in the recording."""
+
+
+class LLMRecording:
+    """
+    Request/response pairs of a run, keyed by `request_key` and stored as gzip-compressed JSON lines.
+    Only the key, label, model, response text, token counts and backend latency are kept; prompts are
+    not stored, which keeps recordings small. Recording appends, so several runs can feed one file.
+    New entries are written as a complete gzip member every `flush_every` entries and on exit.
+    """
+    def __init__(self, path: str, flush_every: int = 20):
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._pending: List[str] = []
+        self.recorded = 0
+        self.hits = 0
+        self.misses: List[Dict[str, Any]] = []
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self._entries[entry["key"]] = entry
+        except (EOFError, OSError, zlib.error, ValueError) as e:
+            # An interrupted recording ends in a truncated member; keep what was read.
+            logging.warning(f"[Replay] Recording {self.path} ends early ({e}). Loaded {len(self._entries)} entries.")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: str, log_context: str, model: str, content: str, usage: Optional[Dict[str, Any]], latency_s: Optional[float]):
+        """Records one response (first response per key wins)."""
+        entry = {"key": key, "label": log_context, "model": model, "content": content,
+                 "prompt_eval_count": (usage or {}).get("prompt_eval_count"),
+                 "eval_count": (usage or {}).get("eval_count"),
+                 "latency_s": round(latency_s, 4) if latency_s is not None else None}
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = entry
+            self._pending.append(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.recorded += 1
+            if len(self._pending) >= self.flush_every:
+                self._flush()
+
+    def _flush(self):
+        # Each flush appends a self-contained gzip member; readers see the concatenation as one stream.
+        if self._pending:
+            with open(self.path, "ab") as f:
+                f.write(gzip.compress("".join(self._pending).encode("utf-8")))
+            self._pending = []
+
+    def get(self, key: str, log_context: str, model: str, preview: str = "") -> Dict[str, Any]:
+        """Returns the recorded entry for `key`. Raises ReplayMiss (and remembers the miss) if there is none."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            self.misses.append({"key": key, "label": log_context, "model": model, "prompt_preview": preview[:200]})
+        logging.warning(f"[Replay] No recorded response for {log_context} ({key[:12]}).")
+        raise ReplayMiss(f"No recorded response for request {key[:12]} ({log_context})")
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "recorded": self.recorded, "hits": self.hits, "misses": len(self.misses)}
+
+    def write_miss_report(self, path: str) -> Dict[str, Any]:
+        """Writes the replay hit/miss counts and every missed request (label, model, prompt preview) to `path`."""
+        with self._lock:
+            misses = list(self.misses)
+        report = dict(self.stats(), missed_requests=misses)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        if misses:
+            labels = sorted({m["label"] for m in misses})
+            logging.warning(f"[Replay] {len(misses)} request(s) missed the recording, e.g. {labels[:5]}. See {path}.")
+        return report
+
+
+_recording: Optional[LLMRecording] = None
+_recording_lock = threading.Lock()
+
+def get_recording(path: str) -> LLMRecording:
+    """Returns the process-wide recording, loading it on first use."""
+    global _recording
+    with _recording_lock:
+        if _recording is None or _recording.path != path:
+            if _recording is not None:
+                _recording.flush()
+            _recording = LLMRecording(path)
+            atexit.register(_recording.flush)
+        return _recording
+
+def replay_delay(entry: Dict[str, Any], latency_scale: float, latency_s: float) -> float:
+    """Simulated backend latency for a replayed response: the recorded latency scaled, plus a fixed offset."""
+    return max(0.0, (entry.get("latency_s") or 0.0) * latency_scale + latency_s)
+
+def replay_usage(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Token counts as recorded, in the shape of `usage_from_response`."""
+    return {"prompt_eval_count": entry.get("prompt_eval_count"), "eval_count": entry.get("eval_count")}
@@ -0,0 +1,125 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from .agent_config import LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS
+from .agent_config import LLM_BACKEND_MODE, LLM_RECORDING_PATH, LLM_REPLAY_MISS_REPORT_PATH
+from .agent_config import LLM_REPLAY_LATENCY_SCALE, LLM_REPLAY_LATENCY_SECONDS
+from .agent_config import LLM_SEMANTIC_CACHE_MODE, LLM_SEMANTIC_CACHE_THRESHOLD, LLM_SEMANTIC_CACHE_MAX_ENTRIES, LLM_SEMANTIC_CACHE_CATEGORIES
+from .llm_cache import request_key, get_response_cache
+from .llm_replay import LLMRecording, get_recording, replay_delay, replay_usage
+from .llm_semantic_cache import SemanticCache, get_semantic_cache, split_subject, verdict_of, log_lookup
+from .llm_labels import call_category
+from . import llm_stats
+
+# --- Record / Replay ---
+
+def replaying() -> bool:
+    return LLM_BACKEND_MODE == "replay"
+
+def llm_recording() -> Optional[LLMRecording]:
+    """The recording used by the "record" and "replay" backend modes; None when running live."""
+    if LLM_BACKEND_MODE not in ("record", "replay"):
+        return None
+    return get_recording(LLM_RECORDING_PATH)
+
+def replayed_response(key: str, log_context: str, model: str, messages: List[Dict]) -> Tuple[str, Dict[str, Any], float]:
+    """
+    Looks a request up in the recording.
+
+    Returns:
+        Tuple[str, Dict[str, Any], float]: (content, usage, simulated latency in seconds).
+
+    Raises:
+        ReplayMiss: The request is not in the recording.
+    """
+    preview = messages[-1].get('content', '') if messages else ""
+    entry = llm_recording().get(key, log_context, model, preview)
+    return entry["content"], replay_usage(entry), replay_delay(entry, LLM_REPLAY_LATENCY_SCALE, LLM_REPLAY_LATENCY_SECONDS)
+
+def record_response(key: str, log_context: str, model: str, content: str, usage: Optional[Dict[str, Any]] = None, latency_s: Optional[float] = None):
+    """Appends a response to the recording when LLM_BACKEND_MODE is "record"."""
+    if LLM_BACKEND_MODE == "record":
+        llm_recording().add(key, log_context, model, content, usage, latency_s)
+
+def write_replay_report() -> Optional[Dict[str, Any]]:
+    """In replay mode, writes the hit/miss report to LLM_REPLAY_MISS_REPORT_PATH and returns it."""
+    if not replaying():
+        return None
+    return llm_recording().write_miss_report(LLM_REPLAY_MISS_REPORT_PATH)
+
+# --- Response Cache ---
+
+def get_cache_stats() -> Dict[str, int]:
+    """Returns hit/miss/eviction counters of the persistent response cache."""
+    cache = get_response_cache(LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS) if LLM_CACHE_ENABLED else None
+    return cache.stats() if cache else {"hits": 0, "misses": 0, "evictions": 0, "entries": 0}
+
+def lookup_cached_response(model: str, messages: List[Dict], use_cache: bool = True, format: Optional[Dict] = None, options: Optional[Dict] = None) -> Tuple[str, Optional[str]]:
+    """
+    Computes the request key and looks the request up in the response cache.
+
+    Returns:
+        Tuple[str, Optional[str]]: (request key, cached content). Content is None on a miss or when caching is bypassed.
+    """
+    key = request_key(model, messages, options, format=format)
+    # A replayed run must depend on the recording only, not on the local cache.
+    if not (use_cache and LLM_CACHE_ENABLED) or replaying():
+        return key, None
+    cache = get_response_cache(LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS)
+    if not cache:
+        return key, None
+    return key, cache.get(key)
+
+def store_cached_response(key: str, model: str, content: str, use_cache: bool = True):
+    if not (use_cache and LLM_CACHE_ENABLED) or replaying():
+        return
+    cache = get_response_cache(LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS)
+    if cache:
+        cache.put(key, model, content)
+
+# --- Semantic Cache ---
+
+def semantic_cache() -> SemanticCache:
+    return get_semantic_cache(LLM_SEMANTIC_CACHE_THRESHOLD, LLM_SEMANTIC_CACHE_MAX_ENTRIES, LLM_SEMANTIC_CACHE_MODE)
+
+def lookup_semantic_response(model: str, messages: List[Dict], log_context: str, use_cache: bool = True, format: Optional[Dict] = None, options: Optional[Dict] = None) -> Tuple[Optional[str], Optional[Tuple]]:
+    """
+    Looks an exact-cache miss up in the semantic cache, for the categories in LLM_SEMANTIC_CACHE_CATEGORIES
+    and prompts that quote an answer or claim under review.
+
+    Returns:
+        Tuple[Optional[str], Optional[Tuple]]: (content to serve, probe). Content is only set in "on" mode
+        at or above the threshold. Pass the probe to `store_semantic_response` once the backend has answered.
+    """
+    category = call_category(log_context)
+    if LLM_SEMANTIC_CACHE_MODE not in ("shadow", "on") or category not in LLM_SEMANTIC_CACHE_CATEGORIES:
+        return None, None
+    if not use_cache or replaying():
+        return None, None
+    context, subject = split_subject(messages)
+    if not subject:
+        return None, None
+    cache = semantic_cache()
+    # The shared code context dominates a whole-prompt embedding, so near-duplicates must match it exactly
+    # (plus model, category, options and format); only the answer or claim under review is compared.
+    scope = request_key(model, [{"role": "context", "content": context}], options, format=format, category=category)
+    embedding = cache.embed(subject)
+    similarity, candidate = cache.lookup(scope, embedding)
+    if candidate is not None and cache.mode == "on" and similarity >= cache.threshold:
+        cache.observe(similarity, served=True)
+        llm_stats.increment("semantic_cache_hits")
+        log_lookup(log_context, similarity, cache.threshold, "hit")
+        return candidate, None
+    return None, (scope, embedding, similarity, candidate)
+
+def store_semantic_response(probe: Optional[Tuple], key: str, content: str, log_context: str):
+    """Adds a fresh backend answer to the semantic cache and, if there was a candidate, records whether its verdict matched."""
+    if probe is None:
+        return
+    scope, embedding, similarity, candidate = probe
+    cache = semantic_cache()
+    agreed = None
+    if candidate is not None:
+        agreed = verdict_of(candidate) == verdict_of(content)
+        log_lookup(log_context, similarity, cache.threshold, f"miss, earlier verdict {'agrees' if agreed else 'differs'}")
+    cache.observe(similarity, served=False, agreed=agreed)
+    cache.store(key, scope, embedding, content)
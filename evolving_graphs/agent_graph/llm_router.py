@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import ollama
+
+from . import llm_stats
+
+
+def is_endpoint_fault(error: Exception) -> bool:
+    """Request errors (bad format, invalid options) are the caller's fault and must not eject a host. A missing model (404) is host-specific."""
+    if isinstance(error, ollama.ResponseError):
+        return error.status_code >= 500 or error.status_code in (404, 429, -1)
+    return True
+
+
+class Endpoint:
+    """One Ollama host plus its routing state."""
+    def __init__(self, host: Optional[str], health_timeout: float, client_kwargs: Optional[Dict[str, Any]] = None):
+        self.host = host
+        self.client_kwargs = client_kwargs or {}
+        self.name = host or "default"
+        # One persistent client per endpoint: its httpx pool keeps connections alive between calls.
+        self.client = ollama.Client(host=host, **self.client_kwargs)
+        self.probe_client = ollama.Client(host=host, timeout=health_timeout)
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+    def is_available(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+
+class EndpointRouter:
+    """
+    Dispatches LLM calls across Ollama endpoints.
+    Picks the available endpoint with the fewest outstanding requests. An endpoint whose call
+    fails is ejected for `cooldown_s`; once the cooldown expires it must pass a health check
+    (a `/api/tags` listing) before it receives traffic again.
+    """
+    def __init__(self, hosts: List[Optional[str]], cooldown_s: float = 30.0, health_timeout: float = 2.0, client_kwargs: Optional[Dict[str, Any]] = None):
+        self._lock = threading.Lock()
+        self.cooldown_s = cooldown_s
+        self.endpoints = [Endpoint(host, health_timeout, client_kwargs) for host in (hosts or [None])]
+        # Session -> endpoint it last used, so a session's prompts hit the same KV cache (bounded LRU).
+        self._affinity: "OrderedDict[str, Endpoint]" = OrderedDict()
+        # AsyncClients bind to the loop that first uses them.
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, ollama.AsyncClient]]" = weakref.WeakKeyDictionary()
+
+    def check_health(self, endpoint: Endpoint) -> bool:
+        try:
+            endpoint.probe_client.list()
+            return True
+        except Exception as e:
+            logging.warning(f"[Router] Health check failed for {endpoint.name}: {e}")
+            return False
+
+    def health_check(self) -> Dict[str, bool]:
+        """Probes every endpoint; healthy ones are re-admitted, unhealthy ones ejected."""
+        results = {}
+        for endpoint in self.endpoints:
+            healthy = self.check_health(endpoint)
+            with self._lock:
+                if healthy:
+                    endpoint.ejected_until = 0.0
+                else:
+                    self._eject(endpoint)
+            results[endpoint.name] = healthy
+        return results
+
+    def has_expired(self) -> bool:
+        """True if an ejected endpoint is due for a health check."""
+        now = time.monotonic()
+        with self._lock:
+            return any(0 < e.ejected_until <= now for e in self.endpoints)
+
+    def _readmit_expired(self):
+        """Health-checks ejected endpoints whose cooldown has run out."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [e for e in self.endpoints if 0 < e.ejected_until <= now]
+            # Push the deadline out so concurrent callers do not probe the same endpoint.
+            for endpoint in expired:
+                endpoint.ejected_until = now + self.cooldown_s
+        for endpoint in expired:
+            if self.check_health(endpoint):
+                with self._lock:
+                    endpoint.ejected_until = 0.0
+                logging.info(f"[Router] Endpoint {endpoint.name} re-admitted.")
+
+    def _eject(self, endpoint: Endpoint):
+        endpoint.ejected_until = time.monotonic() + self.cooldown_s
+        endpoint.ejections += 1
+        llm_stats.increment("endpoint_ejections")
+
+    def acquire(self, exclude: Optional[List[Endpoint]] = None, probe: bool = True, session: Optional[str] = None) -> Optional[Endpoint]:
+        """
+        Reserves the least-loaded available endpoint. When every endpoint is ejected, the one that
+        comes back soonest is used anyway, so a flapping single host degrades to retries instead of errors.
+        Returns None only when all endpoints are in `exclude`. With `probe`, due health checks run first.
+        With `session`, the endpoint the session used last is preferred unless it is clearly busier.
+        """
+        if probe:
+            self._readmit_expired()
+        exclude = exclude or []
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude]
+            if not candidates:
+                return None
+            now = time.monotonic()
+            available = [e for e in candidates if e.is_available(now)]
+            if available:
+                endpoint = min(available, key=lambda e: e.outstanding)
+                pinned = self._affinity.get(session) if session else None
+                if pinned in available and pinned.outstanding <= endpoint.outstanding + 1:
+                    endpoint = pinned
+            else:
+                endpoint = min(candidates, key=lambda e: e.ejected_until)
+            if session:
+                self._affinity[session] = endpoint
+                self._affinity.move_to_end(session)
+                if len(self._affinity) > 4096:
+                    self._affinity.popitem(last=False)
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, ok: bool):
+        with self._lock:
+            endpoint.outstanding -= 1
+            if not ok:
+                endpoint.failures += 1
+                self._eject(endpoint)
+
+    def async_client(self, endpoint: Endpoint) -> ollama.AsyncClient:
+        loop = asyncio.get_running_loop()
+        clients = self._async_clients.setdefault(loop, {})
+        if endpoint.name not in clients:
+            clients[endpoint.name] = ollama.AsyncClient(host=endpoint.host, **endpoint.client_kwargs)
+        return clients[endpoint.name]
+
+    async def acall(self, coro_fn: Callable[[ollama.AsyncClient], Awaitable[Any]], tried: Optional[List[Endpoint]] = None, session: Optional[str] = None) -> Any:
+        """
+        Runs `coro_fn(client)` on the least-loaded endpoint, failing over to the others on errors.
+        `tried` lists endpoints to skip; endpoints used by this call are appended to it.
+        `session` enables endpoint affinity (see `acquire`). Cancellation releases the endpoint without ejecting it.
+        """
+        tried = [] if tried is None else tried
+        last_error: Optional[Exception] = None
+        while True:
+            # Health checks block; run them off the event loop. The reservation itself must not
+            # await, or a cancellation could land between reserving and the try block below.
+            if self.has_expired():
+                await asyncio.to_thread(self._readmit_expired)
+            endpoint = self.acquire(tried, probe=False, session=session)
+            if endpoint is None:
+                raise last_error or RuntimeError("No LLM endpoint left to try.")
+            tried.append(endpoint)
+            try:
+                result = await coro_fn(self.async_client(endpoint))
+            except asyncio.CancelledError:
+                self.release(endpoint, ok=True)
+                raise
+            except Exception as e:
+                if not is_endpoint_fault(e):
+                    self.release(endpoint, ok=True)
+                    raise
+                self.release(endpoint, ok=False)
+                logging.warning(f"[Router] {endpoint.name} failed ({e}); ejected for {self.cooldown_s}s.")
+                last_error = e
+                continue
+            self.release(endpoint, ok=True)
+            return result
+
+    def has_spare(self, exclude: List[Endpoint]) -> bool:
+        """True if an endpoint outside `exclude` is currently available."""
+        now = time.monotonic()
+        with self._lock:
+            return any(e.is_available(now) for e in self.endpoints if e not in exclude)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                e.name: {"requests": e.requests, "failures": e.failures, "ejections": e.ejections,
+                         "outstanding": e.outstanding, "available": e.is_available(now)}
+                for e in self.endpoints
+            }
+
+
+_router: Optional[EndpointRouter] = None
+_router_lock = threading.Lock()
+
+def get_router(hosts: List[Optional[str]], cooldown_s: float, health_timeout: float, client_kwargs: Optional[Dict[str, Any]] = None) -> EndpointRouter:
+    """Returns the process-wide router, creating it from the given settings on first use."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = EndpointRouter(hosts, cooldown_s, health_timeout, client_kwargs)
+        return _router
@@ -0,0 +1,129 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+from .agent_config import LLM_JSON_SCHEMA_ENABLED, LLM_JSON_SCHEMA_CONTROL_RATE
+from . import llm_stats
+
+_STRING = {"type": "string"}
+
+# Value schemas for every json_key the gatekeeper is asked for.
+JSON_KEY_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "answer": {
+        "type": "object",
+        "properties": {"answer": _STRING},
+        "required": ["answer"],
+    },
+    "result": {
+        "type": "object",
+        "properties": {"result": _STRING},
+        "required": ["result"],
+    },
+    "status": {
+        "type": "object",
+        "properties": {
+            "status": {"type": "string", "enum": ["PASS", "FAIL", "VAGUE"]},
+            "reason": _STRING,
+        },
+        "required": ["status"],
+    },
+    # Joint relevance + accuracy audit: both verdicts in one object.
+    "audit": {
+        "type": "object",
+        "properties": {
+            "audit": {
+                "type": "object",
+                "properties": {
+                    "relevance": {"type": "string", "enum": ["PASS", "FAIL", "VAGUE"]},
+                    "relevance_reason": _STRING,
+                    "accuracy": {"type": "string", "enum": ["PASS", "FAIL"]},
+                    "accuracy_reason": _STRING,
+                },
+                "required": ["relevance", "accuracy"],
+            },
+        },
+        "required": ["audit"],
+    },
+    "audit_result": {
+        "type": "object",
+        "properties": {"audit_result": _STRING},
+        "required": ["audit_result"],
+    },
+    "evidence": {
+        "type": "object",
+        "properties": {"evidence": _STRING},
+        "required": ["evidence"],
+    },
+    # Batched grounding verification: one scored entry per numbered claim.
+    "results": {
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "integer"},
+                        "score": {"type": "integer", "minimum": 0, "maximum": 5},
+                        "reason": _STRING,
+                    },
+                    "required": ["id", "score", "reason"],
+                },
+            },
+        },
+        "required": ["results"],
+    },
+    # Grounding verification returns a whole object rather than a single key.
+    "score": {
+        "type": "object",
+        "properties": {
+            "score": {"type": "integer", "minimum": 0, "maximum": 5},
+            "reason": _STRING,
+        },
+        "required": ["score", "reason"],
+    },
+}
+
+def schema_for_key(json_key: str) -> Dict[str, Any]:
+    """Returns the JSON schema for a gatekeeper key. Unknown keys get a single required string property."""
+    if json_key in JSON_KEY_SCHEMAS:
+        return JSON_KEY_SCHEMAS[json_key]
+    return {"type": "object", "properties": {json_key: _STRING}, "required": [json_key]}
+
+def select_json_format(json_key: str, prompt: str) -> Optional[Dict[str, Any]]:
+    """
+    Picks the `format` value for a JSON call: the key's schema, or None for unconstrained calls.
+    Control-group membership is derived from the prompt hash, so reruns make the same choice.
+    """
+    if not LLM_JSON_SCHEMA_ENABLED:
+        return None
+    if LLM_JSON_SCHEMA_CONTROL_RATE > 0:
+        bucket = int(hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8], 16) % 1000
+        if bucket < LLM_JSON_SCHEMA_CONTROL_RATE * 1000:
+            return None
+    return schema_for_key(json_key)
+
+def record_json_call(constrained: bool, format_retries: int):
+    """Counts one gatekeeper JSON exchange and the FORMAT FAIL retries it needed."""
+    mode = "constrained" if constrained else "unconstrained"
+    llm_stats.increment(f"json_calls_{mode}")
+    llm_stats.increment(f"format_retries_{mode}", format_retries)
+
+def format_retry_summary() -> str:
+    """
+    Summarizes FORMAT FAIL retries per mode. Retries saved are estimated from the
+    unconstrained control group's retry rate, when the run has one.
+    """
+    stats = llm_stats.snapshot()
+    c_calls = stats.get("json_calls_constrained", 0)
+    c_retries = stats.get("format_retries_constrained", 0)
+    u_calls = stats.get("json_calls_unconstrained", 0)
+    u_retries = stats.get("format_retries_unconstrained", 0)
+
+    summary = (f"constrained {c_calls} calls / {c_retries} format retries, "
+               f"unconstrained {u_calls} calls / {u_retries} format retries")
+    if c_calls and u_calls:
+        saved = c_calls * (u_retries / u_calls) - c_retries
+        summary += f", est. retries saved by constrained mode: {saved:.1f}"
+    elif c_calls:
+        summary += ", est. retries saved: n/a (no unconstrained control group; see LLM_JSON_SCHEMA_CONTROL_RATE)"
+    return summary
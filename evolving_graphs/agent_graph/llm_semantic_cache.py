@@ -0,0 +1,171 @@
+import json
+import logging
+import math
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+# The quoted answer or claim under review, as written by the audit and grounding prompt builders.
+_SUBJECT_PATTERN = re.compile(r'^\s*(?:PROPOSED ANSWER|CLAIM|Claim to Verify):\s*"(.*?)"\s*$', re.M | re.S)
+# Similarity bands reported in the stats, lowest first.
+_BANDS = (0.80, 0.85, 0.90, 0.95, 0.98, 0.99)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def split_subject(messages: List[Dict]) -> Tuple[str, str]:
+    """
+    Splits an audit prompt into lowercase, whitespace-collapsed (context, subject): the subject is the
+    answer or claim(s) under review, the context everything else (code, goal, instructions).
+    The subject is empty for prompts without one.
+    """
+    text = "\n".join(m.get("content", "") for m in messages)
+    subject = " ".join(_SUBJECT_PATTERN.findall(text))
+    context = _SUBJECT_PATTERN.sub("", text)
+    return _normalize(context), _normalize(subject)
+
+def hash_vector(text: str, dims: int = 1 << 20) -> Dict[int, float]:
+    """
+    Hashing-vectorizer embedding of a text: word unigrams and bigrams hashed into `dims` buckets,
+    weighted 1 + log(tf) and L2-normalized. Returned sparse, as {bucket: weight}.
+    """
+    words = _TOKEN_PATTERN.findall(text)
+    counts: Dict[int, int] = {}
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        bucket = zlib.crc32(feature.encode("utf-8")) % dims
+        counts[bucket] = counts.get(bucket, 0) + 1
+    vector = {bucket: 1.0 + math.log(tf) for bucket, tf in counts.items()}
+    norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+    return {bucket: w / norm for bucket, w in vector.items()}
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(bucket, 0.0) for bucket, w in a.items())
+
+def verdict_of(content: str) -> str:
+    """The decision part of an audit response: the first JSON value's first word (PASS, FAIL, VAGUE, a score)."""
+    try:
+        value = json.loads(content)
+        if isinstance(value, dict) and value:
+            value = next(iter(value.values()))
+        text = str(value)
+    except (ValueError, TypeError):
+        text = content
+    words = text.strip().split()
+    return words[0].strip("\"'.,:").upper() if words else ""
+
+
+class SemanticCache:
+    """
+    In-memory near-duplicate cache for LLM responses.
+
+    Only the answer or claim under review is embedded (with `hash_vector`); entries are grouped by scope
+    (model, call category, options, format and a hash of the rest of the prompt), so a response is only
+    reused for the same kind of call over the identical code context and instructions. A lookup returns the most similar
+    earlier response of the scope with its cosine similarity. `mode` is "shadow" (only measure: the call
+    still goes to the backend and its verdict is compared with the candidate's) or "on" (serve
+    candidates at or above `threshold`). Entries are evicted least recently used past `max_entries`.
+    """
+    def __init__(self, threshold: float = 0.95, max_entries: int = 2000, mode: str = "shadow"):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.mode = mode
+        self._lock = threading.Lock()
+        # key -> (scope, vector, word count, content)
+        self._entries: "OrderedDict[str, Tuple[str, Dict[int, float], int, str]]" = OrderedDict()
+        self.lookups = 0
+        self.hits = 0
+        self.exact = 0
+        self.bands: Dict[str, Dict[str, int]] = {}
+
+    def embed(self, text: str) -> Tuple[Dict[int, float], int]:
+        """The text's vector and word count, as taken by `lookup` and `store`."""
+        return hash_vector(text), len(_TOKEN_PATTERN.findall(text))
+
+    def lookup(self, scope: str, embedding: Tuple[Dict[int, float], int]) -> Tuple[float, Optional[str]]:
+        """Returns (similarity, content) of the closest earlier prompt in the scope; (0.0, None) if there is none."""
+        vector, words = embedding
+        # Near-duplicates have about the same length; skip entries too different to reach the lowest band.
+        slack = 1.0 - _BANDS[0]
+        best_key, best = None, (0.0, None)
+        with self._lock:
+            self.lookups += 1
+            candidates = [(key, entry) for key, entry in self._entries.items() if entry[0] == scope]
+        for key, (_, other, other_words, content) in candidates:
+            if abs(words - other_words) > slack * max(words, other_words):
+                continue
+            similarity = cosine(vector, other)
+            if similarity > best[0]:
+                best_key, best = key, (similarity, content)
+        if best_key is not None:
+            with self._lock:
+                if best_key in self._entries:
+                    self._entries.move_to_end(best_key)
+        return best
+
+    def store(self, key: str, scope: str, embedding: Tuple[Dict[int, float], int], content: str):
+        vector, words = embedding
+        with self._lock:
+            self._entries[key] = (scope, vector, words, content)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def observe(self, similarity: float, served: bool, agreed: Optional[bool] = None):
+        """Counts one lookup outcome in its similarity band; `agreed` is the shadow comparison, if any."""
+        band = next((f">={b:.2f}" for b in reversed(_BANDS) if similarity >= b), None)
+        with self._lock:
+            if served:
+                self.hits += 1
+            if similarity >= 0.999999:
+                self.exact += 1
+            if band is None:
+                return
+            bucket = self.bands.setdefault(band, {"lookups": 0, "compared": 0, "agreed": 0})
+            bucket["lookups"] += 1
+            if agreed is not None:
+                bucket["compared"] += 1
+                bucket["agreed"] += int(agreed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            bands = {band: dict(bucket) for band, bucket in sorted(self.bands.items())}
+            return {
+                "mode": self.mode,
+                "threshold": self.threshold,
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "near_identical": self.exact,
+                "by_similarity": bands,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_semantic_cache: Optional[SemanticCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache(threshold: float, max_entries: int, mode: str) -> SemanticCache:
+    """Returns the process-wide semantic cache, creating it on first use."""
+    global _semantic_cache
+    with _semantic_cache_lock:
+        if _semantic_cache is None:
+            _semantic_cache = SemanticCache(threshold, max_entries, mode)
+        return _semantic_cache
+
+def semantic_cache_stats() -> Optional[Dict[str, Any]]:
+    """Stats of the semantic cache, or None if it was never used in this process."""
+    return _semantic_cache.stats() if _semantic_cache else None
+
+def log_lookup(log_context: str, similarity: float, threshold: float, outcome: str):
+    logging.info(f"[SemanticCache] {log_context}: best similarity {similarity:.3f} (threshold {threshold:.2f}) -> {outcome}")
@@ -0,0 +1,63 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .agent_config import DEFAULT_MODEL, LLM_ROLE_MODELS, LLM_PRELOAD_MODELS, LLM_SESSION_KEEP_ALIVE
+from .llm_backend import llm_router
+from .llm_response_store import replaying
+from .llm_router import Endpoint
+from .semantic_gatekeeper import SemanticGatekeeper
+
+
+class LLMSession:
+    """
+    Per-run LLM resources, created once by CrawlerAgent.
+    Owns the pooled clients (via the endpoint router), preloads the configured models on every
+    endpoint in the background, and provides the single SemanticGatekeeper all analysts share.
+    """
+    def __init__(self, models: Optional[List[str]] = None):
+        self.router = llm_router()
+        self.gatekeeper = SemanticGatekeeper()
+        # Tiered models first-seen order, deduplicated.
+        self.models = models or list(dict.fromkeys([DEFAULT_MODEL, *LLM_ROLE_MODELS.values()]))
+        self._warm_up_thread: Optional[threading.Thread] = None
+        self.warm_up_seconds: Optional[float] = None
+
+    def warm_up(self) -> Optional[threading.Thread]:
+        """
+        Starts loading every model on every endpoint in a background thread and returns it.
+        An empty chat request makes Ollama load the model; `keep_alive` pins it for the session.
+        """
+        # A replayed run never contacts the backend.
+        if not LLM_PRELOAD_MODELS or replaying() or self._warm_up_thread is not None:
+            return self._warm_up_thread
+        self._warm_up_thread = threading.Thread(target=self._preload_all, name="llm-warm-up", daemon=True)
+        self._warm_up_thread.start()
+        return self._warm_up_thread
+
+    def _preload_all(self):
+        started = time.perf_counter()
+        jobs = [(endpoint, model) for endpoint in self.router.endpoints for model in self.models]
+        with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as pool:
+            list(pool.map(lambda job: self._preload(*job), jobs))
+        self.warm_up_seconds = time.perf_counter() - started
+        logging.info(f"[Session] Preloaded {len(self.models)} model(s) on {len(self.router.endpoints)} endpoint(s) in {self.warm_up_seconds:.1f}s.")
+
+    def _preload(self, endpoint: Endpoint, model: str):
+        try:
+            endpoint.client.chat(model=model, messages=[], keep_alive=LLM_SESSION_KEEP_ALIVE)
+        except Exception as e:
+            logging.warning(f"[Session] Could not preload {model} on {endpoint.name}: {e}")
+
+    def wait_until_warm(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the warm-up finished (or `timeout` passed). True if no warm-up is still running."""
+        if self._warm_up_thread is not None:
+            self._warm_up_thread.join(timeout)
+            return not self._warm_up_thread.is_alive()
+        return True
+
+    def health_check(self) -> Dict[str, bool]:
+        """Probes every endpoint; see EndpointRouter.health_check."""
+        return self.router.health_check()
@@ -0,0 +1,19 @@
+import threading
+from collections import Counter
+from typing import Dict
+
+# Process-wide counters for the LLM layer (requests, backend calls, coalesced calls, ...).
+_counters: Counter = Counter()
+_lock = threading.Lock()
+
+def increment(name: str, amount: int = 1):
+    with _lock:
+        _counters[name] += amount
+
+def snapshot() -> Dict[str, int]:
+    with _lock:
+        return dict(_counters)
+
+def reset():
+    with _lock:
+        _counters.clear()
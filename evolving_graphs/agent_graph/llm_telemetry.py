@@ -0,0 +1,118 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .llm_labels import call_category, module_of, session_of
+
+_NS = 1e9
+
+@dataclass
+class LLMCallRecord:
+    """One resolved chat_llm/achat_llm request."""
+    label: str
+    module: str
+    phase: str
+    model: str
+    attempt: int
+    latency_s: float
+    prompt_chars: int
+    prompt_eval_count: Optional[int] = None
+    eval_count: Optional[int] = None
+    load_duration_s: Optional[float] = None
+    prompt_eval_duration_s: Optional[float] = None
+    eval_duration_s: Optional[float] = None
+    cached: bool = False
+    shared: bool = False
+    error: bool = False
+    # Streams stopped early never get Ollama's final counts; the prompt token count is then chars / 4.
+    counts_estimated: bool = False
+    # Time to the first streamed chunk: load + prompt eval as seen by the client. Streamed calls only.
+    ttfc_s: Optional[float] = None
+    hedged: bool = False
+    # The stream was cut at LLM_STREAM_MAX_CHARS before a complete object arrived.
+    truncated: bool = False
+    # The caller was cancelled (e.g. a losing speculative draft) after the request reached the backend.
+    cancelled: bool = False
+    session: Optional[str] = None
+
+def usage_from_response(response: Any) -> Dict[str, Any]:
+    """Extracts token counts and durations (converted to seconds) from an Ollama chat response or final stream chunk."""
+    def _get(name):
+        try:
+            return response[name]
+        except (KeyError, TypeError, AttributeError):
+            return getattr(response, name, None)
+
+    usage = {"prompt_eval_count": _get("prompt_eval_count"), "eval_count": _get("eval_count")}
+    for name in ("load_duration", "prompt_eval_duration", "eval_duration"):
+        value = _get(name)
+        usage[f"{name}_s"] = value / _NS if value is not None else None
+    return usage
+
+def estimate_usage(messages: List[Dict], content: str) -> Dict[str, Any]:
+    """Rough token counts (chars / 4) for calls without final counts, e.g. streams stopped early."""
+    prompt_chars = sum(len(m.get('content', '')) for m in messages)
+    return {"prompt_eval_count": prompt_chars // 4, "eval_count": len(content) // 4, "counts_estimated": True}
+
+class LLMTelemetry:
+    """
+    Collects per-call LLM records, audit verdicts, validator runs and speculative rounds.
+    The aggregates are computed by llm_telemetry_summary and written by llm_telemetry_report.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records: List[LLMCallRecord] = []
+        self.verdicts: List[Tuple[str, str, bool]] = []
+        self.validations: Dict[str, Dict[str, float]] = {}
+        self.speculations: List[Tuple[int, Optional[int], int, float]] = []
+
+    def record(self, label: str, model: str, attempt: int, latency_s: float, prompt_chars: int,
+               usage: Optional[Dict[str, Any]] = None, cached: bool = False, shared: bool = False, error: bool = False,
+               cancelled: bool = False):
+        rec = LLMCallRecord(
+            label=label, module=module_of(label), phase=call_category(label), model=model, session=session_of(label),
+            attempt=attempt, latency_s=latency_s, prompt_chars=prompt_chars,
+            cached=cached, shared=shared, error=error, cancelled=cancelled, **(usage or {})
+        )
+        with self._lock:
+            self.records.append(rec)
+
+    def record_verdict(self, label: str, model: str, passed: bool):
+        """Records the PASS/FAIL outcome of an audit or grounding check, for per-tier pass rates."""
+        with self._lock:
+            self.verdicts.append((label, model, passed))
+
+    def record_validation(self, name: str, cost: float, passed: bool, seconds: float):
+        """Records one run of a goal-loop validator, for per-validator rejection rates."""
+        with self._lock:
+            bucket = self.validations.setdefault(name, {"cost": cost, "runs": 0, "rejections": 0, "seconds": 0.0})
+            bucket["runs"] += 1
+            bucket["rejections"] += int(not passed)
+            bucket["seconds"] += seconds
+
+    def record_speculation(self, drafts: int, winner: Optional[int], cancelled: int, seconds: float):
+        """Records one speculative goal-loop iteration: drafts started, the passing draft (None if none passed), drafts cancelled, wall time."""
+        with self._lock:
+            self.speculations.append((drafts, winner, cancelled, seconds))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copies of everything recorded so far; the summaries in llm_telemetry_summary work on these."""
+        with self._lock:
+            return {
+                "records": list(self.records),
+                "verdicts": list(self.verdicts),
+                "validations": {name: dict(bucket) for name, bucket in self.validations.items()},
+                "speculations": list(self.speculations),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.records = []
+            self.verdicts = []
+            self.validations = {}
+            self.speculations = []
+
+_telemetry = LLMTelemetry()
+
+def get_telemetry() -> LLMTelemetry:
+    return _telemetry
@@ -0,0 +1,100 @@
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from .llm_telemetry import get_telemetry
+from .llm_telemetry_summary import new_bucket, telemetry_summary
+
+def write_json(path: str, summary: Optional[Dict[str, Any]] = None):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary or telemetry_summary(), f, indent=2, sort_keys=True)
+
+def write_prometheus(path: str, summary: Optional[Dict[str, Any]] = None):
+    """Writes Prometheus text exposition format. Labels are kept to module and phase to bound cardinality."""
+    summary = summary or telemetry_summary()
+    records = get_telemetry().snapshot()["records"]
+    series: Dict[tuple, Dict[str, float]] = {}
+    for rec in records:
+        bucket = series.setdefault((rec.module, rec.phase), new_bucket())
+        bucket["calls"] += 1
+        bucket["backend_calls"] += int(not (rec.cached or rec.shared or rec.error))
+        bucket["errors"] += int(rec.error)
+        bucket["hedged"] += int(rec.hedged)
+        bucket["latency_s"] += rec.latency_s
+        bucket["prompt_tokens"] += rec.prompt_eval_count or 0
+        bucket["eval_tokens"] += rec.eval_count or 0
+
+    metrics = [
+        ("agent_llm_requests_total", "counter", "LLM requests including cache hits and coalesced calls.", "calls"),
+        ("agent_llm_backend_calls_total", "counter", "LLM requests that reached the backend.", "backend_calls"),
+        ("agent_llm_errors_total", "counter", "LLM requests that failed.", "errors"),
+        ("agent_llm_hedged_total", "counter", "Backend calls that sent a hedged duplicate.", "hedged"),
+        ("agent_llm_latency_seconds_total", "counter", "Summed wall latency of LLM requests.", "latency_s"),
+        ("agent_llm_prompt_tokens_total", "counter", "Prompt tokens evaluated by the backend.", "prompt_tokens"),
+        ("agent_llm_eval_tokens_total", "counter", "Tokens generated by the backend.", "eval_tokens"),
+    ]
+    lines = []
+    for name, kind, help_text, field_name in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (module, phase), bucket in sorted(series.items()):
+            lines.append(f'{name}{{module="{_escape(module)}",phase="{_escape(phase)}"}} {bucket[field_name]}')
+    concurrency = summary["concurrency"]
+    for name, help_text, value in (
+        ("agent_llm_concurrency_limit", "Current in-flight request limit (adaptive).", concurrency["limit"]),
+        ("agent_llm_concurrency_in_flight", "Backend requests currently in flight.", concurrency["in_flight"]),
+        ("agent_llm_concurrency_waiting", "Calls waiting for a limiter slot.", concurrency["waiting"]),
+    ):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+    for name, help_text, field_name in (
+        ("agent_validator_runs_total", "Goal-loop validator runs.", "runs"),
+        ("agent_validator_rejections_total", "Answers rejected by a goal-loop validator.", "rejections"),
+    ):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for validator, bucket in summary["validators"].items():
+            lines.append(f'{name}{{validator="{_escape(validator)}"}} {bucket[field_name]}')
+    lines.append("# HELP agent_llm_counter Process-wide LLM layer counters.")
+    lines.append("# TYPE agent_llm_counter gauge")
+    for counter, value in sorted(summary["counters"].items()):
+        lines.append(f'agent_llm_counter{{name="{_escape(counter)}"}} {value}')
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+def write_reports(json_path: str, prom_path: str):
+    summary = telemetry_summary()
+    write_json(json_path, summary)
+    write_prometheus(prom_path, summary)
+    top = sorted(summary["by_label"].items(), key=lambda kv: kv[1]["latency_s"], reverse=True)[:5]
+    for label, bucket in top:
+        logging.info(f"[Telemetry] Top cost: {label} -> {bucket['calls']} calls, {bucket['latency_s']:.1f}s, {bucket['prompt_tokens']} prompt tokens")
+    counters = summary["counters"]
+    logging.info(f"[Telemetry] Hedge rate: {summary['hedge_rate']:.1%} ({counters.get('hedges_sent', 0)} sent, {counters.get('hedge_wins', 0)} won by the duplicate)")
+    for model, bucket in summary["by_tier"].items():
+        pass_rate = f"{bucket['pass_rate']:.0%}" if bucket["pass_rate"] is not None else "n/a"
+        logging.info(f"[Telemetry] Tier {model}: {bucket['backend_calls']} backend calls, avg {bucket['avg_latency_s']:.2f}s, pass rate {pass_rate} of {bucket['verdicts']} verdicts")
+    reuse = summary["prompt_reuse"]
+    logging.info(f"[Telemetry] Prompt reuse: {reuse['warm_calls']} warm calls, est. {reuse['est_prompt_tokens_saved']} prompt tokens / {reuse['est_prompt_eval_s_saved']:.1f}s prompt eval saved ({reuse['prompt_eval_s']:.1f}s spent), est. {reuse['est_ttfc_s_saved']:.1f}s time to first chunk saved")
+    growth = ", ".join(f"#{attempt}: {b['avg_prompt_chars']:.0f}" for attempt, b in summary["by_attempt"].items())
+    logging.info(f"[Telemetry] Avg prompt chars per attempt: {growth}")
+    logging.info(f"[Telemetry] Concurrency: {summary['concurrency']}")
+    for name, bucket in summary["validators"].items():
+        logging.info(f"[Telemetry] Validator {name} (cost {bucket['cost']}): {bucket['rejections']}/{bucket['runs']} rejected ({bucket['rejection_rate']:.0%}), avg {bucket['avg_s']:.2f}s")
+    speculation = summary["speculation"]
+    if speculation:
+        logging.info(f"[Telemetry] Speculation: {speculation['passed_rounds']}/{speculation['rounds']} rounds passed, {speculation['alternate_wins']} won by an alternate draft ({speculation['alternate_win_rate']:.0%}); {speculation['extra_calls']} extra calls / {speculation['extra_tokens']} tokens, {speculation['cancelled']} drafts cancelled, avg round {speculation['avg_round_s']:.1f}s")
+    semantic = summary["semantic_cache"]
+    if semantic:
+        bands = ", ".join(f"{band}: {b['lookups']} ({b['agreed']}/{b['compared']} agree)" for band, b in semantic["by_similarity"].items())
+        logging.info(f"[Telemetry] Semantic cache ({semantic['mode']}, threshold {semantic['threshold']}): {semantic['hits']} hits / {semantic['lookups']} lookups ({semantic['hit_rate']:.1%}); {bands}")
+    budget = summary["budget"]
+    logging.info(f"[Telemetry] Budget: run used {budget['run']['calls']} calls / {budget['run']['tokens']} tokens, {len(budget['degraded'])} entities stopped early")
+    for scope, name in (("top_entities", "entity"), ("top_modules", "module")):
+        for key, bucket in budget[scope][:3]:
+            logging.info(f"[Telemetry] Budget {name} {key}: {bucket['calls']} calls, {bucket['tokens']} tokens")
+    logging.info(f"[Telemetry] Wrote {json_path} and {prom_path}")
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
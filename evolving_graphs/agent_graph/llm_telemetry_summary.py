@@ -0,0 +1,182 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .llm_telemetry import LLMCallRecord, get_telemetry
+from .llm_limiter import get_limiter
+from .llm_budget import get_governor
+from .llm_semantic_cache import semantic_cache_stats
+from . import llm_stats
+
+# Labels of calls made for speculative drafts 1..K-1 (TaskExecutor._aspeculate), i.e. beyond a K = 1 run.
+_EXTRA_DRAFT = re.compile(r":Draft[1-9]\d*:")
+
+def new_bucket() -> Dict[str, float]:
+    return {"calls": 0, "backend_calls": 0, "cached": 0, "shared": 0, "errors": 0, "hedged": 0, "cancelled": 0,
+            "latency_s": 0.0, "prompt_tokens": 0, "eval_tokens": 0,
+            "load_s": 0.0, "prompt_eval_s": 0.0, "eval_s": 0.0}
+
+def aggregate(records: List[LLMCallRecord], field_name: str) -> Dict[str, Dict[str, float]]:
+    """Sums calls, tokens and durations per value of one record field (module, phase, label, model)."""
+    buckets: Dict[str, Dict[str, float]] = {}
+    for rec in records:
+        bucket = buckets.setdefault(getattr(rec, field_name), new_bucket())
+        bucket["calls"] += 1
+        bucket["cached"] += int(rec.cached)
+        bucket["shared"] += int(rec.shared)
+        bucket["errors"] += int(rec.error)
+        bucket["hedged"] += int(rec.hedged)
+        bucket["cancelled"] += int(rec.cancelled)
+        bucket["backend_calls"] += int(not (rec.cached or rec.shared or rec.error))
+        bucket["latency_s"] += rec.latency_s
+        bucket["prompt_tokens"] += rec.prompt_eval_count or 0
+        bucket["eval_tokens"] += rec.eval_count or 0
+        bucket["load_s"] += rec.load_duration_s or 0.0
+        bucket["prompt_eval_s"] += rec.prompt_eval_duration_s or 0.0
+        bucket["eval_s"] += rec.eval_duration_s or 0.0
+    return buckets
+
+def tier_summary(records: List[LLMCallRecord], verdicts: List[Tuple[str, str, bool]]) -> Dict[str, Dict[str, float]]:
+    """Latency and verdict pass rate per model tier."""
+    tiers = aggregate(records, "model")
+    for bucket in tiers.values():
+        bucket.update({"verdicts": 0, "passed": 0})
+    for _, model, passed in verdicts:
+        bucket = tiers.setdefault(model, dict(new_bucket(), verdicts=0, passed=0))
+        bucket["verdicts"] += 1
+        bucket["passed"] += int(passed)
+    for bucket in tiers.values():
+        bucket["avg_latency_s"] = bucket["latency_s"] / bucket["backend_calls"] if bucket["backend_calls"] else 0.0
+        bucket["pass_rate"] = bucket["passed"] / bucket["verdicts"] if bucket["verdicts"] else None
+    return tiers
+
+def prompt_reuse_summary(records: List[LLMCallRecord]) -> Dict[str, Any]:
+    """
+    Estimates prompt-eval work saved by reusing a session's cached prompt prefix.
+    The first call of each session (and every call outside one) is cold. Per model, the cold calls'
+    chars-per-token ratio predicts how many prompt tokens a warm call would have evaluated from
+    scratch; the shortfall, priced at the warm call's own prompt-eval rate, counts as saved.
+    Streams stopped early have no prompt token count, so they are compared on time to first chunk
+    instead: the cold seconds-per-char rate predicts a warm call's cold TTFC, and the difference counts as saved.
+    """
+    records = [r for r in records if not (r.cached or r.shared or r.error)]
+    seen_sessions = set()
+    cold: Dict[str, List[float]] = {}
+    warm: List[LLMCallRecord] = []
+    for rec in records:
+        if rec.session is not None and rec.session in seen_sessions:
+            warm.append(rec)
+            continue
+        if rec.session is not None:
+            seen_sessions.add(rec.session)
+        # prompt chars / tokens for counted calls, prompt chars / TTFC seconds for streamed ones
+        totals = cold.setdefault(rec.model, [0, 0, 0, 0.0])
+        if rec.prompt_eval_count and not rec.counts_estimated:
+            totals[0] += rec.prompt_chars
+            totals[1] += rec.prompt_eval_count
+        if rec.ttfc_s is not None:
+            totals[2] += rec.prompt_chars
+            totals[3] += rec.ttfc_s
+
+    saved_tokens = 0.0
+    saved_s = 0.0
+    saved_ttfc_s = 0.0
+    for rec in warm:
+        token_chars, tokens, ttfc_chars, ttfc_s = cold.get(rec.model, (0, 0, 0, 0.0))
+        if tokens and rec.prompt_eval_count and not rec.counts_estimated:
+            missing = max(0.0, rec.prompt_chars * tokens / token_chars - rec.prompt_eval_count)
+            saved_tokens += missing
+            if rec.prompt_eval_duration_s:
+                saved_s += missing * rec.prompt_eval_duration_s / rec.prompt_eval_count
+        if ttfc_chars and rec.ttfc_s is not None:
+            saved_ttfc_s += max(0.0, rec.prompt_chars * ttfc_s / ttfc_chars - rec.ttfc_s)
+
+    def _avg_ttfc(recs: List[LLMCallRecord]) -> Optional[float]:
+        values = [r.ttfc_s for r in recs if r.ttfc_s is not None]
+        return sum(values) / len(values) if values else None
+
+    warm_ids = {id(r) for r in warm}
+    return {
+        "warm_calls": len(warm),
+        "cold_calls": len(records) - len(warm),
+        "prompt_eval_s": sum(r.prompt_eval_duration_s or 0.0 for r in records),
+        "est_prompt_tokens_saved": int(saved_tokens),
+        "est_prompt_eval_s_saved": saved_s,
+        "avg_ttfc_s_cold": _avg_ttfc([r for r in records if id(r) not in warm_ids]),
+        "avg_ttfc_s_warm": _avg_ttfc(warm),
+        "est_ttfc_s_saved": saved_ttfc_s,
+    }
+
+def prompt_growth_summary(records: List[LLMCallRecord]) -> Dict[int, Dict[str, float]]:
+    """Average prompt size per feedback-loop attempt index, to show how retries grow the prompt."""
+    growth: Dict[int, Dict[str, float]] = {}
+    for rec in records:
+        if rec.cached or rec.shared or rec.error:
+            continue
+        bucket = growth.setdefault(rec.attempt, {"calls": 0, "prompt_chars": 0, "prompt_tokens": 0})
+        bucket["calls"] += 1
+        bucket["prompt_chars"] += rec.prompt_chars
+        bucket["prompt_tokens"] += rec.prompt_eval_count or 0
+    for bucket in growth.values():
+        bucket["avg_prompt_chars"] = bucket["prompt_chars"] / bucket["calls"]
+        bucket["avg_prompt_tokens"] = bucket["prompt_tokens"] / bucket["calls"]
+    return dict(sorted(growth.items()))
+
+def validator_summary(validations: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    for bucket in validations.values():
+        bucket["rejection_rate"] = bucket["rejections"] / bucket["runs"] if bucket["runs"] else 0.0
+        bucket["avg_s"] = bucket["seconds"] / bucket["runs"] if bucket["runs"] else 0.0
+    return dict(sorted(validations.items(), key=lambda kv: kv[1]["cost"]))
+
+def speculation_summary(speculations: List[Tuple[int, Optional[int], int, float]], records: List[LLMCallRecord]) -> Optional[Dict[str, Any]]:
+    """
+    The speculative-drafting tradeoff: how often a draft other than draft 0 won (an iteration the
+    sequential loop would have had to retry, at best) against the calls and tokens spent on drafts
+    1..K-1, including their audits. None if no iteration was speculative.
+    """
+    if not speculations:
+        return None
+    wins: Dict[str, int] = {}
+    for _, winner, _, _ in speculations:
+        if winner is not None:
+            wins[str(winner)] = wins.get(str(winner), 0) + 1
+    extra = [rec for rec in records if _EXTRA_DRAFT.search(rec.label)]
+    rounds = len(speculations)
+    alternate_wins = sum(count for draft, count in wins.items() if draft != "0")
+    return {
+        "rounds": rounds,
+        "drafts": sum(s[0] for s in speculations),
+        "passed_rounds": sum(wins.values()),
+        "wins_by_draft": dict(sorted(wins.items())),
+        "alternate_wins": alternate_wins,
+        "alternate_win_rate": alternate_wins / rounds,
+        "cancelled": sum(s[2] for s in speculations),
+        "extra_calls": sum(1 for rec in extra if not (rec.cached or rec.shared or rec.error)),
+        "extra_tokens": sum((rec.prompt_eval_count or 0) + (rec.eval_count or 0) for rec in extra),
+        "avg_round_s": sum(s[3] for s in speculations) / rounds,
+    }
+
+def telemetry_summary() -> Dict[str, Any]:
+    """Everything the telemetry reports contain, computed from one snapshot of the recorder."""
+    snapshot = get_telemetry().snapshot()
+    records = snapshot["records"]
+    by_phase = aggregate(records, "phase")
+    totals = new_bucket()
+    for bucket in by_phase.values():
+        for k, v in bucket.items():
+            totals[k] += v
+    return {
+        "totals": totals,
+        "hedge_rate": totals["hedged"] / totals["backend_calls"] if totals["backend_calls"] else 0.0,
+        "by_module": aggregate(records, "module"),
+        "by_phase": by_phase,
+        "by_label": aggregate(records, "label"),
+        "by_tier": tier_summary(records, snapshot["verdicts"]),
+        "prompt_reuse": prompt_reuse_summary(records),
+        "by_attempt": prompt_growth_summary(records),
+        "validators": validator_summary(snapshot["validations"]),
+        "speculation": speculation_summary(snapshot["speculations"], records),
+        "counters": llm_stats.snapshot(),
+        "concurrency": get_limiter().stats(),
+        "budget": get_governor().summary(),
+        "semantic_cache": semantic_cache_stats(),
+    }
@@ -1,40 +1,35 @@
-import ollama
-import logging
+from typing import Union, List, Dict, Optional
 
-from typing import Union, List, Dict
+from .llm_async import achat_llm, normalize_messages
+from .llm_loop import run_sync
 
-def chat_llm(model: str, prompt_or_messages: Union[str, List[Dict]]) -> str:
+def chat_llm(model: str, prompt_or_messages: Union[str, List[Dict]], use_cache: bool = True, format: Optional[Dict] = None, options: Optional[Dict] = None, stream_until_key: Optional[str] = None, log_context: str = "General", attempt: int = 0) -> str:
     """
     Wrapper for the ollama chat LLM. Supports both simple prompts and full message history.
+    Runs `achat_llm` on the shared LLM event loop (see llm_loop) and blocks until it returns, so sync
+    and async callers share one implementation: response cache, coalescing, routing, hedging,
+    circuit breaker and record/replay (LLM_BACKEND_MODE).
 
     Args:
         model (str): The model to use.
         prompt_or_messages (Union[str, List[Dict]]): 
             - If str: A single user prompt.
             - If list: A list of message dicts [{'role': '...', 'content': '...'}]
+        use_cache (bool): Set to False to bypass the response cache for this call.
+        format (Optional[Dict]): JSON schema passed to Ollama's `format` parameter to constrain the output.
+        options (Optional[Dict]): Ollama generation options (see llm_profiles.generation_options). Part of the cache key.
+        stream_until_key (Optional[str]): If set (and LLM_STREAMING_ENABLED), stream the response and
+            cancel generation once a balanced JSON object containing this key has arrived.
+        log_context (str): Caller label (e.g. "Mechanism:calc_util.py:add:Audit:Relevance") used to attribute telemetry.
+        attempt (int): Retry index of the caller's feedback loop, recorded in telemetry.
 
     Returns:
-        str: The response content.
-    """
-    try:
-        if isinstance(prompt_or_messages, str):
-            messages = [{'role': 'user', 'content': prompt_or_messages}]
-        else:
-            messages = prompt_or_messages
-
-        # Log the full prompt/messages
-        # logging.info(f"LLM Request Messages:\n{messages}")
+        str: The response content, or an "Error: ..." string on failure.
 
-        response = ollama.chat(model=model, messages=messages)
-        content = response['message']['content'].strip()
-        
-        # Log full response
-        # logging.info(f"LLM Response:\n{content}")
-        
-        return content
-    except Exception as e:
-        logging.error(f"LLM Error: {e}")
-        return f"Error: LLM chat failed: {e}"
+    Raises:
+        LLMBackendUnavailable: The circuit breaker is open (the backend keeps refusing connections).
+    """
+    return run_sync(achat_llm(model, prompt_or_messages, use_cache, format, options, stream_until_key, log_context, attempt))
 
 def truncate_context(text: str, max_chars: int = 12000) -> str:
     """
@@ -1,18 +1,20 @@
 import os
 import re
 import tiktoken
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from .summary_models import ModuleContext, Alert, Claim
 from .semantic_gatekeeper import SemanticGatekeeper
 from .task_executor import TaskExecutor
+from .goal_loop_parsing import unwrap_text
 
 from .module_classifier import ModuleClassifier, ModuleArchetype
 from .component_analyst import ComponentAnalyst
 from .dependency_analyst import DependencyAnalyst
+from .agent_config import LLM_BATCH_VERIFY_ENABLED
 
 class ModuleContextualizer:
-    def __init__(self, file_path: str, graph_data: Dict[str, Any], dep_contexts: Dict[str, ModuleContext]):
+    def __init__(self, file_path: str, graph_data: Dict[str, Any], dep_contexts: Dict[str, ModuleContext], gatekeeper: Optional[SemanticGatekeeper] = None):
         self.file_path = file_path
         self.full_graph = graph_data
         self.data = graph_data.get(file_path, {})
@@ -20,14 +22,16 @@ class ModuleContextualizer:
         self.context = ModuleContext(file_path=file_path)
         self.module_name = os.path.basename(file_path)
         
-        self.gatekeeper = SemanticGatekeeper()
+        # The gatekeeper is stateless; a run shares one (LLMSession.gatekeeper) across modules.
+        self.gatekeeper = gatekeeper or SemanticGatekeeper()
         self.task_executor = TaskExecutor(self.gatekeeper)
         
         self.classifier = ModuleClassifier(self.module_name, self.data)
         self.archetype = self.classifier.classify()
         self.context.archetype = self.archetype.value 
         
-        self.comp_analyst = ComponentAnalyst(self.gatekeeper, self.task_executor)
+        # Functions (and each class's methods) finish together, so their claims can be verified in one batch.
+        self.comp_analyst = ComponentAnalyst(self.gatekeeper, self.task_executor, batch_verify=LLM_BATCH_VERIFY_ENABLED)
         self.dep_analyst = DependencyAnalyst(self.gatekeeper, self.task_executor)
 
         self.usage_map = self._build_usage_map()
@@ -303,6 +307,7 @@ class ModuleContextualizer:
                 "result", 
                 forbidden_terms=forbidden,
                 verification_source=self.data.get('source_code', ''),
+                verification_entities=self.data.get('entities'),
                 log_context=f"FastPath:{self.module_name}",
                 min_words=4
             )
@@ -339,7 +344,7 @@ class ModuleContextualizer:
         
         # Robustly unwrap any remaining JSON structures (fixes FastPath nested JSON artifacts)
         if role_text:
-            role_text = self.task_executor._unwrap_text(role_text)
+            role_text = unwrap_text(role_text)
             
         if not role_text:
             role_text = "Analysis failed to generate a role description."
@@ -0,0 +1,117 @@
+import inspect
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+from .llm_telemetry import get_telemetry
+
+
+@dataclass
+class Verdict:
+    """Outcome of one validator. `answer` is set when the validator rewrote the answer (e.g. a VAGUE refinement)."""
+    status: str
+    reason: str = ""
+    answer: Optional[str] = None
+
+    @property
+    def passed(self) -> bool:
+        return self.status == "PASS"
+
+
+@dataclass
+class Validator:
+    """
+    One check of a drafted answer: `check(answer, goal, context_data, log_label)` returns a Verdict,
+    or an awaitable of one for checks that call the LLM.
+    `cost` orders the chain (0 for local, deterministic checks; roughly the number of LLM calls otherwise).
+    """
+    name: str
+    cost: float
+    check: Callable[[str, str, str, str], Union[Verdict, Awaitable[Verdict]]]
+
+    @property
+    def local(self) -> bool:
+        return self.cost <= 0
+
+
+@dataclass
+class ChainResult:
+    status: str
+    reason: str
+    answer: str
+    # Validators the (final) answer passed, in order; failed_by names the one that rejected it.
+    passed: int
+    failed_by: Optional[str] = None
+    # Set when `stop` ended the chain before a paid validator, with its reason.
+    stopped: Optional[str] = None
+
+
+class ValidatorChain:
+    """
+    Runs validators cheapest first and stops at the first rejection, so local checks reject an
+    answer before any LLM audit is paid for. Validators with equal cost keep their given order;
+    `costs` overrides the cost of validators by name. When a validator rewrites the answer, the
+    local validators that already passed are run again on the new text.
+    Every outcome goes to the telemetry (`validators`) so the order can be tuned from rejection rates.
+    """
+    def __init__(self, validators: List[Validator], costs: Optional[Dict[str, float]] = None):
+        costs = costs or {}
+        for validator in validators:
+            if validator.name in costs:
+                validator.cost = costs[validator.name]
+        self.validators = sorted(validators, key=lambda v: v.cost)
+
+    @property
+    def names(self) -> List[str]:
+        return [v.name for v in self.validators]
+
+    def without(self, *names: str) -> "ValidatorChain":
+        """A chain with the named validators left out (e.g. audits that are done in a batch later)."""
+        return ValidatorChain([v for v in self.validators if v.name not in names])
+
+    def _record(self, validator: Validator, verdict: Verdict, started: float):
+        get_telemetry().record_validation(validator.name, validator.cost, verdict.passed, time.perf_counter() - started)
+
+    async def _verdict(self, validator: Validator, answer: str, goal: str, context_data: str, log_label: str) -> Verdict:
+        started = time.perf_counter()
+        verdict = validator.check(answer, goal, context_data, log_label)
+        if inspect.isawaitable(verdict):
+            verdict = await verdict
+        self._record(validator, verdict, started)
+        return verdict
+
+    async def _recheck_local(self, answer: str, goal: str, context_data: str, log_label: str, upto: int) -> Optional[ChainResult]:
+        for index, validator in enumerate(self.validators[:upto]):
+            if not validator.local:
+                continue
+            verdict = await self._verdict(validator, answer, goal, context_data, log_label)
+            if not verdict.passed:
+                logging.warning(f"[{log_label}] Validator '{validator.name}' rejected the rewritten answer: {verdict.reason}")
+                return ChainResult(verdict.status, verdict.reason, answer, index, validator.name)
+        return None
+
+    async def _after(self, index: int, verdict: Verdict, answer: str, goal: str, context_data: str, log_label: str) -> Optional[ChainResult]:
+        """Applies one verdict; returns the chain's result if it ends here."""
+        validator = self.validators[index]
+        if not verdict.passed:
+            logging.warning(f"[{log_label}] Validator '{validator.name}' rejected the answer: {verdict.reason}")
+            return ChainResult(verdict.status, verdict.reason, verdict.answer or answer, index, validator.name)
+        if verdict.answer is not None and verdict.answer != answer:
+            return await self._recheck_local(verdict.answer, goal, context_data, log_label, index)
+        return None
+
+    async def arun(self, answer: str, goal: str, context_data: str, log_label: str,
+                   stop: Optional[Callable[[], Optional[str]]] = None) -> ChainResult:
+        """Validates `answer`. `stop` is asked before every paid validator; a reason ends the chain unverified."""
+        for index, validator in enumerate(self.validators):
+            if stop and not validator.local:
+                reason = stop()
+                if reason:
+                    return ChainResult("STOPPED", reason, answer, index, stopped=reason)
+            verdict = await self._verdict(validator, answer, goal, context_data, log_label)
+            result = await self._after(index, verdict, answer, goal, context_data, log_label)
+            if result:
+                return result
+            answer = verdict.answer if verdict.answer is not None else answer
+        return ChainResult("PASS", "", answer, len(self.validators))
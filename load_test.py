@@ -0,0 +1,259 @@
+import argparse
+import json
+import logging
+import os
+import resource
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, List
+
+# Agent modules are imported inside the worker, after its config overrides are applied.
+from evolving_graphs.agent_graph.llm_fake_server import FakeOllamaServer
+
+GOAL = "Describe the architecture of the project."
+
+
+def make_synthetic_project(root: str, index: int, modules: int, functions: int) -> str:
+    """
+    Writes a small package: `modules` utility modules in a dependency chain (each importing the previous one)
+    plus an entry module importing the last. Identifiers carry `index` so parallel analyses never share
+    cache entries. Returns the path of the entry module.
+    """
+    os.makedirs(root, exist_ok=True)
+    for m in range(modules):
+        lines = []
+        if m > 0:
+            lines.append(f"from .stage{m - 1}_util import {', '.join(f'step{index}_{m - 1}_{f}' for f in range(functions))}\n")
+        lines.append(f"LIMIT_{index}_{m} = {10 + m}\n")
+        for f in range(functions):
+            body = f"    total = step{index}_{m - 1}_{f}(values)" if m > 0 else "    total = sum(values)"
+            lines.append(f"\ndef step{index}_{m}_{f}(values):\n{body}\n    return min(total * {f + 1}, LIMIT_{index}_{m})\n")
+        lines.append(f"\nclass Stage{index}_{m}:\n    def __init__(self):\n        self.seen = []\n\n"
+                     f"    def push(self, value):\n        self.seen.append(value)\n        return len(self.seen)\n")
+        with open(os.path.join(root, f"stage{m}_util.py"), "w", encoding="utf-8") as f:
+            f.write("".join(lines))
+    last = modules - 1
+    main_path = os.path.join(root, f"synthetic{index}_main.py")
+    with open(main_path, "w", encoding="utf-8") as f:
+        f.write(f"from .stage{last}_util import step{index}_{last}_0\n\n"
+                f"def run(values):\n    return step{index}_{last}_0(values)\n")
+    return main_path
+
+
+class _TimedMemory:
+    """Wraps ChromaMemory so every store operation is timed and its failures counted."""
+    def __init__(self, memory: Any, stats: Dict[str, float]):
+        self._memory = memory
+        self._stats = stats
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._memory, name)
+        if not callable(attr):
+            return attr
+        def _timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            except Exception:
+                self._stats["errors"] += 1
+                raise
+            finally:
+                self._stats["ops_s"] += time.perf_counter() - started
+                self._stats["ops"] += 1
+        return _timed
+
+
+def run_analysis(job: Dict[str, Any]) -> Dict[str, Any]:
+    """One analysis in its own process and working directory, through project_pulse or CrawlerAgent.run."""
+    from evolving_graphs.agent_graph import agent_config
+    for name, value in job["config"].items():
+        setattr(agent_config, name, value)
+    os.makedirs(job["workdir"], exist_ok=True)
+    os.chdir(job["workdir"])
+    if job["shared_chroma"] and not os.path.exists("chroma_db"):
+        os.symlink(job["shared_chroma"], "chroma_db")
+    logging.basicConfig(level=logging.WARNING)
+
+    from evolving_graphs.agent_graph.llm_limiter import get_limiter
+    from evolving_graphs.agent_graph.llm_telemetry_summary import telemetry_summary
+
+    queue_samples: List[int] = []
+    done = threading.Event()
+    def _sample():
+        while not done.wait(job["sample_interval"]):
+            stats = get_limiter().stats()
+            queue_samples.append(stats["in_flight"] + stats["waiting"])
+    threading.Thread(target=_sample, daemon=True).start()
+
+    chroma = {"open_s": 0.0, "ops": 0, "ops_s": 0.0, "errors": 0}
+    result: Dict[str, Any] = {"index": job["index"], "error": None}
+    started_at = time.time()
+    started = time.perf_counter()
+    try:
+        if job["mode"] == "crawler":
+            from evolving_graphs.agent_graph.agent_core import CrawlerAgent
+            opened = time.perf_counter()
+            try:
+                agent = CrawlerAgent(GOAL, job["main_path"])
+            except Exception:
+                chroma["errors"] += 1
+                raise
+            chroma["open_s"] = time.perf_counter() - opened
+            agent.memory = _TimedMemory(agent.memory, chroma)
+            agent.run()
+        else:
+            from evolving_graphs.agent_graph.agent_util import project_pulse
+            project_pulse(job["main_path"])
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        done.set()
+
+    totals = telemetry_summary()["totals"]
+    result.update(
+        started_at=started_at, finished_at=time.time(), latency_s=time.perf_counter() - started,
+        llm_calls=totals["calls"], backend_calls=totals["backend_calls"], llm_errors=totals["errors"],
+        prompt_tokens=totals["prompt_tokens"], eval_tokens=totals["eval_tokens"],
+        # ru_maxrss is in KiB on Linux.
+        max_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        avg_queue=statistics.mean(queue_samples) if queue_samples else 0.0,
+        peak_queue=max(queue_samples, default=0), peak_waiting=get_limiter().stats()["peak_waiting"],
+        chroma=chroma,
+    )
+    return result
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+def run_level(n: int, args: argparse.Namespace, out_dir: str) -> Dict[str, Any]:
+    """Runs `n` analyses at once and aggregates their measurements."""
+    server = None
+    endpoint = args.endpoint
+    if not endpoint:
+        latency = {"distribution": "lognormal", "median_s": args.latency_median, "sigma": args.latency_sigma, "per_token_s": args.per_token}
+        server = FakeOllamaServer(slots=args.slots, latency=latency, malformed_rate=args.malformed_rate, error_rate=args.error_rate)
+        endpoint = server.start()
+
+    config = {"LLM_ENDPOINTS": [endpoint], "LLM_FAKE_SERVERS": 0, "LLM_CACHE_ENABLED": args.use_cache}
+    level_dir = os.path.join(out_dir, f"level_{n}")
+    shared_chroma = os.path.abspath(os.path.join(out_dir, "chroma_db")) if args.shared_chroma else None
+    jobs = []
+    for i in range(n):
+        main_path = make_synthetic_project(os.path.join(level_dir, f"project_{i}"), i, args.modules, args.functions)
+        jobs.append({"index": i, "mode": args.mode, "main_path": main_path, "workdir": os.path.join(level_dir, f"work_{i}"),
+                     "config": config, "shared_chroma": shared_chroma, "sample_interval": args.sample_interval})
+
+    server_samples: List[int] = []
+    done = threading.Event()
+    if server:
+        def _sample_server():
+            while not done.wait(args.sample_interval):
+                stats = server.stats()
+                server_samples.append(stats["queued"] + stats["active"])
+        threading.Thread(target=_sample_server, daemon=True).start()
+
+    with ProcessPoolExecutor(max_workers=n, mp_context=get_context("spawn")) as pool:
+        results = list(pool.map(run_analysis, jobs))
+    done.set()
+    server_stats = server.stats() if server else None
+    if server:
+        server.stop()
+
+    ok = [r for r in results if not r["error"]]
+    makespan = max(r["finished_at"] for r in results) - min(r["started_at"] for r in results)
+    latencies = [r["latency_s"] for r in ok]
+    level = {
+        "analyses": n, "failed": n - len(ok), "errors": [r["error"] for r in results if r["error"]],
+        "makespan_s": makespan,
+        "throughput_per_min": 60.0 * len(ok) / makespan if makespan else 0.0,
+        "llm_calls_per_s": sum(r["llm_calls"] for r in results) / makespan if makespan else 0.0,
+        "latency_p50_s": _percentile(latencies, 50), "latency_p95_s": _percentile(latencies, 95),
+        "latency_max_s": max(latencies, default=0.0),
+        "client_queue_avg": statistics.mean(r["avg_queue"] for r in results),
+        "client_queue_peak": max(r["peak_queue"] for r in results),
+        "client_waiting_peak": max(r["peak_waiting"] for r in results),
+        "server_queue_avg": statistics.mean(server_samples) if server_samples else None,
+        "server_queue_peak": max(server_samples, default=None),
+        "mem_mb_avg": statistics.mean(r["max_rss_mb"] for r in results),
+        "mem_mb_max": max(r["max_rss_mb"] for r in results),
+        "chroma_open_s_avg": statistics.mean(r["chroma"]["open_s"] for r in results),
+        "chroma_ops_s_avg": statistics.mean(r["chroma"]["ops_s"] for r in results),
+        "chroma_errors": sum(r["chroma"]["errors"] for r in results),
+        "server": server_stats,
+        "runs": results,
+    }
+    logging.info(f"[LoadTest] N={n}: {level['throughput_per_min']:.2f} analyses/min, p95 {level['latency_p95_s']:.1f}s, "
+                 f"{level['failed']} failed")
+    return level
+
+
+def _fmt(value: Any, spec: str = ".2f") -> str:
+    return "-" if value is None else format(value, spec)
+
+def render_report(levels: List[Dict[str, Any]], args: argparse.Namespace) -> str:
+    lines = [f"# Load Test ({args.mode}, {args.modules} modules x {args.functions} functions)", "",
+             "| N | analyses/min | LLM calls/s | p50 s | p95 s | max s | client queue avg/peak | server queue avg/peak | mem MB avg/max | chroma open s | chroma ops s | chroma errors | failed |",
+             "|---|---|---|---|---|---|---|---|---|---|---|---|---|"]
+    for lv in levels:
+        lines.append(f"| {lv['analyses']} | {_fmt(lv['throughput_per_min'])} | {_fmt(lv['llm_calls_per_s'])} "
+                     f"| {_fmt(lv['latency_p50_s'])} | {_fmt(lv['latency_p95_s'])} | {_fmt(lv['latency_max_s'])} "
+                     f"| {_fmt(lv['client_queue_avg'])}/{lv['client_queue_peak']} "
+                     f"| {_fmt(lv['server_queue_avg'])}/{_fmt(lv['server_queue_peak'], 'd')} "
+                     f"| {_fmt(lv['mem_mb_avg'], '.0f')}/{_fmt(lv['mem_mb_max'], '.0f')} "
+                     f"| {_fmt(lv['chroma_open_s_avg'])} | {_fmt(lv['chroma_ops_s_avg'])} | {lv['chroma_errors']} | {lv['failed']} |")
+
+    lines += ["", "## Throughput scaling", "```"]
+    best = max((lv["throughput_per_min"] for lv in levels), default=0.0) or 1.0
+    for lv in levels:
+        bar = "#" * int(round(40 * lv["throughput_per_min"] / best))
+        lines.append(f"N={lv['analyses']:>3} {bar} {lv['throughput_per_min']:.2f}/min")
+    lines.append("```")
+
+    # Saturation: the first level that adds less than 10% throughput over the previous one.
+    for prev, cur in zip(levels, levels[1:]):
+        if cur["throughput_per_min"] < 1.1 * prev["throughput_per_min"]:
+            lines.append(f"\nThroughput saturates between N={prev['analyses']} and N={cur['analyses']}.")
+            break
+    else:
+        lines.append("\nNo saturation within the tested levels.")
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run N concurrent project analyses per level and report how throughput scales.")
+    parser.add_argument("--levels", default="1,2,4,8", help="Comma-separated concurrency levels.")
+    parser.add_argument("--mode", choices=["summarizer", "crawler"], default="summarizer",
+                        help="summarizer: project_pulse (ProjectSummarizer). crawler: CrawlerAgent.run (needs chromadb).")
+    parser.add_argument("--endpoint", help="Existing Ollama (or fake) endpoint. Default: a fake server per level.")
+    parser.add_argument("--modules", type=int, default=4)
+    parser.add_argument("--functions", type=int, default=3)
+    parser.add_argument("--slots", type=int, default=4, help="Fake server parallel slots.")
+    parser.add_argument("--latency-median", type=float, default=0.05)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--per-token", type=float, default=0.001)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--use-cache", action="store_true", help="Keep the persistent response cache on (per analysis directory).")
+    parser.add_argument("--shared-chroma", action="store_true", help="All crawler analyses share one ChromaDB directory.")
+    parser.add_argument("--sample-interval", type=float, default=0.1)
+    parser.add_argument("--out", default="load_test_out")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    out_dir = os.path.abspath(args.out)
+    os.makedirs(out_dir, exist_ok=True)
+    levels = [run_level(int(n), args, out_dir) for n in args.levels.split(",")]
+
+    with open(os.path.join(out_dir, "load_test_report.json"), "w", encoding="utf-8") as f:
+        json.dump({"settings": vars(args), "levels": levels}, f, indent=2)
+    report = render_report(levels, args)
+    with open(os.path.join(out_dir, "load_test_report.md"), "w", encoding="utf-8") as f:
+        f.write(report)
+    print(report)
@@ -0,0 +1,43 @@
+import argparse
+import json
+import logging
+import time
+
+from evolving_graphs.agent_graph.llm_fake_server import FakeOllamaServer
+
+# Standalone fake Ollama server. Point the agent at it with
+# LLM_ENDPOINTS = ["http://127.0.0.1:11435"] in agent_config.py.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a fake Ollama /api/chat endpoint with latency and failure injection.")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--slots", type=int, default=4, help="Parallel generation slots (OLLAMA_NUM_PARALLEL).")
+    parser.add_argument("--distribution", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--median", type=float, default=0.2, help="Median (lognormal) or fixed prefill latency in seconds.")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Lognormal spread.")
+    parser.add_argument("--min", type=float, default=0.1, help="Uniform lower bound in seconds.")
+    parser.add_argument("--max", type=float, default=0.5, help="Uniform upper bound in seconds.")
+    parser.add_argument("--per-token", type=float, default=0.002, help="Generation time per output token in seconds.")
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--script", help="JSON file mapping keys to fixed answers (lists are served round-robin).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    latency = {"distribution": args.distribution, "seconds": args.median, "median_s": args.median, "sigma": args.sigma,
+               "min_s": args.min, "max_s": args.max, "per_token_s": args.per_token}
+    script = None
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            script = json.load(f)
+
+    server = FakeOllamaServer(port=args.port, slots=args.slots, latency=latency, malformed_rate=args.malformed_rate,
+                              error_rate=args.error_rate, disconnect_rate=args.disconnect_rate, script=script, seed=args.seed)
+    server.start()
+    try:
+        while True:
+            time.sleep(30)
+            logging.info(f"[FakeOllama] {server.stats()}")
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import re
+
+import ollama
+import pytest
+
+from evolving_graphs.agent_graph import llm_backend, llm_budget, llm_hedging, llm_limiter, llm_response_store, llm_router, llm_stats
+from evolving_graphs.agent_graph.llm_breaker import CircuitBreaker
+from evolving_graphs.agent_graph.llm_fake_server import FakeOllamaServer
+from evolving_graphs.agent_graph.llm_hedging import LatencyTracker
+from evolving_graphs.agent_graph.llm_limiter import AdaptiveLimiter
+from evolving_graphs.agent_graph.llm_telemetry import get_telemetry
+
+
+@pytest.fixture
+def llm_state(monkeypatch):
+    """
+    Fresh process-wide LLM layer state: live backend mode, no response or semantic cache, a closed
+    breaker, an empty hedging window, a fixed limit of 4 and empty counters, telemetry and budgets.
+    """
+    monkeypatch.setattr(llm_response_store, "LLM_BACKEND_MODE", "live")
+    monkeypatch.setattr(llm_response_store, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(llm_response_store, "LLM_SEMANTIC_CACHE_MODE", "off")
+    monkeypatch.setattr(llm_backend, "_breaker", CircuitBreaker(3))
+    monkeypatch.setattr(llm_hedging, "_latencies", LatencyTracker(50))
+    monkeypatch.setattr(llm_limiter, "_limiter", AdaptiveLimiter(4, 1, 4, adaptive=False))
+    monkeypatch.setattr(llm_router, "_router", None)
+    llm_stats.reset()
+    get_telemetry().reset()
+    llm_budget.get_governor().reset()
+    yield
+    llm_stats.reset()
+    get_telemetry().reset()
+    llm_budget.get_governor().reset()
+
+
+def default_reply(request):
+    """
+    A JSON object with the key the format schema or the prompt ("key 'x'") asks for, plain text otherwise.
+    Schema enums get their first value and integers their maximum.
+    """
+    schema = request.get("format")
+    if isinstance(schema, dict) and schema.get("required"):
+        key = schema["required"][0]
+        spec = schema["properties"][key]
+        if spec.get("enum"):
+            return json.dumps({key: spec["enum"][0]})
+        if spec.get("type") == "integer":
+            return json.dumps({key: spec.get("maximum", 5)})
+    else:
+        keys = re.findall(r"key '(\w+)'", "\n".join(m["content"] for m in request["messages"]))
+        if not keys:
+            return "A plain answer."
+        key = keys[-1]
+    return json.dumps({key: f"{key} of the request"})
+
+
+class FakeChat:
+    """
+    Stands in for the Ollama API on `ollama.AsyncClient` and `ollama.Client` (preloads and health checks).
+    Requests are kept in `requests`, each with the host it was sent to. The answer is `reply(request)`;
+    a reply that is an exception is raised instead. `delay_s(host)` gives the seconds before answering,
+    and hosts in `down` refuse every connection.
+    """
+    def __init__(self, reply=None, delay_s=None):
+        self.reply = reply or default_reply
+        self.delay_s = delay_s or (lambda host: 0.0)
+        self.down = set()
+        self.requests = []
+        self.active = 0
+        self.peak_active = 0
+
+    def _connect(self, client):
+        host = str(client._client.base_url)
+        if host in self.down:
+            raise ConnectionError(f"{host} refused the connection")
+        return host
+
+    def _answer(self, client, request):
+        request = dict(request, host=self._connect(client))
+        self.requests.append(request)
+        content = self.reply(request)
+        if isinstance(content, Exception):
+            raise content
+        return content
+
+    async def achat(self, client, **request):
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            await asyncio.sleep(self.delay_s(str(client._client.base_url)))
+            content = self._answer(client, request)
+        finally:
+            self.active -= 1
+        if request.get("stream"):
+            return self._stream(request, content)
+        return self._response(request, content)
+
+    def chat(self, client, **request):
+        return self._response(request, self._answer(client, request))
+
+    def list(self, client):
+        self._connect(client)
+        return {"models": []}
+
+    def _response(self, request, content):
+        prompt_chars = sum(len(m["content"]) for m in request.get("messages") or [])
+        return {"message": {"role": "assistant", "content": content}, "done": True,
+                "prompt_eval_count": prompt_chars // 4, "eval_count": len(content) // 4 + 1,
+                "prompt_eval_duration": 1_000_000, "eval_duration": 2_000_000}
+
+    async def _stream(self, request, content):
+        for i in range(0, len(content), 4):
+            yield {"message": {"content": content[i:i + 4]}, "done": False}
+        yield dict(self._response(request, ""), done=True)
+
+
+@pytest.fixture
+def fake_chat(llm_state, monkeypatch):
+    """
+    Answers LLM calls in-process: `fake_chat(reply=None, delay_s=None, hosts=("http://llm:1",))` routes the
+    LLM layer to `hosts` and returns the FakeChat that serves them.
+    """
+    def install(reply=None, delay_s=None, hosts=("http://llm:1",)):
+        fake = FakeChat(reply, delay_s)
+
+        async def achat(client, **request):
+            return await fake.achat(client, **request)
+
+        # Plain functions, so they bind to the client they are called on.
+        monkeypatch.setattr(ollama.AsyncClient, "chat", achat)
+        monkeypatch.setattr(ollama.Client, "chat", lambda client, **request: fake.chat(client, **request))
+        monkeypatch.setattr(ollama.Client, "list", lambda client: fake.list(client))
+        monkeypatch.setattr(llm_backend, "LLM_FAKE_SERVERS", 0)
+        monkeypatch.setattr(llm_backend, "LLM_ENDPOINTS", list(hosts))
+        monkeypatch.setattr(llm_router, "_router", None)
+        return fake
+
+    return install
+
+
+@pytest.fixture
+def fake_ollama(llm_state, monkeypatch):
+    """
+    Starts FakeOllamaServers and routes the LLM layer to them: `fake_ollama(count=1, **server_kwargs)`
+    returns the started servers. They are stopped when the test ends.
+    """
+    servers = []
+
+    def start(count: int = 1, **kwargs):
+        for _ in range(count):
+            server = FakeOllamaServer(seed=len(servers), **kwargs)
+            server.start()
+            servers.append(server)
+        monkeypatch.setattr(llm_backend, "LLM_FAKE_SERVERS", 0)
+        monkeypatch.setattr(llm_backend, "LLM_ENDPOINTS", [server.url for server in servers])
+        monkeypatch.setattr(llm_router, "_router", None)
+        return servers
+
+    yield start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+from evolving_graphs.agent_graph import gatekeeper_grounding, task_executor
+from evolving_graphs.agent_graph.component_analyst import ComponentAnalyst
+from evolving_graphs.agent_graph.gatekeeper_grounding import chunk_claims, parse_batch_verification
+from evolving_graphs.agent_graph.llm_telemetry_summary import telemetry_summary
+from evolving_graphs.agent_graph.semantic_gatekeeper import SemanticGatekeeper
+from evolving_graphs.agent_graph.task_executor import TaskExecutor
+
+PAIRS = [("Adds `a` and `b`.", "def add(a, b):\n    return a + b\n"),
+         ("Divides `a` by `b`.", "def sub(a, b):\n    return a - b\n"),
+         ("Multiplies `a` by `b`.", "def mul(a, b):\n    return a * b\n")]
+LABEL = "calc.py:Functions:Chunk1:Grounding:Batch"
+
+
+def results(*entries):
+    """A scripted batch answer; wrapped in a list because the fake server cycles through list values."""
+    return {"results": [[{"id": i, "score": score, "reason": reason} for i, score, reason in entries]]}
+
+
+def test_chunks_respect_the_claim_and_token_limits(monkeypatch):
+    monkeypatch.setattr(gatekeeper_grounding, "LLM_BATCH_VERIFY_MAX_CLAIMS", 2)
+    assert chunk_claims(PAIRS) == [[0, 1], [2]]
+    monkeypatch.setattr(gatekeeper_grounding, "LLM_BATCH_VERIFY_MAX_CLAIMS", 12)
+    monkeypatch.setattr(gatekeeper_grounding, "LLM_BATCH_VERIFY_TOKEN_BUDGET", 60)
+    # Each pair costs (chars / 4) + 20, about 34 tokens: one per chunk.
+    assert chunk_claims(PAIRS) == [[0], [1], [2]]
+    assert chunk_claims([("x" * 1000, "")]) == [[0]]
+
+
+def test_ids_map_back_to_pair_indices_and_bad_entries_are_skipped(llm_state):
+    response = json.dumps({"results": [{"id": 2, "score": 1, "reason": "Subtracts."}, {"id": 7, "score": 5},
+                                       {"id": "x", "score": 5}, "garbage", {"id": 1, "score": 4}]})
+    assert parse_batch_verification(response, [4, 5, 6], LABEL) == {5: (1, "Subtracts."), 4: (4, "No reason provided")}
+    assert parse_batch_verification("not json", [4, 5, 6], LABEL) == {}
+    tiers = telemetry_summary()["by_tier"]
+    assert [(bucket["verdicts"], bucket["pass_rate"]) for bucket in tiers.values()] == [(2, 0.5)]
+
+
+def test_all_claims_are_scored_in_one_call(fake_ollama):
+    server, = fake_ollama(script=results((1, 5, "Adds."), (2, 1, "It subtracts."), (3, 5, "Multiplies.")))
+    scores = asyncio.run(SemanticGatekeeper().averify_claims(PAIRS, log_context="calc.py:Functions"))
+    assert scores == [(5, "Adds."), (1, "It subtracts."), (5, "Multiplies.")]
+    assert server.stats()["requests"] == 1
+
+
+def test_claims_missing_from_the_answer_are_verified_one_by_one(fake_ollama):
+    server, = fake_ollama(script=dict(results((1, 5, "Adds."), (3, 5, "Multiplies.")), score=2, reason="Subtracts."))
+    bodies, answer = [], server.answer
+    server.answer = lambda body: bodies.append(body) or answer(body)
+    scores = asyncio.run(SemanticGatekeeper().averify_claims(PAIRS, log_context="calc.py:Functions"))
+    assert scores == [(5, "Adds."), (2, "Subtracts."), (5, "Multiplies.")]
+    assert len(bodies) == 2
+    assert 'Claim to Verify: "Divides `a` by `b`."' in bodies[1]["messages"][-1]["content"]
+    assert "CLAIM 1" not in bodies[1]["messages"][-1]["content"]
+
+
+def test_chunks_are_sent_concurrently(fake_chat, monkeypatch):
+    monkeypatch.setattr(gatekeeper_grounding, "LLM_BATCH_VERIFY_MAX_CLAIMS", 1)
+    fake = fake_chat(reply=lambda request: json.dumps({"results": [{"id": 1, "score": 5, "reason": "ok"}]}), delay_s=lambda host: 0.1)
+    scores = asyncio.run(SemanticGatekeeper().averify_claims(PAIRS, log_context="calc.py:Functions"))
+    assert scores == [(5, "ok")] * 3
+    assert len(fake.requests) == 3 and fake.peak_active == 3
+
+
+def analyze(fake_ollama, monkeypatch, batch, sub_score=5):
+    """Analyzes the three functions as one group; returns the summaries and the number of chat requests."""
+    monkeypatch.setattr(task_executor, "GOAL_LOOP_AUDIT_MODE", "separate")
+    scores = results((1, 5, "ok"), (2, sub_score, "It subtracts."), (3, 5, "ok"))
+    server, = fake_ollama(script=dict(scores, answer="Combines `a` and `b`.", status="PASS"))
+    analyst = ComponentAnalyst(SemanticGatekeeper(), TaskExecutor(SemanticGatekeeper()), batch_verify=batch)
+    jobs = [dict(type_label="Function", name=name, source=source, log_label=f"calc.py:{name}")
+            for name, (_, source) in zip(["add", "sub", "mul"], PAIRS)]
+    return analyst._analyze_mechanisms(jobs, "calc.py:Functions"), server.stats()["requests"]
+
+
+def test_batched_group_replaces_the_per_function_accuracy_audits(fake_ollama, monkeypatch):
+    summaries, requests = analyze(fake_ollama, monkeypatch, batch=True)
+    assert summaries == ["Combines `a` and `b`."] * 3
+    # Drafter and relevance audit per function, then one batch.
+    assert requests == 3 * 2 + 1
+
+
+def test_low_scoring_summaries_are_analyzed_again_with_the_accuracy_audit(fake_ollama, monkeypatch):
+    summaries, requests = analyze(fake_ollama, monkeypatch, batch=True, sub_score=1)
+    assert summaries == ["Combines `a` and `b`."] * 3
+    # The rejected `sub` gets a second goal loop: drafter, relevance and accuracy.
+    assert requests == 3 * 2 + 1 + 3
+
+
+def test_unbatched_group_audits_each_function(fake_ollama, monkeypatch):
+    summaries, requests = analyze(fake_ollama, monkeypatch, batch=False)
+    assert summaries == ["Combines `a` and `b`."] * 3
+    assert requests == 3 * 3
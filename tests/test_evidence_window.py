@@ -0,0 +1,91 @@
+import asyncio
+
+from evolving_graphs.agent_graph import llm_stats
+from evolving_graphs.agent_graph.evidence_extractor import (
+    EvidenceExtractor, audit_evidence, cited_identifiers, evidence_window, spans_from_entities
+)
+from evolving_graphs.agent_graph.gatekeeper_grounding import averify_grounding
+from evolving_graphs.agent_graph.goal_loop_audits import GoalLoopAuditor
+from evolving_graphs.agent_graph.llm_labels import call_category
+from evolving_graphs.agent_graph.llm_telemetry import get_telemetry
+from evolving_graphs.agent_graph.semantic_gatekeeper import SemanticGatekeeper
+
+SMALL = "RATE = 2\n\ndef add(a, b):\n    return a + b\n\ndef scale(x):\n    return x * RATE\n"
+# Long enough for audit_evidence (LLM_EVIDENCE_WINDOW_MIN_CHARS); `scale` is a small part of it.
+LARGE = "".join(f"def helper_{i}(value):\n    return value + {i}\n\n" for i in range(60)) + SMALL
+CLAIM = "Multiplies `x` by `RATE` in `scale`."
+
+
+def sent_requests(server):
+    bodies, answer = [], server.answer
+    server.answer = lambda body: bodies.append(body) or answer(body)
+    return bodies
+
+
+def test_cited_identifiers_split_dotted_names_and_skip_expressions():
+    assert cited_identifiers("Calls `self.store.save()` then `save`, `a[0]` and `x * 2`.") == ["self", "store", "save"]
+    assert cited_identifiers("No code cited.") == []
+
+
+def test_window_holds_the_definitions_and_uses_of_cited_names():
+    window, confidence = EvidenceExtractor(SMALL, context_lines=0).window("Returns `x` times `RATE`.")
+    assert confidence == 1.0
+    assert window == "# [lines 1-1]\nRATE = 2\n# ...\n# [lines 6-7]\ndef scale(x):\n    return x * RATE"
+    assert EvidenceExtractor(SMALL).window("Calls `missing` and `add`.")[1] == 0.5
+
+
+def test_entity_spans_cover_functions_classes_and_methods():
+    entities = {"globals": [{"name": "RATE", "lineno": 1}],
+                "functions": [{"signature": "def add(a, b)", "lineno": 3, "end_lineno": 4}],
+                "classes": {"Calc": {"lineno": 9, "end_lineno": 12, "methods": [{"signature": "def run(self)", "lineno": 10, "end_lineno": 12}]}}}
+    assert spans_from_entities(entities) == {"RATE": [(1, 1)], "add": [(3, 4)], "Calc": [(9, 12)], "run": [(10, 12)]}
+
+
+def test_full_text_is_used_when_a_window_would_not_help(llm_state):
+    assert evidence_window("Calls `missing` in `scale`.", LARGE) is None
+    assert evidence_window("Adds `a` and `b`.", SMALL, max_ratio=0.1) is None
+    assert audit_evidence(CLAIM, SMALL) is None
+    window = audit_evidence(CLAIM, LARGE)
+    assert "def scale(x):" in window and "helper_0" not in window
+    assert audit_evidence("No code cited.", LARGE) is None
+    counters = llm_stats.snapshot()
+    assert (counters["evidence_windows"], counters["evidence_window_skipped"]) == (1, 1)
+    assert counters["evidence_window_chars_saved"] == len(LARGE) - len(window)
+
+
+def test_grounding_is_checked_on_the_window_only(fake_ollama):
+    server, = fake_ollama(script={"score": 5, "reason": "Matches."})
+    bodies = sent_requests(server)
+    assert asyncio.run(averify_grounding(CLAIM, LARGE, "calc.py:scale")) == (5, "Matches.")
+    assert len(bodies) == 1
+    prompt = bodies[0]["messages"][-1]["content"]
+    assert "excerpt" in prompt and "helper_0" not in prompt
+
+
+def test_unsupported_window_falls_back_to_the_full_source(fake_ollama):
+    server, = fake_ollama(script={"score": [2, 4], "reason": "Checked."})
+    bodies = sent_requests(server)
+    assert asyncio.run(averify_grounding(CLAIM, LARGE, "calc.py:scale")) == (4, "Checked.")
+    assert ["helper_0" in body["messages"][-1]["content"] for body in bodies] == [False, True]
+    assert llm_stats.snapshot()["evidence_window_fallbacks"] == 1
+
+
+def test_accuracy_audit_repeats_a_window_rejection_on_the_full_context(fake_ollama):
+    server, = fake_ollama(script={"status": ["FAIL", "PASS"], "reason": "Not shown."})
+    bodies = sent_requests(server)
+    auditor = GoalLoopAuditor(SemanticGatekeeper())
+    assert asyncio.run(auditor._aaudit_accuracy(CLAIM, LARGE, "calc.py:scale:Iter1"))[0] == "PASS"
+    assert ["helper_0" in body["messages"][-1]["content"] for body in bodies] == [False, True]
+    assert llm_stats.snapshot()["evidence_window_fallbacks"] == 1
+    # The window verdict and the full audit's are recorded apart, both as accuracy audits.
+    labels = [label for label, _, _ in get_telemetry().verdicts]
+    assert labels == ["calc.py:scale:Iter1:Audit:AccuracyWindow", "calc.py:scale:Iter1:Audit:Accuracy"]
+    assert {call_category(label) for label in labels} == {"accuracy_audit"}
+
+
+def test_accuracy_audit_accepts_a_window_pass(fake_ollama):
+    server, = fake_ollama(script={"status": "PASS", "reason": "Verified."})
+    auditor = GoalLoopAuditor(SemanticGatekeeper())
+    assert asyncio.run(auditor._aaudit_accuracy(CLAIM, LARGE, "calc.py:scale:Iter1"))[0] == "PASS"
+    assert server.stats()["requests"] == 1
+    assert "evidence_window_fallbacks" not in llm_stats.snapshot()
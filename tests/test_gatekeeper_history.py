@@ -0,0 +1,61 @@
+from evolving_graphs.agent_graph import semantic_gatekeeper
+from evolving_graphs.agent_graph.gatekeeper_history import FeedbackHistory
+from evolving_graphs.agent_graph.llm_telemetry_summary import telemetry_summary
+from evolving_graphs.agent_graph.semantic_gatekeeper import SemanticGatekeeper
+
+BASE = [{"role": "system", "content": "Output valid JSON only."}, {"role": "user", "content": "Describe `add`."}]
+
+
+def rejected(history, count, response_chars=300):
+    for i in range(count):
+        history.reject("STYLE", f"attempt {i} " + "x" * response_chars, f"Forbidden word {i}.\nRewrite it.", value=f"value {i}")
+
+
+def test_compacted_history_keeps_the_task_and_the_latest_rejection():
+    history = FeedbackHistory(BASE)
+    assert history.messages == BASE
+    rejected(history, 3)
+    messages = history.messages
+    assert messages[:2] == BASE and len(messages) == 4
+    assert messages[2]["content"].startswith("attempt 2 ")
+    feedback = messages[3]["content"]
+    assert '- Attempt 1 (STYLE): rejected "value 0" because Forbidden word 0.' in feedback
+    assert '- Attempt 2 (STYLE): rejected "value 1" because Forbidden word 1.' in feedback
+    assert feedback.endswith("Forbidden word 2.\nRewrite it.")
+
+
+def test_prompt_stays_bounded_while_the_full_history_grows():
+    compact, full = FeedbackHistory(BASE, max_attempt_chars=100), FeedbackHistory(BASE, compact=False)
+    sizes = []
+    for _ in range(4):
+        rejected(compact, 1, response_chars=2000)
+        rejected(full, 1, response_chars=2000)
+        sizes.append(compact.prompt_chars())
+    assert len(full.messages) == 10 and full.prompt_chars() > 8000
+    assert max(sizes) < 800
+    assert " ...[cut]" in compact.messages[2]["content"]
+
+
+def test_long_reasons_are_clipped_in_the_summary():
+    history = FeedbackHistory(BASE)
+    history.reject("LOGIC", "response", "feedback", reason="because " * 100, value="claim")
+    history.reject("FORMAT", "response", "System Alert: Invalid JSON format.")
+    line = history.messages[3]["content"].splitlines()[1]
+    assert line.startswith('- Attempt 1 (LOGIC): rejected "claim"') and line.endswith("...")
+    assert len(line) < 250
+
+
+def test_retries_send_compacted_prompts_and_record_their_size(fake_ollama, monkeypatch):
+    monkeypatch.setattr(semantic_gatekeeper, "LLM_HISTORY_COMPACTION", True)
+    answers = ["It leverages `add` to sum.", "It seamlessly adds numbers.", "It leverages addition.", "Adds `a` and `b`."]
+    server, = fake_ollama(script={"answer": answers})
+    bodies, answer = [], server.answer
+    server.answer = lambda body: bodies.append(body) or answer(body)
+    result = SemanticGatekeeper().execute_with_feedback("Describe `add`.", "answer", forbidden_terms=["leverages", "seamlessly"],
+                                                        log_context="calc.py:add:Iter1:Drafter")
+    assert result == "Adds `a` and `b`."
+    assert [len(body["messages"]) for body in bodies] == [2, 4, 4, 4]
+    assert "Earlier attempts were also rejected" in bodies[3]["messages"][-1]["content"]
+    by_attempt = telemetry_summary()["by_attempt"]
+    assert sorted(by_attempt) == [0, 1, 2, 3]
+    assert by_attempt[1]["avg_prompt_chars"] > by_attempt[0]["avg_prompt_chars"]
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from evolving_graphs.agent_graph import task_executor
+from evolving_graphs.agent_graph.goal_loop_audits import GoalLoopAuditor
+from evolving_graphs.agent_graph.semantic_gatekeeper import SemanticGatekeeper
+from evolving_graphs.agent_graph.task_executor import TaskExecutor
+
+CONTEXT = "def add(a, b):\n    return a + b\n"
+ANSWER = "Adds `a` and `b` and returns the sum."
+
+
+def joint(relevance="PASS", accuracy="PASS", relevance_reason="", accuracy_reason=""):
+    return {"relevance": relevance, "relevance_reason": relevance_reason, "accuracy": accuracy, "accuracy_reason": accuracy_reason}
+
+
+@pytest.mark.parametrize("raw, expected", [
+    (json.dumps({"audit": joint()}), ("PASS", "Verified")),
+    (json.dumps(joint()), ("PASS", "Verified")),
+    (json.dumps({"audit": joint("FAIL", "FAIL", "Off topic.", "Wrong.")}), ("FAIL", "Off topic.")),
+    (json.dumps({"audit": joint("VAGUE", "FAIL", "Generic.", "Wrong.")}), ("FAIL", "Wrong.")),
+    (json.dumps({"audit": joint("VAGUE", "PASS", "Generic.")}), ("VAGUE", "Generic.")),
+    (json.dumps({"audit": joint("fail")}), ("FAIL", "Relevance check failed.")),
+    (json.dumps({"audit": {"relevance": "PASS"}}), ("FAIL", "Fact verification failed.")),
+    ("", ("FAIL", "Empty response from model.")),
+])
+def test_both_verdicts_fold_into_one_status_and_reason(llm_state, raw, expected):
+    assert GoalLoopAuditor(SemanticGatekeeper())._interpret_joint(raw, "calc.py:add:Iter1") == expected
+
+
+def solve(mode, monkeypatch, fake_ollama, audit):
+    """Runs one goal loop in `mode`; returns the executor, its answer and the chat requests the server received."""
+    monkeypatch.setattr(task_executor, "GOAL_LOOP_AUDIT_MODE", mode)
+    server, = fake_ollama(script={"answer": ANSWER, "status": "PASS", "audit": audit})
+    bodies, answer = [], server.answer
+    server.answer = lambda body: bodies.append(body) or answer(body)
+    executor = TaskExecutor(SemanticGatekeeper())
+    return executor, executor.solve_complex_task("Describe `add`.", CONTEXT, "calc.py:add"), bodies
+
+
+def test_joint_mode_audits_in_one_call(fake_ollama, monkeypatch):
+    executor, answer, bodies = solve("joint", monkeypatch, fake_ollama, joint())
+    assert executor.validators.names == ["heuristics", "grounding_hard", "joint_audit"]
+    assert answer == ANSWER
+    assert len(bodies) == 2
+
+
+def test_separate_mode_keeps_two_audit_calls(fake_ollama, monkeypatch):
+    executor, answer, bodies = solve("separate", monkeypatch, fake_ollama, joint())
+    assert executor.validators.names == ["heuristics", "grounding_hard", "relevance", "accuracy"]
+    assert answer == ANSWER
+    assert len(bodies) == 3
+
+
+def test_joint_accuracy_failure_becomes_the_next_drafts_feedback(fake_ollama, monkeypatch):
+    audits = [joint(accuracy="FAIL", accuracy_reason="It does not divide."), joint()]
+    _, answer, bodies = solve("joint", monkeypatch, fake_ollama, audits)
+    assert answer == ANSWER
+    assert len(bodies) == 4
+    assert "PREVIOUS ATTEMPT REJECTED: It does not divide." in bodies[2]["messages"][-1]["content"]
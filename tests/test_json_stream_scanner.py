@@ -0,0 +1,66 @@
+import pytest
+
+from evolving_graphs.agent_graph import llm_async, llm_cache, llm_response_store, llm_stats
+from evolving_graphs.agent_graph.json_stream_scanner import BalancedJsonScanner
+from evolving_graphs.agent_graph.llm_telemetry import get_telemetry
+from evolving_graphs.agent_graph.llm_util import chat_llm
+
+LABEL = "calc.py:add:Iter1:Drafter"
+PROMPT = "Describe `add`. Reply with key 'answer'."
+
+
+def feed_in_chunks(scanner, text, size):
+    for i in range(0, len(text), size):
+        found = scanner.feed(text[i:i + size])
+        if found is not None:
+            return found, i + size
+    return None, len(text)
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 100])
+def test_first_object_is_found_whatever_the_chunking(size):
+    text = 'Sure: {"answer": "Uses `{` and \\"}\\" in strings", "n": {"x": 1}} trailing {"other": 2}'
+    found, _ = feed_in_chunks(BalancedJsonScanner(), text, size)
+    assert found == '{"answer": "Uses `{` and \\"}\\" in strings", "n": {"x": 1}}'
+
+
+def test_object_is_reported_as_soon_as_it_closes():
+    text = '{"answer": "done"}' + " commentary" * 50
+    found, consumed = feed_in_chunks(BalancedJsonScanner(), text, 4)
+    assert found == '{"answer": "done"}'
+    assert consumed < 30
+
+
+def test_objects_without_the_required_key_are_skipped():
+    scanner = BalancedJsonScanner("status")
+    assert scanner.feed('{"thinking": "..."} ') is None
+    assert scanner.feed('{"status": "PASS"}') == '{"status": "PASS"}'
+
+
+def test_incomplete_object_is_not_reported():
+    scanner = BalancedJsonScanner()
+    assert scanner.feed('{"answer": "unterminated }') is None
+    assert scanner.result is None
+
+
+def test_streamed_call_stops_at_the_first_object(fake_chat):
+    fake_chat(reply=lambda request: '{"answer": "Adds `a` and `b`."} Let me also explain how it works.')
+    answer = chat_llm("m", PROMPT, stream_until_key="answer", log_context=LABEL)
+    assert answer == '{"answer": "Adds `a` and `b`."}'
+    assert llm_stats.snapshot()["stream_early_stops"] == 1
+    record, = get_telemetry().snapshot()["records"]
+    assert record.ttfc_s is not None and not record.truncated
+
+
+def test_stream_cut_at_the_cap_is_not_cached(fake_chat, monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_async, "LLM_STREAM_MAX_CHARS", 16)
+    monkeypatch.setattr(llm_response_store, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(llm_response_store, "LLM_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    fake = fake_chat()
+    first = chat_llm("m", PROMPT, stream_until_key="answer", log_context=LABEL)
+    chat_llm("m", PROMPT, stream_until_key="answer", log_context=LABEL)
+    assert not first.endswith("}")
+    assert len(fake.requests) == 2
+    assert llm_stats.snapshot()["stream_length_caps"] == 2
+    assert all(record.truncated for record in get_telemetry().snapshot()["records"])
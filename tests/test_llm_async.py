@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+import ollama
+import pytest
+
+from evolving_graphs.agent_graph import llm_limiter
+from evolving_graphs.agent_graph.llm_async import achat_llm
+from evolving_graphs.agent_graph.llm_limiter import AdaptiveLimiter
+from evolving_graphs.agent_graph.llm_loop import run_sync
+from evolving_graphs.agent_graph.llm_util import chat_llm
+from evolving_graphs.agent_graph.semantic_gatekeeper import SemanticGatekeeper
+
+
+def prompt(i):
+    return f"Describe function number {i}. Reply with key 'answer'."
+
+
+def test_run_sync_returns_result_and_raises_errors():
+    async def ok():
+        return 7
+
+    async def fails():
+        raise ValueError("boom")
+
+    assert run_sync(ok()) == 7
+    with pytest.raises(ValueError):
+        run_sync(fails())
+
+
+def test_run_sync_refuses_running_loop():
+    async def nested():
+        async def inner():
+            return 1
+        return run_sync(inner())
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(nested())
+
+
+def test_chat_llm_and_achat_llm_return_the_same_answer(fake_chat):
+    fake_chat()
+    label = "calc.py:add:Iter1:Drafter"
+    assert chat_llm("m", prompt(1), log_context=label) == asyncio.run(achat_llm("m", prompt(1), log_context=label))
+
+
+def test_concurrent_calls_respect_the_limit(fake_chat, monkeypatch):
+    monkeypatch.setattr(llm_limiter, "_limiter", AdaptiveLimiter(2, 1, 2, adaptive=False))
+    fake = fake_chat(delay_s=lambda host: 0.1)
+
+    async def main():
+        return await asyncio.gather(*[achat_llm("m", prompt(i), log_context=f"calc.py:f{i}:Iter1:Drafter") for i in range(6)])
+
+    answers = asyncio.run(main())
+    assert answers == ['{"answer": "answer of the request"}'] * 6
+    assert len(fake.requests) == 6
+    assert fake.peak_active == 2
+    assert llm_limiter.get_limiter().stats()["peak_waiting"] > 0
+
+
+def test_backend_error_is_returned_as_error_string(fake_chat):
+    fake_chat(reply=lambda request: ollama.ResponseError("boom", 500))
+    answer = chat_llm("m", prompt(1), log_context="calc.py:add:Iter1:Drafter")
+    assert answer.startswith("Error:")
+
+
+def test_gatekeeper_entry_points_share_one_implementation(fake_chat):
+    fake = fake_chat(reply=lambda request: json.dumps({"answer": "Adds `a` and `b` and returns the sum."}))
+    gatekeeper = SemanticGatekeeper()
+    label = "calc.py:add:Iter1:Drafter"
+    sync_answer = gatekeeper.execute_with_feedback("Describe `add`.", "answer", log_context=label)
+    async_answer = asyncio.run(gatekeeper.aexecute_with_feedback("Describe `add`.", "answer", log_context=label))
+    assert sync_answer == async_answer == "Adds `a` and `b` and returns the sum."
+    assert len(fake.requests) == 2
@@ -0,0 +1,76 @@
+import pytest
+
+from evolving_graphs.agent_graph import llm_backend, llm_recovery, llm_stats
+from evolving_graphs.agent_graph.llm_breaker import CircuitBreaker, LLMBackendUnavailable
+from evolving_graphs.agent_graph.llm_recovery import when_backend_available
+from evolving_graphs.agent_graph.llm_util import chat_llm
+from evolving_graphs.agent_graph.semantic_gatekeeper import SemanticGatekeeper
+
+LABEL = "calc.py:add:Iter1:Drafter"
+PROMPT = "Describe `add`. Reply with key 'answer'."
+
+
+@pytest.fixture
+def dead_backend(fake_chat):
+    fake = fake_chat()
+    fake.down.add("http://llm:1")
+
+
+def test_breaker_opens_after_threshold_and_fails_fast():
+    breaker = CircuitBreaker(2)
+    breaker.record_failure(ConnectionError("refused"))
+    breaker.check()
+    with pytest.raises(LLMBackendUnavailable):
+        breaker.record_failure(ConnectionError("refused"))
+    with pytest.raises(LLMBackendUnavailable):
+        breaker.check()
+    breaker.close()
+    breaker.check()
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(2)
+    breaker.record_failure(ConnectionError("refused"))
+    breaker.record_success()
+    breaker.record_failure(ConnectionError("refused"))
+    assert not breaker.is_open
+
+
+def test_wait_until_available_probes_until_the_backend_answers():
+    breaker = CircuitBreaker(1)
+    breaker.is_open = True
+    answers = iter([False, False, True])
+    assert breaker.wait_until_available(lambda: next(answers), interval_s=0.01, max_wait_s=1)
+    assert not breaker.is_open
+    breaker.is_open = True
+    assert not breaker.wait_until_available(lambda: False, interval_s=0.01, max_wait_s=0.03)
+    assert breaker.is_open
+
+
+def test_dead_backend_raises_a_typed_error_after_consecutive_failures(dead_backend):
+    assert chat_llm("m", PROMPT, log_context=LABEL).startswith("Error:")
+    assert chat_llm("m", PROMPT, log_context=LABEL).startswith("Error:")
+    with pytest.raises(LLMBackendUnavailable):
+        chat_llm("m", PROMPT, log_context=LABEL)
+    with pytest.raises(LLMBackendUnavailable):
+        chat_llm("m", PROMPT, log_context=LABEL)
+    assert llm_stats.snapshot()["breaker_opened"] == 1
+    assert llm_stats.snapshot()["breaker_fast_fails"] == 1
+
+
+def test_gatekeeper_stops_retrying_once_the_circuit_opens(dead_backend):
+    with pytest.raises(LLMBackendUnavailable):
+        SemanticGatekeeper().execute_with_feedback(PROMPT, "answer", log_context=LABEL)
+    endpoint, = llm_backend.llm_router().stats().values()
+    assert endpoint["requests"] == 3
+
+
+def test_paused_step_resumes_when_the_backend_returns(fake_chat, monkeypatch):
+    monkeypatch.setattr(llm_recovery, "LLM_BREAKER_PROBE_SECONDS", 0.01)
+    monkeypatch.setattr(llm_recovery, "LLM_BREAKER_MAX_WAIT_SECONDS", 1)
+    fake = fake_chat()
+    llm_backend.llm_breaker().is_open = True
+    answer = when_backend_available(lambda: chat_llm("m", PROMPT, log_context=LABEL), "calc.py")
+    assert answer.startswith('{"answer"')
+    assert not llm_backend.llm_breaker().is_open
+    assert len(fake.requests) == 1
@@ -0,0 +1,66 @@
+import pytest
+
+from evolving_graphs.agent_graph import llm_budget
+from evolving_graphs.agent_graph.llm_budget import BudgetGovernor, entity_of
+from evolving_graphs.agent_graph.llm_telemetry_summary import telemetry_summary
+from evolving_graphs.agent_graph.semantic_gatekeeper import SemanticGatekeeper
+from evolving_graphs.agent_graph.task_executor import TaskExecutor
+
+DRAFTER = "calc.py:add:Iter1:Drafter"
+ANSWER = "Adds `a` and `b` and returns the sum."
+CONTEXT = "def add(a, b):\n    return a + b\n"
+
+
+@pytest.fixture
+def governor(llm_state, monkeypatch):
+    """Installs a fresh governor; tests set its limits."""
+    governor = BudgetGovernor({})
+    monkeypatch.setattr(llm_budget, "_governor", governor)
+    return governor
+
+
+def test_entities_are_goal_loops_or_call_sites():
+    assert entity_of("calc.py:add:Iter3:Audit:Accuracy") == "calc.py:add"
+    assert entity_of("calc.py:add:Grounding") == "calc.py:add"
+    assert entity_of("MapCritic") == "MapCritic"
+
+
+def test_each_scope_has_its_own_call_and_token_budget():
+    governor = BudgetGovernor({"entity": (2, 0), "module": (0, 100), "run": (5, 0)})
+    governor.charge(DRAFTER, {"prompt_eval_count": 30, "eval_count": 10})
+    assert governor.exhausted(DRAFTER) is None
+    governor.charge("calc.py:add:Iter2:Drafter", {"prompt_eval_count": 30, "eval_count": 10})
+    assert governor.exhausted(DRAFTER) == "entity calc.py:add call budget (2) exhausted"
+    governor.charge("calc.py:sub:Iter1:Drafter", {"prompt_eval_count": 30})
+    assert governor.exhausted("calc.py:sub:Iter1:Drafter") == "module calc.py token budget (100) exhausted"
+    governor.charge("util.py:f:Iter1:Drafter")
+    governor.charge("util.py:g:Iter1:Drafter")
+    assert governor.exhausted("util.py:h:Iter1:Drafter") == "run call budget (5) exhausted"
+    assert governor.top_consumers("module", 1) == [("calc.py", {"calls": 3, "tokens": 110})]
+
+
+def test_disabled_governor_only_counts():
+    governor = BudgetGovernor({"entity": (1, 0)}, enabled=False)
+    governor.charge(DRAFTER)
+    assert governor.exhausted(DRAFTER) is None
+    assert governor.summary()["run"] == {"calls": 1, "tokens": 0}
+
+
+def test_gatekeeper_keeps_the_best_attempt_when_the_budget_runs_out(fake_ollama, governor):
+    governor.limits = {"entity": (2, 0)}
+    server, = fake_ollama(script={"answer": "It leverages addition."})
+    answer = SemanticGatekeeper().execute_with_feedback("Describe `add`.", "answer", forbidden_terms=["leverages"], log_context=DRAFTER)
+    assert answer == "It leverages addition. (⚠️ Unverified: entity calc.py:add call budget (2) exhausted)"
+    assert server.stats()["requests"] == 2
+    assert governor.degraded == {"calc.py:add": "entity calc.py:add call budget (2) exhausted"}
+
+
+def test_goal_loop_degrades_to_its_best_answer_and_reports_consumers(fake_ollama, governor):
+    governor.limits = {"entity": (6, 0)}
+    server, = fake_ollama(script={"answer": ANSWER, "status": "FAIL", "reason": "Misses the return value."})
+    answer = TaskExecutor(SemanticGatekeeper()).solve_complex_task("Describe `add`.", CONTEXT, "calc.py:add")
+    assert answer.startswith(f"{ANSWER} (⚠️ Unverified: entity calc.py:add call budget (6) exhausted")
+    assert server.stats()["requests"] == 6
+    budget = telemetry_summary()["budget"]
+    assert budget["top_entities"][0] == ("calc.py:add", {"calls": 6, "tokens": budget["run"]["tokens"]})
+    assert "calc.py:add" in budget["degraded"]
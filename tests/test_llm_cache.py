@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from evolving_graphs.agent_graph import llm_cache, llm_response_store
+from evolving_graphs.agent_graph.llm_cache import ResponseCache, request_key
+from evolving_graphs.agent_graph.llm_util import chat_llm
+
+MESSAGES = [{"role": "user", "content": "Describe `add`. Reply with key 'answer'."}]
+
+
+@pytest.fixture
+def cache_on(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_response_store, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(llm_response_store, "LLM_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(llm_cache, "_cache", None)
+
+
+def test_request_key_is_stable_and_covers_model_options_and_format():
+    key = request_key("m", MESSAGES, {"seed": 1})
+    assert key == request_key("m", [dict(MESSAGES[0])], {"seed": 1})
+    assert key != request_key("other", MESSAGES, {"seed": 1})
+    assert key != request_key("m", MESSAGES, {"seed": 2})
+    assert key != request_key("m", MESSAGES, {"seed": 1}, format={"type": "object"})
+    # Unset extras leave the key as it was.
+    assert key == request_key("m", MESSAGES, {"seed": 1}, format=None)
+
+
+def test_cache_round_trip_and_stats(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"))
+    assert cache.get("k") is None
+    cache.put("k", "m", "content")
+    assert cache.get("k") == "content"
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "entries": 1}
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    ResponseCache(path).put("k", "m", "content")
+    assert ResponseCache(path).get("k") == "content"
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), ttl_seconds=1)
+    cache.put("k", "m", "content")
+    cache._conn.execute("UPDATE responses SET created_at = ?", (time.time() - 10,))
+    assert cache.get("k") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), max_entries=2)
+    cache.put("a", "m", "A")
+    cache.put("b", "m", "B")
+    cache._conn.execute("UPDATE responses SET last_access = last_access - 10 WHERE key = 'a'")
+    cache.put("c", "m", "C")
+    assert cache.get("a") is None
+    assert cache.get("b") == "B" and cache.get("c") == "C"
+
+
+def test_row_count_is_tracked_without_counting_the_table(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    cache = ResponseCache(path, max_entries=2)
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    cache.put("a", "m", "A")
+    cache.put("a", "m", "A2")
+    cache.put("b", "m", "B")
+    cache.put("c", "m", "C")
+    assert not any("COUNT" in statement for statement in statements)
+    assert cache.stats()["entries"] == 2 and cache.stats()["evictions"] == 1
+    assert ResponseCache(path).stats()["entries"] == 2
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+
+
+def test_chat_llm_serves_repeated_request_from_cache(fake_chat, cache_on):
+    fake = fake_chat()
+    first = chat_llm("m", MESSAGES, log_context="calc.py:add:Iter1:Drafter")
+    second = chat_llm("m", MESSAGES, log_context="calc.py:add:Iter1:Drafter")
+    assert first == second == '{"answer": "answer of the request"}'
+    assert len(fake.requests) == 1
+    assert llm_response_store.get_cache_stats()["hits"] == 1
+
+
+def test_use_cache_false_bypasses_cache(fake_chat, cache_on):
+    fake = fake_chat()
+    chat_llm("m", MESSAGES, log_context="calc.py:add:Iter1:Drafter")
+    chat_llm("m", MESSAGES, use_cache=False, log_context="calc.py:add:Iter1:Drafter")
+    assert len(fake.requests) == 2
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from evolving_graphs.agent_graph import llm_stats
+from evolving_graphs.agent_graph.llm_async import achat_llm
+from evolving_graphs.agent_graph.llm_coalescer import AsyncSingleFlight
+
+
+def counting_call(calls, seconds=0.05, result="done"):
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(seconds)
+        return result
+    return call
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight, calls = AsyncSingleFlight(), []
+
+    async def main():
+        return await asyncio.gather(*[flight.do("k", counting_call(calls)) for _ in range(3)])
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert [r for r, _ in results] == ["done"] * 3
+    assert [shared for _, shared in results] == [False, True, True]
+
+
+def test_different_keys_and_later_calls_are_not_shared():
+    flight, calls = AsyncSingleFlight(), []
+
+    async def main():
+        await asyncio.gather(flight.do("a", counting_call(calls)), flight.do("b", counting_call(calls)))
+        return await flight.do("a", counting_call(calls))
+
+    assert asyncio.run(main()) == ("done", False)
+    assert len(calls) == 3
+
+
+def test_cancelling_one_waiter_keeps_the_shared_call():
+    flight, calls = AsyncSingleFlight(), []
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", counting_call(calls, 0.1)))
+        second = asyncio.ensure_future(flight.do("k", counting_call(calls, 0.1)))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == ("done", True)
+    assert len(calls) == 1
+
+
+def test_shared_call_is_cancelled_when_every_waiter_is_gone():
+    flight, finished = AsyncSingleFlight(), []
+
+    async def slow():
+        await asyncio.sleep(0.2)
+        finished.append(1)
+
+    async def main():
+        waiter = asyncio.ensure_future(flight.do("k", slow))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0.3)
+
+    asyncio.run(main())
+    assert finished == []
+
+
+def test_identical_in_flight_llm_requests_reach_the_backend_once(fake_chat):
+    fake = fake_chat(delay_s=lambda host: 0.1)
+    prompt = "Describe `add`. Reply with key 'answer'."
+
+    async def main():
+        return await asyncio.gather(*[achat_llm("m", prompt, log_context="calc.py:add:Iter1:Drafter") for _ in range(4)])
+
+    answers = asyncio.run(main())
+    assert len(set(answers)) == 1
+    assert len(fake.requests) == 1
+    counters = llm_stats.snapshot()
+    assert counters["backend_calls"] == 1 and counters["coalesced_calls"] == 3
@@ -0,0 +1,98 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import ollama
+import pytest
+
+from evolving_graphs.agent_graph import llm_backend, llm_fake_server, llm_router
+from evolving_graphs.agent_graph.llm_fake_server import FakeOllamaServer, fake_servers
+from evolving_graphs.agent_graph.llm_schemas import schema_for_key
+from evolving_graphs.agent_graph.llm_util import chat_llm
+
+
+def chat_body(content, **extra):
+    return dict({"model": "m", "messages": [{"role": "user", "content": content}]}, **extra)
+
+
+@pytest.fixture
+def running():
+    """Starts FakeOllamaServers with the given settings; they are stopped when the test ends."""
+    servers = []
+
+    def start(**kwargs):
+        servers.append(FakeOllamaServer(**kwargs))
+        servers[-1].start()
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def test_answers_follow_the_schema_the_prompt_or_the_script():
+    server = FakeOllamaServer(script={"answer": ["first", "second"]})
+    assert json.loads(server.answer(chat_body("Judge it.", format=schema_for_key("status")))) == {"status": "PASS"}
+    assert json.loads(server.answer(chat_body("Reply with key 'answer'."))) == {"answer": "first"}
+    assert json.loads(server.answer(chat_body("Reply with key 'answer'."))) == {"answer": "second"}
+    assert json.loads(server.answer(chat_body('Return {"score": 1-5, "reason": "..."}'))) == {"score": 5, "reason": "Consistent with the provided code."}
+    assert server.answer({"model": "m", "messages": []}) == ""
+
+
+def test_malformed_answers_are_not_valid_json():
+    server = FakeOllamaServer(malformed_rate=1.0)
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(server.answer(chat_body("Reply with key 'answer'.")))
+    assert server.stats()["malformed"] == 1
+
+
+@pytest.mark.parametrize("latency, low, high", [
+    ({"distribution": "fixed", "seconds": 0.3}, 0.3, 0.3),
+    ({"distribution": "uniform", "min_s": 0.1, "max_s": 0.2}, 0.1, 0.2),
+    ({"distribution": "lognormal", "median_s": 1.0, "sigma": 0.5}, 0.0, float("inf")),
+])
+def test_latency_is_sampled_from_the_configured_distribution(latency, low, high):
+    server = FakeOllamaServer(latency=latency)
+    samples = [server.prefill_seconds() for _ in range(50)]
+    assert all(low <= s <= high for s in samples)
+
+
+def test_ollama_client_speaks_to_it_over_http(running):
+    server = running()
+    client = ollama.Client(host=server.url)
+    response = client.chat(model="m", messages=[{"role": "user", "content": "Reply with key 'answer'."}])
+    assert json.loads(response["message"]["content"]) == {"answer": "Returns the value computed from its inputs."}
+    assert response["prompt_eval_count"] > 0
+    streamed = "".join(chunk["message"]["content"] for chunk in client.chat(model="m", messages=[{"role": "user", "content": "Reply with key 'answer'."}], stream=True))
+    assert streamed == response["message"]["content"]
+    assert client.list() is not None
+
+
+def test_injected_errors_reach_the_client_as_http_500(running):
+    server = running(error_rate=1.0)
+    with pytest.raises(ollama.ResponseError) as error:
+        ollama.Client(host=server.url).chat(model="m", messages=[{"role": "user", "content": "hi"}])
+    assert error.value.status_code == 500
+
+
+def test_requests_beyond_the_slots_queue(running):
+    server = running(slots=2, latency={"distribution": "fixed", "seconds": 0.1})
+    client = ollama.Client(host=server.url)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda i: client.chat(model="m", messages=[{"role": "user", "content": f"q{i}"}]), range(6)))
+    # A handler frees its slot just after the client has the response.
+    deadline = time.monotonic() + 1
+    while server.stats()["active"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = server.stats()
+    assert stats["requests"] == 6 and stats["peak_active"] == 2 and stats["peak_queued"] > 0
+    assert stats["active"] == stats["queued"] == 0
+
+
+def test_configuration_routes_chat_llm_to_fake_servers(llm_state, monkeypatch):
+    monkeypatch.setattr(llm_backend, "LLM_FAKE_SERVERS", 1)
+    monkeypatch.setattr(llm_fake_server, "LLM_FAKE_SERVERS", 1)
+    monkeypatch.setattr(llm_router, "_router", None)
+    answer = chat_llm("m", "Describe `add`. Reply with key 'answer'.", log_context="calc.py:add:Iter1:Drafter")
+    assert json.loads(answer) == {"answer": "Returns the value computed from its inputs."}
+    assert sum(s.stats()["requests"] for s in fake_servers()) >= 1
@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+from evolving_graphs.agent_graph import llm_hedging, llm_stats
+from evolving_graphs.agent_graph.llm_hedging import LatencyTracker, ahedged_call, hedge_delay, observe_latency
+from evolving_graphs.agent_graph.llm_router import EndpointRouter
+from evolving_graphs.agent_graph.llm_telemetry import get_telemetry
+from evolving_graphs.agent_graph.llm_util import chat_llm
+
+LABEL = "calc.py:add:Iter1:Drafter"
+
+
+def enable_hedging(monkeypatch, min_samples=1):
+    monkeypatch.setattr(llm_hedging, "LLM_HEDGE_ENABLED", True)
+    monkeypatch.setattr(llm_hedging, "LLM_HEDGE_PERCENTILE", 95)
+    monkeypatch.setattr(llm_hedging, "LLM_HEDGE_MIN_SAMPLES", min_samples)
+
+
+def test_percentile_needs_enough_samples_and_uses_nearest_rank():
+    tracker = LatencyTracker(window=10)
+    for seconds in (1.0, 2.0, 3.0, 4.0):
+        tracker.observe("drafter", seconds)
+    assert tracker.percentile("drafter", 50, min_samples=5) is None
+    assert tracker.percentile("drafter", 50, min_samples=4) == 3.0
+    assert tracker.percentile("drafter", 100, min_samples=1) == 4.0
+    assert tracker.percentile("grounding", 50, min_samples=1) is None
+
+
+def test_window_keeps_only_recent_latencies():
+    tracker = LatencyTracker(window=2)
+    for seconds in (10.0, 1.0, 2.0):
+        tracker.observe("drafter", seconds)
+    assert tracker.percentile("drafter", 100, min_samples=1) == 2.0
+
+
+def test_hedge_delay_is_per_category_and_off_by_default(llm_state, monkeypatch):
+    observe_latency(LABEL, 0.5)
+    assert hedge_delay(LABEL) is None
+    enable_hedging(monkeypatch)
+    assert hedge_delay("calc.py:sub:Iter3:Drafter") == 0.5
+    assert hedge_delay("calc.py:add:Iter1:Audit:Relevance") is None
+
+
+def test_slow_call_is_hedged_and_the_loser_cancelled(llm_state):
+    router = EndpointRouter(["http://slow:1", "http://fast:2"])
+    cancelled = []
+
+    async def call(client):
+        if "slow" in str(client._client.base_url):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+        return "answer"
+
+    started = time.perf_counter()
+    assert asyncio.run(ahedged_call(router, call, delay=0.05)) == ("answer", True)
+    assert time.perf_counter() - started < 1
+    assert cancelled == [1]
+    assert llm_stats.snapshot()["hedge_wins"] == 1
+    assert all(e.outstanding == 0 for e in router.endpoints)
+
+
+def test_fast_call_is_not_hedged(llm_state):
+    router = EndpointRouter(["http://a:1", "http://b:2"])
+
+    async def call(client):
+        return "answer"
+
+    assert asyncio.run(ahedged_call(router, call, delay=0.5)) == ("answer", False)
+    assert "hedges_sent" not in llm_stats.snapshot()
+
+
+def test_stalled_endpoint_is_hedged_end_to_end(fake_chat, monkeypatch):
+    enable_hedging(monkeypatch)
+    fake = fake_chat(delay_s=lambda host: 3.0 if host == "http://slow:1" else 0.0, hosts=("http://slow:1", "http://fast:2"))
+    observe_latency(LABEL, 0.05)
+    started = time.perf_counter()
+    answer = chat_llm("m", "Describe `add`. Reply with key 'answer'.", log_context=LABEL)
+    assert answer == '{"answer": "answer of the request"}'
+    assert time.perf_counter() - started < 2
+    # The slow endpoint's request was cancelled while it waited, so only the hedge reached the fake.
+    assert [request["host"] for request in fake.requests] == ["http://fast:2"]
+    record, = get_telemetry().snapshot()["records"]
+    assert record.hedged
+    assert llm_stats.snapshot()["hedge_wins"] == 1
@@ -0,0 +1,108 @@
+import asyncio
+
+import ollama
+import pytest
+
+from evolving_graphs.agent_graph import llm_limiter
+from evolving_graphs.agent_graph.llm_async import achat_llm
+from evolving_graphs.agent_graph.llm_limiter import AdaptiveLimiter, LimiterSlot
+from evolving_graphs.agent_graph.llm_telemetry_summary import telemetry_summary
+
+
+def complete(limiter, latency_s, ok=True, category="drafter"):
+    ticket = limiter.acquire()
+    limiter.release(ticket, category, latency_s, ok)
+
+
+def warm_up(limiter, latency_s=1.0, rounds=5):
+    for _ in range(rounds):
+        complete(limiter, latency_s)
+
+
+def test_on_time_completions_at_the_limit_raise_it_additively():
+    limiter = AdaptiveLimiter(1, 1, 4)
+    complete(limiter, 1.0)
+    assert limiter.limit == 2
+    held = limiter.acquire()
+    complete(limiter, 1.0)
+    assert limiter.limit == 2.5
+    limiter.release(held, "drafter", 1.0, ok=True)
+    assert limiter.limit == 2.5 and limiter.increases == 2
+
+
+def test_completions_below_the_limit_do_not_raise_it():
+    limiter = AdaptiveLimiter(4, 1, 8)
+    warm_up(limiter)
+    assert limiter.limit == 4 and limiter.increases == 0
+
+
+def test_failures_and_slow_calls_cut_the_limit_multiplicatively():
+    limiter = AdaptiveLimiter(8, 2, 8, backoff=0.5)
+    warm_up(limiter)
+    complete(limiter, 1.0, ok=False)
+    assert limiter.limit == 4
+    complete(limiter, 5.0)
+    assert limiter.limit == 2
+    complete(limiter, 5.0)
+    assert limiter.limit == 2 and limiter.stats()["low_limit"] == 2
+
+
+def test_slowness_is_judged_against_the_calls_own_category():
+    limiter = AdaptiveLimiter(8, 1, 8)
+    warm_up(limiter, latency_s=10.0)
+    complete(limiter, 10.0, category="drafter")
+    complete(limiter, 10.0, category="relevance_audit")
+    assert limiter.decreases == 0
+
+
+def test_requests_already_in_flight_cause_one_decrease_per_round():
+    limiter = AdaptiveLimiter(4, 1, 4, backoff=0.5)
+    tickets = [limiter.acquire() for _ in range(4)]
+    for ticket in tickets:
+        limiter.release(ticket, "drafter", 1.0, ok=False)
+    assert limiter.limit == 2 and limiter.decreases == 1
+
+
+def test_fixed_limit_never_adapts():
+    limiter = AdaptiveLimiter(2, 1, 8, adaptive=False)
+    for _ in range(10):
+        complete(limiter, 1.0)
+    complete(limiter, 1.0, ok=False)
+    assert limiter.limit == 2 and limiter.max_limit == 2
+
+
+def test_cancelled_slot_is_released_without_adjusting():
+    limiter = AdaptiveLimiter(2, 1, 2, backoff=0.5)
+
+    async def cancelled_call():
+        async with LimiterSlot(limiter, "calc.py:add:Iter1:Drafter"):
+            await asyncio.sleep(1)
+
+    async def main():
+        task = asyncio.ensure_future(cancelled_call())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(main())
+    assert limiter.in_flight == 0 and limiter.limit == 2
+
+
+async def calls(count):
+    return await asyncio.gather(*[achat_llm("m", f"Describe function {i}. Reply with key 'answer'.", log_context=f"calc.py:f{i}:Iter1:Drafter") for i in range(count)])
+
+
+def test_limit_grows_under_healthy_load_and_shows_in_telemetry(fake_chat, monkeypatch):
+    monkeypatch.setattr(llm_limiter, "_limiter", AdaptiveLimiter(1, 1, 4, latency_factor=50.0))
+    fake = fake_chat(delay_s=lambda host: 0.02)
+    asyncio.run(calls(24))
+    concurrency = telemetry_summary()["concurrency"]
+    assert concurrency["increases"] > 0 and concurrency["limit"] > 1
+    assert fake.peak_active > 1
+
+
+def test_limit_shrinks_when_the_backend_fails(fake_chat, monkeypatch):
+    monkeypatch.setattr(llm_limiter, "_limiter", AdaptiveLimiter(4, 1, 4))
+    fake_chat(reply=lambda request: ollama.ResponseError("overloaded", 503))
+    asyncio.run(calls(2))
+    assert llm_limiter.get_limiter().stats()["limit"] < 4
@@ -0,0 +1,72 @@
+import asyncio
+
+from evolving_graphs.agent_graph import llm_profiles
+from evolving_graphs.agent_graph.agent_config import CONTEXT_LIMIT, DEFAULT_MODEL
+from evolving_graphs.agent_graph.goal_loop_audits import GoalLoopAuditor
+from evolving_graphs.agent_graph.llm_profiles import generation_options, model_for
+from evolving_graphs.agent_graph.llm_telemetry_summary import telemetry_summary
+from evolving_graphs.agent_graph.semantic_gatekeeper import SemanticGatekeeper
+
+CATEGORY_LABELS = {
+    "drafter": "calc.py:add:Iter1:Drafter",
+    "relevance_audit": "calc.py:add:Iter1:Audit:Relevance",
+    "accuracy_audit": "calc.py:add:Iter1:Audit:Accuracy",
+    "grounding": "calc.py:add:Iter1:Grounding",
+    "critic": "MapCritic",
+    "synthesis": "calc.py:SystemicSynthesis",
+}
+
+
+def test_every_category_gets_deterministic_options_with_the_shared_context():
+    for category, label in CATEGORY_LABELS.items():
+        options = generation_options(label)
+        assert options["num_ctx"] == CONTEXT_LIMIT, category
+        assert options["seed"] == 42, category
+    assert generation_options(CATEGORY_LABELS["drafter"])["num_predict"] == 384
+    assert generation_options(CATEGORY_LABELS["relevance_audit"])["num_predict"] == 192
+    assert generation_options(CATEGORY_LABELS["synthesis"])["temperature"] == 0.3
+
+
+def test_unknown_labels_get_only_the_defaults(monkeypatch):
+    monkeypatch.setattr(llm_profiles, "LLM_GENERATION_DEFAULTS", {"num_ctx": 2048, "seed": 1})
+    assert generation_options("ProjectSummary") == {"num_ctx": 2048, "seed": 1}
+
+
+def test_profiles_override_defaults_without_sharing_state(monkeypatch):
+    monkeypatch.setattr(llm_profiles, "LLM_GENERATION_PROFILES", {"drafter": {"temperature": 0.5}})
+    options = generation_options(CATEGORY_LABELS["drafter"])
+    options["seed"] = 7
+    assert generation_options(CATEGORY_LABELS["drafter"])["seed"] == 42
+    assert options["temperature"] == 0.5
+
+
+def test_gatekeeper_sends_the_profile_of_its_log_context(fake_chat):
+    bodies = fake_chat().requests
+    gatekeeper = SemanticGatekeeper()
+    gatekeeper.execute_with_feedback("Describe `add`.", "answer", log_context=CATEGORY_LABELS["drafter"])
+    asyncio.run(gatekeeper.aexecute_with_feedback("Is it relevant?", "status", log_context=CATEGORY_LABELS["relevance_audit"]))
+    drafter, audit = (body["options"] for body in bodies)
+    assert drafter == generation_options(CATEGORY_LABELS["drafter"])
+    assert audit["num_predict"] == 192 and audit["seed"] == 42
+
+
+def test_roles_without_a_tier_use_the_default_model(monkeypatch):
+    monkeypatch.setattr(llm_profiles, "LLM_ROLE_MODELS", {"relevance_audit": "small"})
+    assert model_for(CATEGORY_LABELS["relevance_audit"]) == "small"
+    assert model_for(CATEGORY_LABELS["drafter"]) == DEFAULT_MODEL
+    assert model_for("ProjectSummary") == DEFAULT_MODEL
+
+
+def test_audits_run_on_their_tier_and_report_its_pass_rate(fake_chat, monkeypatch):
+    monkeypatch.setattr(llm_profiles, "LLM_ROLE_MODELS", {"relevance_audit": "small"})
+    bodies = fake_chat().requests
+    gatekeeper = SemanticGatekeeper()
+    gatekeeper.execute_with_feedback("Describe `add`.", "answer", log_context=CATEGORY_LABELS["drafter"])
+    verdict = asyncio.run(GoalLoopAuditor(gatekeeper).acheck_relevance(
+        "Adds `a` and `b` and returns the sum.", "Describe `add`.", "def add(a, b): return a + b", "calc.py:add:Iter1"))
+    assert verdict.status == "PASS"
+    assert [body["model"] for body in bodies] == [DEFAULT_MODEL, "small"]
+    tiers = telemetry_summary()["by_tier"]
+    assert tiers["small"]["backend_calls"] == 1 and tiers["small"]["avg_latency_s"] > 0
+    assert (tiers["small"]["verdicts"], tiers["small"]["pass_rate"]) == (1, 1.0)
+    assert tiers[DEFAULT_MODEL]["pass_rate"] is None
@@ -0,0 +1,86 @@
+import json
+import time
+
+import pytest
+
+from evolving_graphs.agent_graph import llm_replay, llm_response_store
+from evolving_graphs.agent_graph.llm_replay import LLMRecording, ReplayMiss, replay_delay
+from evolving_graphs.agent_graph.llm_response_store import llm_recording, write_replay_report
+from evolving_graphs.agent_graph.llm_util import chat_llm
+
+LABEL = "calc.py:add:Iter1:Drafter"
+
+
+def prompt(name):
+    return f"Describe `{name}`. Reply with key 'answer'."
+
+
+@pytest.fixture
+def backend_mode(llm_state, monkeypatch, tmp_path):
+    """Switches the LLM layer between "record" and "replay" on one recording file."""
+    monkeypatch.setattr(llm_response_store, "LLM_RECORDING_PATH", str(tmp_path / "run.jsonl.gz"))
+    monkeypatch.setattr(llm_response_store, "LLM_REPLAY_MISS_REPORT_PATH", str(tmp_path / "misses.json"))
+    monkeypatch.setattr(llm_response_store, "LLM_REPLAY_LATENCY_SCALE", 0.0)
+    monkeypatch.setattr(llm_response_store, "LLM_REPLAY_LATENCY_SECONDS", 0.0)
+
+    def switch(mode):
+        if llm_replay._recording is not None:
+            llm_replay._recording.flush()
+        monkeypatch.setattr(llm_replay, "_recording", None)
+        monkeypatch.setattr(llm_response_store, "LLM_BACKEND_MODE", mode)
+
+    return switch
+
+
+def test_recording_round_trip_keeps_the_first_response(tmp_path):
+    path = str(tmp_path / "r.jsonl.gz")
+    recording = LLMRecording(path, flush_every=1)
+    recording.add("k", LABEL, "m", "first", {"prompt_eval_count": 10, "eval_count": 2}, 1.23456)
+    recording.add("k", LABEL, "m", "second", None, None)
+    entry = LLMRecording(path).get("k", LABEL, "m")
+    assert (entry["content"], entry["prompt_eval_count"], entry["latency_s"]) == ("first", 10, 1.2346)
+    assert "prompt" not in entry
+
+
+def test_interrupted_recording_keeps_complete_members(tmp_path):
+    path = str(tmp_path / "r.jsonl.gz")
+    recording = LLMRecording(path, flush_every=1)
+    recording.add("a", LABEL, "m", "A", None, None)
+    with open(path, "ab") as f:
+        f.write(b"\x1f\x8b\x08\x00 truncated")
+    assert LLMRecording(path).get("a", LABEL, "m")["content"] == "A"
+
+
+def test_misses_raise_and_are_reported(tmp_path):
+    recording = LLMRecording(str(tmp_path / "r.jsonl.gz"))
+    with pytest.raises(ReplayMiss):
+        recording.get("missing", LABEL, "m", preview="Describe `add`.")
+    report = recording.write_miss_report(str(tmp_path / "misses.json"))
+    assert report["misses"] == 1
+    assert report["missed_requests"][0]["prompt_preview"] == "Describe `add`."
+
+
+def test_replay_delay_scales_the_recorded_latency():
+    assert replay_delay({"latency_s": 2.0}, 0.5, 0.1) == pytest.approx(1.1)
+    assert replay_delay({"latency_s": None}, 1.0, 0.0) == 0.0
+
+
+def test_recorded_run_replays_without_a_backend(fake_chat, backend_mode, monkeypatch):
+    backend_mode("record")
+    fake = fake_chat()
+    recorded = [chat_llm("m", prompt(name), log_context=LABEL) for name in ("add", "sub")]
+    assert llm_recording().stats()["recorded"] == 2
+    fake.down.add("http://llm:1")
+
+    backend_mode("replay")
+    monkeypatch.setattr(llm_response_store, "LLM_REPLAY_LATENCY_SECONDS", 0.05)
+    started = time.perf_counter()
+    assert [chat_llm("m", prompt(name), log_context=LABEL) for name in ("add", "sub")] == recorded
+    assert time.perf_counter() - started >= 0.1
+    assert chat_llm("m", prompt("mul"), log_context=LABEL).startswith("Error:")
+    assert len(fake.requests) == 2
+
+    report = write_replay_report()
+    assert (report["hits"], report["misses"]) == (2, 1)
+    with open(llm_response_store.LLM_REPLAY_MISS_REPORT_PATH, encoding="utf-8") as f:
+        assert json.load(f)["missed_requests"][0]["label"] == LABEL
@@ -0,0 +1,75 @@
+import json
+import time
+
+import ollama
+
+from evolving_graphs.agent_graph import llm_backend
+from evolving_graphs.agent_graph.llm_router import EndpointRouter, is_endpoint_fault
+from evolving_graphs.agent_graph.llm_util import chat_llm
+
+
+def test_least_outstanding_endpoint_is_picked():
+    router = EndpointRouter(["http://a:1", "http://b:2"])
+    first = router.acquire(probe=False)
+    second = router.acquire(probe=False)
+    assert {first.name, second.name} == {"http://a:1", "http://b:2"}
+    router.release(first, ok=True)
+    assert router.acquire(probe=False) is first
+
+
+def test_failed_endpoint_is_ejected_and_skipped():
+    router = EndpointRouter(["http://a:1", "http://b:2"], cooldown_s=60)
+    bad = router.acquire(probe=False)
+    router.release(bad, ok=False)
+    assert all(router.acquire(probe=False) is not bad for _ in range(3))
+    assert router.stats()[bad.name]["available"] is False
+    assert router.stats()[bad.name]["ejections"] == 1
+
+
+def test_all_ejected_falls_back_to_the_soonest_returning_endpoint():
+    router = EndpointRouter(["http://a:1", "http://b:2"], cooldown_s=60)
+    a, b = router.endpoints
+    a.ejected_until, b.ejected_until = time.monotonic() + 60, time.monotonic() + 5
+    assert router.acquire(probe=False) is b
+    assert router.acquire(exclude=[a, b]) is None
+
+
+def test_session_sticks_to_its_endpoint_unless_clearly_busier():
+    router = EndpointRouter(["http://a:1", "http://b:2"])
+    pinned = router.acquire(probe=False, session="calc.py:add")
+    assert router.acquire(probe=False, session="calc.py:add") is pinned
+    assert router.acquire(probe=False, session="calc.py:add") is not pinned
+
+
+def test_request_errors_do_not_eject_endpoints():
+    assert not is_endpoint_fault(ollama.ResponseError("invalid options", 400))
+    assert is_endpoint_fault(ollama.ResponseError("model not found", 404))
+    assert is_endpoint_fault(ollama.ResponseError("overloaded", 503))
+    assert is_endpoint_fault(ConnectionError())
+
+
+def test_expired_endpoint_needs_a_health_check_to_return(fake_chat):
+    fake = fake_chat()
+    fake.down.add("http://dead:2")
+    router = EndpointRouter(["http://live:1", "http://dead:2"], cooldown_s=60, health_timeout=0.5)
+    live, dead = router.endpoints
+    for endpoint in router.endpoints:
+        endpoint.ejected_until = time.monotonic() - 1
+    router.acquire()
+    assert live.is_available(time.monotonic())
+    assert not dead.is_available(time.monotonic())
+    assert router.health_check() == {live.name: True, dead.name: False}
+
+
+def test_calls_fail_over_to_a_healthy_endpoint(fake_chat):
+    def reply(request):
+        if request["host"] == "http://broken:1":
+            return ollama.ResponseError("overloaded", 503)
+        return json.dumps({"answer": "Adds numbers."})
+
+    fake = fake_chat(reply=reply, hosts=("http://broken:1", "http://healthy:2"))
+    answers = [chat_llm("m", f"Describe function {i}. Reply with key 'answer'.", log_context=f"calc.py:f{i}:Iter1:Drafter") for i in range(4)]
+    assert answers == ['{"answer": "Adds numbers."}'] * 4
+    assert [request["host"] for request in fake.requests].count("http://broken:1") == 1
+    assert [request["host"] for request in fake.requests].count("http://healthy:2") == 4
+    assert llm_backend.llm_router().stats()["http://broken:1"]["ejections"] == 1
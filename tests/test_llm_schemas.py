@@ -0,0 +1,55 @@
+from evolving_graphs.agent_graph import llm_schemas, llm_stats
+from evolving_graphs.agent_graph.gatekeeper_json import parse_json_safe
+from evolving_graphs.agent_graph.llm_schemas import format_retry_summary, schema_for_key, select_json_format
+from evolving_graphs.agent_graph.semantic_gatekeeper import SemanticGatekeeper
+
+
+def test_known_and_unknown_keys_get_schemas():
+    assert schema_for_key("status")["properties"]["status"]["enum"] == ["PASS", "FAIL", "VAGUE"]
+    assert schema_for_key("results")["properties"]["results"]["type"] == "array"
+    assert schema_for_key("purpose") == {"type": "object", "properties": {"purpose": {"type": "string"}}, "required": ["purpose"]}
+
+
+def test_select_json_format_honours_switch_and_control_group(monkeypatch):
+    monkeypatch.setattr(llm_schemas, "LLM_JSON_SCHEMA_ENABLED", True)
+    monkeypatch.setattr(llm_schemas, "LLM_JSON_SCHEMA_CONTROL_RATE", 0.0)
+    assert select_json_format("answer", "prompt") == schema_for_key("answer")
+    monkeypatch.setattr(llm_schemas, "LLM_JSON_SCHEMA_CONTROL_RATE", 1.0)
+    assert select_json_format("answer", "prompt") is None
+    monkeypatch.setattr(llm_schemas, "LLM_JSON_SCHEMA_CONTROL_RATE", 0.5)
+    choices = {p: select_json_format("answer", p) is None for p in (f"prompt {i}" for i in range(50))}
+    assert choices == {p: select_json_format("answer", p) is None for p in choices}
+    assert 0 < sum(choices.values()) < 50
+    monkeypatch.setattr(llm_schemas, "LLM_JSON_SCHEMA_ENABLED", False)
+    assert select_json_format("answer", "prompt") is None
+
+
+def test_parse_json_safe_repairs_common_model_output():
+    assert parse_json_safe('```json\n{"answer": "Adds numbers."}\n```', "answer") == ("Adds numbers.", None)
+    assert parse_json_safe('Sure! {"answer": "Adds numbers.""}', "answer") == ("Adds numbers.", None)
+    assert parse_json_safe("{'answer': 'Adds numbers.'}", "answer") == ("Adds numbers.", None)
+    value, error = parse_json_safe("", "answer")
+    assert value is None and error
+
+
+def test_constrained_calls_are_counted_without_format_retries(fake_chat, monkeypatch):
+    monkeypatch.setattr(llm_schemas, "LLM_JSON_SCHEMA_ENABLED", True)
+    monkeypatch.setattr(llm_schemas, "LLM_JSON_SCHEMA_CONTROL_RATE", 0.0)
+    fake = fake_chat()
+    verdict = SemanticGatekeeper().execute_with_feedback("Is the answer relevant?", "status", log_context="calc.py:add:Iter1:Audit:Relevance")
+    # The fake fills the schema's enum, so the constrained answer parses on the first attempt.
+    assert verdict == "PASS"
+    assert fake.requests[0]["format"] == schema_for_key("status")
+    counters = llm_stats.snapshot()
+    assert counters["json_calls_constrained"] == 1
+    assert counters["format_retries_constrained"] == 0
+    assert format_retry_summary().startswith("constrained 1 calls / 0 format retries")
+
+
+def test_malformed_unconstrained_answer_is_rescued_by_the_repair_cascade(fake_chat, monkeypatch):
+    monkeypatch.setattr(llm_schemas, "LLM_JSON_SCHEMA_CONTROL_RATE", 1.0)
+    fake = fake_chat(reply=lambda request: 'Here you go: {"answer": "Adds `a` and `b` and returns the sum.""}')
+    answer = SemanticGatekeeper().execute_with_feedback("Describe `add`. Reply with key 'answer'.", "answer", log_context="calc.py:add:Iter1:Drafter")
+    assert answer == "Adds `a` and `b` and returns the sum."
+    assert len(fake.requests) == 1 and fake.requests[0].get("format") is None
+    assert llm_stats.snapshot()["json_calls_unconstrained"] == 1
@@ -0,0 +1,105 @@
+import pytest
+
+from evolving_graphs.agent_graph import llm_response_store, llm_semantic_cache
+from evolving_graphs.agent_graph.goal_loop_prompts import build_relevance_prompt
+from evolving_graphs.agent_graph.llm_schemas import schema_for_key
+from evolving_graphs.agent_graph.llm_telemetry_summary import telemetry_summary
+from evolving_graphs.agent_graph.llm_util import chat_llm
+
+CONTEXT = "\n".join(
+    f"def step_{i}(items):\n    total = sum(item.weight for item in items)\n    return total / len(items)\n"
+    for i in range(40)
+)
+GOAL = "Describe what `step_3` does."
+LABEL = "module.py:step_3:Iter1:Audit:Relevance"
+STATUS = schema_for_key("status")
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(llm_response_store, "LLM_SEMANTIC_CACHE_MODE", "on")
+    monkeypatch.setattr(llm_semantic_cache, "_semantic_cache", None)
+    return llm_response_store.semantic_cache()
+
+
+def relevance_messages(answer, context=CONTEXT):
+    prompt = build_relevance_prompt(GOAL, answer, context)
+    return [{"role": "user", "content": prompt}]
+
+
+def answer_and_store(messages, content):
+    served, probe = llm_response_store.lookup_semantic_response("model", messages, LABEL)
+    assert served is None
+    llm_response_store.store_semantic_response(probe, str(id(messages)), content, LABEL)
+
+
+def lookup(messages):
+    return llm_response_store.lookup_semantic_response("model", messages, LABEL)[0]
+
+
+def test_split_subject_separates_answer_from_context():
+    context, subject = llm_semantic_cache.split_subject(relevance_messages("Averages the `weight` of `items`."))
+    assert subject == "averages the `weight` of `items`."
+    assert "averages" not in context
+    assert "def step_3(items):" in context
+
+
+def test_different_answers_over_same_context_are_not_shared(cache):
+    answer_and_store(relevance_messages("Returns the mean `weight` of `items`."), '{"status": "PASS"}')
+    assert lookup(relevance_messages("Manages and handles the processing of data.")) is None
+
+
+def test_near_duplicate_answer_over_same_context_is_served(cache):
+    answer_and_store(relevance_messages("Returns the mean `weight` of the given `items` list as a float."), '{"status": "PASS"}')
+    assert lookup(relevance_messages("Returns the mean `weight` of the given `items` list as a float ")) == '{"status": "PASS"}'
+
+
+def test_same_answer_over_different_context_is_not_shared(cache):
+    answer = "Returns the mean `weight` of `items`."
+    answer_and_store(relevance_messages(answer), '{"status": "PASS"}')
+    assert lookup(relevance_messages(answer, CONTEXT.replace("sum", "max"))) is None
+
+
+def test_verdict_is_the_first_word_of_the_first_value():
+    assert llm_semantic_cache.verdict_of('{"status": "PASS", "reason": "ok"}') == "PASS"
+    assert llm_semantic_cache.verdict_of('{"score": 4}') == "4"
+    assert llm_semantic_cache.verdict_of("fail. The claim is wrong") == "FAIL"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = llm_semantic_cache.SemanticCache(max_entries=2, mode="on")
+    for key in ("a", "b"):
+        cache.store(key, "scope", cache.embed(f"answer {key}"), key)
+    cache.lookup("scope", cache.embed("answer a"))
+    cache.store("c", "scope", cache.embed("answer c"), "c")
+    assert cache.lookup("scope", cache.embed("answer b"))[1] != "b"
+    assert cache.stats()["entries"] == 2
+
+
+def test_near_duplicate_audit_is_served_without_a_backend_call(fake_ollama, cache):
+    server, = fake_ollama(script={"status": "PASS"})
+    first = chat_llm("model", relevance_messages("Returns the mean `weight` of the given `items` list as a float."), format=STATUS, log_context=LABEL)
+    second = chat_llm("model", relevance_messages("Returns the mean `weight` of the given `items` list as a float "), format=STATUS, log_context=f"{LABEL}:ReAudit")
+    assert first == second == '{"status": "PASS"}'
+    assert server.stats()["requests"] == 1
+    stats = telemetry_summary()["semantic_cache"]
+    assert (stats["lookups"], stats["hits"], stats["hit_rate"]) == (2, 1, 0.5)
+
+
+def test_shadow_mode_only_measures_agreement(fake_ollama, cache, monkeypatch):
+    monkeypatch.setattr(cache, "mode", "shadow")
+    server, = fake_ollama(script={"status": ["PASS", "FAIL"]})
+    chat_llm("model", relevance_messages("Returns the mean `weight` of the given `items` list as a float."), format=STATUS, log_context=LABEL)
+    chat_llm("model", relevance_messages("Returns the mean `weight` of the given `items` list as a float "), format=STATUS, log_context=LABEL)
+    assert server.stats()["requests"] == 2
+    stats = cache.stats()
+    assert stats["hits"] == 0
+    assert [(b["compared"], b["agreed"]) for b in stats["by_similarity"].values()] == [(1, 0)]
+
+
+def test_drafter_calls_never_use_the_semantic_cache(fake_ollama, cache):
+    server, = fake_ollama()
+    for _ in range(2):
+        chat_llm("model", relevance_messages("Returns the mean `weight` of `items`."), log_context="module.py:step_3:Iter1:Drafter")
+    assert server.stats()["requests"] == 2
+    assert cache.stats()["lookups"] == 0
@@ -0,0 +1,85 @@
+import time
+
+import ollama
+
+from evolving_graphs.agent_graph import llm_backend, llm_response_store, llm_session
+from evolving_graphs.agent_graph.agent_util import project_pulse
+from evolving_graphs.agent_graph.llm_session import LLMSession
+from evolving_graphs.agent_graph.llm_util import chat_llm
+from evolving_graphs.agent_graph.module_contextualizer import ModuleContextualizer
+
+
+def test_warm_up_preloads_every_model_on_every_endpoint(fake_chat, monkeypatch):
+    monkeypatch.setattr(llm_session, "LLM_SESSION_KEEP_ALIVE", "30m")
+    bodies = fake_chat(hosts=("http://a:1", "http://b:2")).requests
+    session = LLMSession(models=["big", "small"])
+    thread = session.warm_up()
+    assert session.warm_up() is thread
+    assert session.wait_until_warm(timeout=5)
+    assert sorted((body["host"], body["model"]) for body in bodies) == [
+        ("http://a:1", "big"), ("http://a:1", "small"), ("http://b:2", "big"), ("http://b:2", "small")]
+    assert all(body["messages"] == [] and body["keep_alive"] == "30m" for body in bodies)
+    assert session.warm_up_seconds is not None
+
+
+def test_preloaded_models_stay_pinned_by_calls_outside_a_session(fake_chat, monkeypatch):
+    monkeypatch.setattr(llm_backend, "LLM_SESSION_KEEP_ALIVE", "30m")
+    bodies = fake_chat().requests
+    chat_llm("m", "Critique the map. Reply with key 'issues'.", log_context="MapCritic")
+    monkeypatch.setattr(llm_backend, "LLM_PRELOAD_MODELS", False)
+    chat_llm("m", "Critique the map again. Reply with key 'issues'.", log_context="MapCritic")
+    assert [body["keep_alive"] for body in bodies] == ["30m", None]
+
+
+def test_warm_up_is_skipped_when_disabled_or_replaying(fake_chat, monkeypatch):
+    fake = fake_chat()
+    monkeypatch.setattr(llm_session, "LLM_PRELOAD_MODELS", False)
+    assert LLMSession().warm_up() is None
+    monkeypatch.setattr(llm_session, "LLM_PRELOAD_MODELS", True)
+    monkeypatch.setattr(llm_response_store, "LLM_BACKEND_MODE", "replay")
+    session = LLMSession()
+    assert session.warm_up() is None and session.wait_until_warm()
+    assert fake.requests == []
+
+
+def test_failed_preload_does_not_stop_the_warm_up(fake_chat):
+    fake = fake_chat(reply=lambda request: ollama.ResponseError("model not found", 404))
+    session = LLMSession(models=["big", "small"])
+    session.warm_up()
+    assert session.wait_until_warm(timeout=5)
+    assert len(fake.requests) == 2
+
+
+def test_health_check_probes_every_endpoint(fake_chat):
+    fake = fake_chat(hosts=("http://a:1", "http://b:2"))
+    fake.down.add("http://b:2")
+    assert LLMSession().health_check() == {"http://a:1": True, "http://b:2": False}
+
+
+def test_session_uses_one_pooled_router_and_shares_its_gatekeeper(fake_chat):
+    fake_chat()
+    session = LLMSession()
+    assert LLMSession().router is session.router
+    contextualizers = [ModuleContextualizer(name, {name: {}}, {}, gatekeeper=session.gatekeeper) for name in ("a.py", "b.py")]
+    assert all(c.gatekeeper is session.gatekeeper for c in contextualizers)
+    assert all(c.task_executor.gatekeeper is session.gatekeeper for c in contextualizers)
+
+
+def test_analysis_starts_once_the_models_are_warm(fake_chat, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    fake = fake_chat()
+    session = LLMSession(models=["big"])
+    warm_when_called, reply = [], fake.reply
+
+    def slow_preload(request):
+        if not request["messages"]:
+            time.sleep(0.3)
+        else:
+            warm_when_called.append(session.warm_up_seconds is not None)
+        return reply(request)
+
+    fake.reply = slow_preload
+    session.warm_up()
+    (tmp_path / "calc.py").write_text("RATE = 2\n")
+    project_pulse(str(tmp_path / "calc.py"), session=session)
+    assert warm_when_called and all(warm_when_called)
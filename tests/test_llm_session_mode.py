@@ -0,0 +1,59 @@
+import pytest
+
+from evolving_graphs.agent_graph import llm_backend
+from evolving_graphs.agent_graph.goal_loop_prompts import build_accuracy_prompt, build_drafter_prompt, build_joint_prompt, build_relevance_prompt, context_prefix
+from evolving_graphs.agent_graph.llm_backend import session_settings
+from evolving_graphs.agent_graph.llm_telemetry import get_telemetry
+from evolving_graphs.agent_graph.llm_telemetry_summary import prompt_reuse_summary
+from evolving_graphs.agent_graph.llm_util import chat_llm
+
+CONTEXT = "def add(a, b):\n    return a + b\n" * 20
+ANSWER = "Adds `a` and `b` and returns the sum."
+
+
+def test_goal_loop_prompts_share_the_code_context_prefix():
+    prefix = context_prefix(CONTEXT)
+    prompts = [
+        build_drafter_prompt("Describe `add`.", CONTEXT, ""),
+        build_drafter_prompt("Describe `add`.", CONTEXT, "Too vague."),
+        build_relevance_prompt("Describe `add`.", ANSWER, CONTEXT),
+        build_accuracy_prompt(ANSWER, CONTEXT),
+        build_joint_prompt("Describe `add`.", ANSWER, CONTEXT),
+    ]
+    assert all(prompt.startswith(prefix) for prompt in prompts)
+    assert all(ANSWER not in prompt[:len(prefix)] for prompt in prompts)
+
+
+def test_session_settings_follow_the_goal_loop(monkeypatch):
+    monkeypatch.setattr(llm_backend, "LLM_SESSION_MODE", True)
+    monkeypatch.setattr(llm_backend, "LLM_SESSION_KEEP_ALIVE", "30m")
+    monkeypatch.setattr(llm_backend, "LLM_PRELOAD_MODELS", False)
+    assert session_settings("calc.py:add:Iter2:Audit:Accuracy") == ("calc.py:add", "30m")
+    assert session_settings("MapCritic") == (None, None)
+    monkeypatch.setattr(llm_backend, "LLM_SESSION_MODE", False)
+    assert session_settings("calc.py:add:Iter2:Audit:Accuracy") == (None, None)
+
+
+def test_calls_of_one_loop_stay_on_one_warm_endpoint(fake_chat, monkeypatch):
+    monkeypatch.setattr(llm_backend, "LLM_SESSION_MODE", True)
+    bodies = fake_chat(hosts=("http://a:1", "http://b:2")).requests
+    for label in ("calc.py:add:Iter1:Drafter", "calc.py:add:Iter1:Audit:Relevance", "calc.py:add:Iter1:Audit:Accuracy"):
+        chat_llm("m", context_prefix(CONTEXT) + f"{label}. Reply with key 'status'.", log_context=label)
+    assert len(bodies) == 3 and len({body["host"] for body in bodies}) == 1
+    assert {body["keep_alive"] for body in bodies} == {"30m"}
+
+
+def test_prompt_reuse_summary_estimates_saved_prompt_eval(llm_state):
+    telemetry = get_telemetry()
+    telemetry.record("calc.py:add:Iter1:Drafter", "m", 0, 2.0, 4000,
+                     {"prompt_eval_count": 1000, "prompt_eval_duration_s": 1.0, "ttfc_s": 1.0})
+    telemetry.record("calc.py:add:Iter1:Audit:Relevance", "m", 0, 0.5, 4400,
+                     {"prompt_eval_count": 100, "prompt_eval_duration_s": 0.1, "ttfc_s": 0.2})
+    telemetry.record("calc.py:sub:Iter1:Drafter", "m", 0, 0.0, 4000, cached=True)
+    reuse = prompt_reuse_summary(telemetry.snapshot()["records"])
+    assert (reuse["cold_calls"], reuse["warm_calls"]) == (1, 1)
+    assert reuse["est_prompt_tokens_saved"] == 1000
+    assert reuse["est_prompt_eval_s_saved"] == pytest.approx(1.0)
+    # The cold rate predicts a 1.1s first chunk for the warm call's 4400 chars.
+    assert reuse["est_ttfc_s_saved"] == pytest.approx(0.9)
+    assert (reuse["avg_ttfc_s_cold"], reuse["avg_ttfc_s_warm"]) == (1.0, 0.2)
@@ -0,0 +1,59 @@
+import json
+
+from evolving_graphs.agent_graph.llm_labels import call_category, module_of, session_of
+from evolving_graphs.agent_graph.llm_telemetry import get_telemetry, usage_from_response
+from evolving_graphs.agent_graph.llm_telemetry_report import write_reports
+from evolving_graphs.agent_graph.llm_telemetry_summary import telemetry_summary
+from evolving_graphs.agent_graph.llm_util import chat_llm
+
+LABEL = "Dep:calc.py->util.py:Usage:Iter2:Audit:Accuracy"
+
+
+def test_labels_map_to_module_phase_and_session():
+    assert module_of(LABEL) == "calc.py"
+    assert call_category(LABEL) == "accuracy_audit"
+    assert session_of(LABEL) == "Dep:calc.py->util.py:Usage"
+    assert call_category("calc.py:add:Iter1:Grounding:Batch") == "batch_grounding"
+    assert (module_of("ProjectSummary"), call_category("ProjectSummary"), session_of("ProjectSummary")) == ("(project)", "general", None)
+
+
+def test_usage_from_response_converts_durations_to_seconds():
+    usage = usage_from_response({"prompt_eval_count": 12, "eval_count": 3, "load_duration": 2_000_000_000,
+                                 "prompt_eval_duration": 500_000_000, "eval_duration": None})
+    assert usage == {"prompt_eval_count": 12, "eval_count": 3, "load_duration_s": 2.0,
+                     "prompt_eval_duration_s": 0.5, "eval_duration_s": None}
+
+
+def test_records_are_aggregated_per_module_phase_and_label(llm_state):
+    telemetry = get_telemetry()
+    telemetry.record(LABEL, "m", 1, 2.0, 400, {"prompt_eval_count": 100, "eval_count": 10})
+    telemetry.record(LABEL, "m", 2, 3.0, 600, {"prompt_eval_count": 150, "eval_count": 10})
+    telemetry.record("calc.py:add:Iter1:Drafter", "m", 1, 0.0, 200, cached=True)
+    summary = telemetry_summary()
+    assert summary["by_label"][LABEL]["calls"] == 2
+    assert summary["by_label"][LABEL]["prompt_tokens"] == 250
+    assert summary["by_phase"]["accuracy_audit"]["latency_s"] == 5.0
+    assert summary["by_module"]["calc.py"]["calls"] == 3
+    assert summary["by_module"]["calc.py"]["backend_calls"] == 2
+    assert summary["by_attempt"][2]["avg_prompt_chars"] == 600
+    assert summary["totals"]["cached"] == 1
+
+
+def test_live_calls_are_recorded_with_backend_counts(fake_chat):
+    fake_chat()
+    chat_llm("m", "Describe `add`. Reply with key 'answer'.", log_context="calc.py:add:Iter1:Drafter")
+    record, = get_telemetry().snapshot()["records"]
+    assert (record.module, record.phase, record.attempt) == ("calc.py", "drafter", 0)
+    assert record.prompt_eval_count == record.prompt_chars // 4
+    assert record.eval_count > 0 and record.latency_s > 0
+    assert not (record.cached or record.error or record.counts_estimated)
+
+
+def test_reports_are_written_as_json_and_prometheus_text(llm_state, tmp_path):
+    get_telemetry().record(LABEL, "m", 1, 2.0, 400, {"prompt_eval_count": 100, "eval_count": 10})
+    json_path, prom_path = tmp_path / "telemetry.json", tmp_path / "telemetry.prom"
+    write_reports(str(json_path), str(prom_path))
+    assert json.loads(json_path.read_text())["by_label"][LABEL]["prompt_tokens"] == 100
+    prom = prom_path.read_text()
+    assert "# TYPE agent_llm_requests_total counter" in prom
+    assert 'agent_llm_prompt_tokens_total{module="calc.py",phase="accuracy_audit"} 100' in prom
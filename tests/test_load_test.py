@@ -0,0 +1,68 @@
+import argparse
+import ast
+import os
+
+import pytest
+
+from load_test import _TimedMemory, _percentile, make_synthetic_project, render_report, run_level
+
+
+def settings(**overrides):
+    values = dict(levels="1", mode="summarizer", endpoint=None, modules=2, functions=1, slots=4,
+                  latency_median=0.01, latency_sigma=0.1, per_token=0.0, malformed_rate=0.0, error_rate=0.0,
+                  use_cache=False, shared_chroma=False, sample_interval=0.05)
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def level(n, throughput):
+    return {"analyses": n, "throughput_per_min": throughput, "llm_calls_per_s": 1.0, "latency_p50_s": 1.0,
+            "latency_p95_s": 1.0, "latency_max_s": 1.0, "client_queue_avg": 0.0, "client_queue_peak": 0,
+            "server_queue_avg": None, "server_queue_peak": None, "mem_mb_avg": 60.0, "mem_mb_max": 60.0,
+            "chroma_open_s_avg": 0.0, "chroma_ops_s_avg": 0.0, "chroma_errors": 0, "failed": 0}
+
+
+def test_synthetic_project_is_a_dependency_chain(tmp_path):
+    main_path = make_synthetic_project(str(tmp_path), 7, modules=3, functions=2)
+    assert os.path.basename(main_path) == "synthetic7_main.py"
+    imports = {}
+    for name in sorted(os.listdir(tmp_path)):
+        tree = ast.parse((tmp_path / name).read_text())
+        imports[name] = [node.module for node in ast.walk(tree) if isinstance(node, ast.ImportFrom)]
+    assert imports == {"stage0_util.py": [], "stage1_util.py": ["stage0_util"], "stage2_util.py": ["stage1_util"],
+                       "synthetic7_main.py": ["stage2_util"]}
+
+
+def test_timed_memory_counts_operations_and_failures():
+    class Memory:
+        name = "chroma"
+
+        def add(self, value):
+            return value
+
+        def query(self):
+            raise RuntimeError("locked")
+
+    stats = {"ops": 0, "ops_s": 0.0, "errors": 0}
+    memory = _TimedMemory(Memory(), stats)
+    assert memory.add(3) == 3 and memory.name == "chroma"
+    with pytest.raises(RuntimeError):
+        memory.query()
+    assert (stats["ops"], stats["errors"]) == (2, 1)
+
+
+def test_report_marks_where_throughput_saturates():
+    report = render_report([level(1, 10.0), level(2, 19.0), level(4, 20.0)], settings())
+    assert "| 4 | 20.00 |" in report
+    assert "Throughput saturates between N=2 and N=4." in report
+    assert "No saturation" in render_report([level(1, 10.0), level(2, 19.0)], settings())
+
+
+def test_level_runs_concurrent_analyses_against_a_fake_server(tmp_path):
+    result = run_level(2, settings(), str(tmp_path))
+    assert result["failed"] == 0, result["errors"]
+    assert result["analyses"] == 2 and result["throughput_per_min"] > 0
+    assert all(run["backend_calls"] > 0 for run in result["runs"])
+    assert result["server"]["requests"] == sum(run["backend_calls"] for run in result["runs"])
+    assert result["mem_mb_max"] > 0
+    assert _percentile([run["latency_s"] for run in result["runs"]], 100) == result["latency_max_s"]
@@ -0,0 +1,97 @@
+import json
+import time
+
+from evolving_graphs.agent_graph import llm_budget, task_executor
+from evolving_graphs.agent_graph.agent_config import CONTEXT_LIMIT
+from evolving_graphs.agent_graph.llm_telemetry import LLMCallRecord
+from evolving_graphs.agent_graph.llm_telemetry_summary import speculation_summary, telemetry_summary
+from evolving_graphs.agent_graph.semantic_gatekeeper import SemanticGatekeeper
+from evolving_graphs.agent_graph.task_executor import TaskExecutor
+
+CONTEXT = "def add(a, b):\n    return a + b\n"
+ANSWER = "Adds `a` and `b` and returns the sum."
+UNGROUNDED = "Calls `missing_helper` to add."
+
+
+def record(label, **fields):
+    return LLMCallRecord(label=label, module="calc.py", phase="Drafter", model="m", attempt=0, latency_s=1.0, prompt_chars=40, **fields)
+
+
+def test_summary_weighs_alternate_wins_against_the_extra_calls():
+    rounds = [(2, 1, 0, 2.0), (2, 0, 1, 1.0), (2, None, 0, 3.0)]
+    records = [record("calc.py:add:Iter1:Draft0:Drafter", prompt_eval_count=100),
+               record("calc.py:add:Iter1:Draft1:Drafter", prompt_eval_count=100, eval_count=20),
+               record("calc.py:add:Iter1:Draft1:Audit:Relevance", prompt_eval_count=50, cached=True),
+               record("calc.py:add:Iter2:Draft1:Drafter", prompt_eval_count=30, cancelled=True)]
+    summary = speculation_summary(rounds, records)
+    assert (summary["rounds"], summary["drafts"], summary["passed_rounds"]) == (3, 6, 2)
+    assert summary["wins_by_draft"] == {"0": 1, "1": 1}
+    assert (summary["alternate_wins"], summary["cancelled"], summary["avg_round_s"]) == (1, 1, 2.0)
+    assert (summary["extra_calls"], summary["extra_tokens"]) == (2, 200)
+    assert speculation_summary([], records) is None
+
+
+def test_option_overrides_are_merged_into_the_drafter_profile(fake_chat):
+    bodies = fake_chat().requests
+    SemanticGatekeeper().execute_with_feedback("Describe `add`.", "answer", log_context="calc.py:add:Iter1:Draft1:Drafter",
+                                               option_overrides={"seed": 7, "temperature": 0.5})
+    options, = (body["options"] for body in bodies)
+    assert (options["seed"], options["temperature"], options["num_ctx"]) == (7, 0.5, CONTEXT_LIMIT)
+
+
+def speculate(fake_ollama, monkeypatch, draft_0, draft_1):
+    """
+    One goal loop with two speculative drafts in joint audit mode. Draft 0 (no option overrides) answers
+    `draft_0`; draft 1 (seed 7) gets `draft_1(body)`. Returns the executor's answer and the request bodies.
+    """
+    monkeypatch.setattr(task_executor, "GOAL_LOOP_AUDIT_MODE", "joint")
+    server, = fake_ollama(script={"answer": draft_0, "audit": {"relevance": "PASS", "accuracy": "PASS"}})
+    bodies, answer = [], server.answer
+
+    def answer_by_draft(body):
+        bodies.append(body)
+        if (body.get("options") or {}).get("seed") == 7:
+            return draft_1(body)
+        return answer(body)
+
+    server.answer = answer_by_draft
+    executor = TaskExecutor(SemanticGatekeeper())
+    executor.speculative_drafts = 2
+    return executor.solve_complex_task("Describe `add`.", CONTEXT, "calc.py:add"), bodies
+
+
+def test_alternate_draft_wins_when_draft_0_is_rejected(fake_ollama, monkeypatch):
+    answer, bodies = speculate(fake_ollama, monkeypatch, UNGROUNDED, lambda body: json.dumps({"answer": ANSWER}))
+    assert answer == ANSWER
+    # Both drafters, then one joint audit: draft 0 never gets past the local grounding check.
+    assert len(bodies) == 3
+    assert [body["options"].get("seed") for body in bodies[:2]].count(7) == 1
+    summary = telemetry_summary()["speculation"]
+    assert (summary["rounds"], summary["wins_by_draft"], summary["alternate_win_rate"]) == (1, {"1": 1}, 1.0)
+    assert (summary["cancelled"], summary["extra_calls"]) == (0, 2)
+
+
+def test_losing_draft_is_cancelled_in_flight_and_still_charged(fake_ollama, monkeypatch):
+    def slow_draft(body):
+        time.sleep(1.0)
+        return json.dumps({"answer": "Returns `a` plus `b`."})
+
+    answer, bodies = speculate(fake_ollama, monkeypatch, ANSWER, slow_draft)
+    assert answer == ANSWER
+    summary = telemetry_summary()
+    assert summary["speculation"]["wins_by_draft"] == {"0": 1}
+    assert summary["speculation"]["cancelled"] == 1
+    # Draft 0's drafter and joint audit, and draft 1's drafter, which is recorded as cancelled.
+    assert len(bodies) == 3
+    assert summary["by_label"]["calc.py:add:Iter1:Draft1:Drafter"]["cancelled"] == 1
+    assert llm_budget.get_governor().summary()["run"]["calls"] == 3
+
+
+def test_no_passing_draft_feeds_the_furthest_rejection_back(fake_ollama, monkeypatch):
+    answer, bodies = speculate(fake_ollama, monkeypatch, [UNGROUNDED, ANSWER], lambda body: json.dumps({"answer": UNGROUNDED}))
+    assert answer == ANSWER
+    summary = telemetry_summary()["speculation"]
+    assert (summary["rounds"], summary["passed_rounds"], summary["wins_by_draft"]) == (2, 1, {"0": 1})
+    # Iteration 1 ends after its two drafters; both iteration 2 drafters carry the rejection.
+    for body in bodies[2:4]:
+        assert "PREVIOUS ATTEMPT REJECTED: GUARDRAIL FAILURE" in body["messages"][-1]["content"]
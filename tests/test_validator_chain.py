@@ -0,0 +1,84 @@
+import asyncio
+
+from evolving_graphs.agent_graph.llm_telemetry_summary import telemetry_summary
+from evolving_graphs.agent_graph.semantic_gatekeeper import SemanticGatekeeper
+from evolving_graphs.agent_graph.task_executor import TaskExecutor
+from evolving_graphs.agent_graph.validator_chain import ValidatorChain, Validator, Verdict
+
+CONTEXT = "def add(a, b):\n    return a + b\n"
+
+
+def recording(name, calls, verdict=None, paid=False):
+    """A validator that logs the answers it sees; paid validators are async like the LLM audits."""
+    def check(answer, goal, context_data, log_label):
+        calls.append((name, answer))
+        return verdict or Verdict("PASS")
+
+    async def acheck(answer, goal, context_data, log_label):
+        return check(answer, goal, context_data, log_label)
+
+    return Validator(name, 1 if paid else 0, acheck if paid else check)
+
+
+def run(chain, answer="answer", stop=None):
+    return asyncio.run(chain.arun(answer, "goal", CONTEXT, "calc.py:add:Iter1", stop=stop))
+
+
+def test_validators_run_cheapest_first_in_a_stable_order(llm_state):
+    calls = []
+    chain = ValidatorChain([recording("audit", calls, paid=True), recording("heuristics", calls), recording("grounding", calls)],
+                           costs={"grounding": 0.5})
+    assert chain.names == ["heuristics", "grounding", "audit"]
+    result = run(chain)
+    assert (result.status, result.passed) == ("PASS", 3)
+    assert [name for name, _ in calls] == chain.names
+
+
+def test_first_rejection_short_circuits_the_paid_validators(llm_state):
+    calls = []
+    chain = ValidatorChain([recording("audit", calls, paid=True), recording("grounding", calls, Verdict("FAIL", "cites `missing`"))])
+    result = run(chain)
+    assert (result.status, result.reason, result.failed_by, result.passed) == ("FAIL", "cites `missing`", "grounding", 0)
+    assert [name for name, _ in calls] == ["grounding"]
+
+
+def test_rewritten_answer_is_rechecked_by_the_local_validators(llm_state):
+    calls = []
+    chain = ValidatorChain([recording("heuristics", calls), recording("refine", calls, Verdict("PASS", answer="refined"), paid=True),
+                            recording("accuracy", calls, paid=True)])
+    result = run(chain)
+    assert result.answer == "refined"
+    assert calls == [("heuristics", "answer"), ("refine", "answer"), ("heuristics", "refined"), ("accuracy", "refined")]
+
+
+def test_stop_ends_the_chain_before_a_paid_validator(llm_state):
+    calls = []
+    chain = ValidatorChain([recording("heuristics", calls), recording("audit", calls, paid=True)])
+    result = run(chain, stop=lambda: "run call budget (10) exhausted")
+    assert (result.status, result.stopped, result.passed) == ("STOPPED", "run call budget (10) exhausted", 1)
+    assert [name for name, _ in calls] == ["heuristics"]
+
+
+def test_without_drops_validators_by_name():
+    chain = ValidatorChain([recording("heuristics", []), recording("relevance", [], paid=True), recording("accuracy", [], paid=True)])
+    assert chain.without("relevance").names == ["heuristics", "accuracy"]
+
+
+def test_rejection_rates_are_reported_per_validator(llm_state):
+    chain = ValidatorChain([recording("heuristics", []), recording("grounding", [], Verdict("FAIL", "no"))])
+    for _ in range(2):
+        run(chain)
+    validators = telemetry_summary()["validators"]
+    assert validators["heuristics"]["rejection_rate"] == 0.0 and validators["heuristics"]["runs"] == 2
+    assert validators["grounding"]["rejection_rate"] == 1.0
+
+
+def test_ungrounded_draft_is_rejected_before_any_audit_call(fake_ollama):
+    server, = fake_ollama(script={"answer": ["Calls `missing_helper` to add.", "Adds `a` and `b`."], "status": "PASS"})
+    answer = TaskExecutor(SemanticGatekeeper()).solve_complex_task("Describe `add`.", CONTEXT, "calc.py:add")
+    assert answer == "Adds `a` and `b`."
+    # Iteration 1: drafter only. Iteration 2: drafter, relevance and accuracy audits.
+    assert server.stats()["requests"] == 4
+    validators = telemetry_summary()["validators"]
+    assert validators["grounding_hard"]["rejections"] == 1
+    assert validators["relevance"]["runs"] == 1